@@ -0,0 +1,24 @@
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+
+def conditional_response(request: Request, response: Response, etag: str, cache_control: str) -> Optional[Response]:
+    """
+    Apply validator headers to a response and short-circuit revalidations.
+
+    Parameters:
+        request (Request): Incoming request, checked for If-None-Match.
+        response (Response): Response the route is building; it receives the headers.
+        etag (str): Entity tag of the representation being served.
+        cache_control (str): Cache-Control header value.
+
+    Returns:
+        Optional[Response]: A 304 response when the client's copy is current, otherwise None.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
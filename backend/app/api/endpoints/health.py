@@ -0,0 +1,31 @@
+from fastapi import APIRouter, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from ...db.database import get_engine
+
+router = APIRouter()
+
+
+@router.get("/ready", include_in_schema=False)
+def read_readiness():
+    """
+    Readiness probe: 200 once this worker can reach the database and its schema is fully migrated, 503 otherwise.
+
+    Workers no longer migrate on startup, so a worker started before the migration step finished reports
+    not ready until it has. The probe is unauthenticated, like /metrics.
+    """
+    # Imported here to keep Alembic out of application startup; only the probe needs it.
+    from ...db.migrate import schema_is_current
+
+    try:
+        with get_engine().connect() as connection:
+            connection.execute(text("SELECT 1"))
+            if not schema_is_current(connection):
+                return ORJSONResponse({"status": "not ready", "reason": "database schema is not up to date"},
+                                      status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    except SQLAlchemyError:
+        return ORJSONResponse({"status": "not ready", "reason": "database is unreachable"},
+                              status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return {"status": "ready"}
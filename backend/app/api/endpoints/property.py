@@ -1,92 +1,375 @@
-from datetime import timedelta
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.encoders import jsonable_encoder
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBasicCredentials
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.auth import authenticate_user, create_access_token, security
-from app.core.auth import oauth2_scheme, get_current_user
+from app.api.caching import conditional_response
+from app.api.exports import EXPORT_FORMATS, export_encoder, iter_export
+from app.api.responses import cached_response, changes_response, from_row, model_response
+from app.api.streams import iter_batches, iter_csv_records, iter_ndjson_records
+from app.core.auth import authenticate_user, issue_tokens, security, verify_token
+from app.core.auth import oauth2_scheme, get_current_user, REFRESH_TOKEN, REFRESH_TOKEN_EXPIRE_MINUTES
+from app.core.config import settings
 from app.crud.crud_property import (
-    create_property_db, get_property_db, update_property_db, delete_property_db,
-    get_properties_db, get_filtered_properties_db, get_property_value_range
+    create_property_db, get_property_db, get_properties_by_ids_db, update_property_db, delete_property_db,
+    get_properties_db, get_filtered_properties_db, get_property_value_range, get_properties_within_db, parse_bbox,
+    iter_export_batches, listing_cache, EXPORT_COLUMNS, LISTING_COLUMNS
 )
+from app.crud.crud_bulk import bulk_delete_properties_db, bulk_update_properties_db, ingest_batch
+from app.crud.crud_changes import get_property_changes_db
+from app.crud.crud_clusters import get_property_clusters_db
+from app.crud.crud_facets import get_property_facets_db
+from app.crud.crud_stats import get_group_stats_db
+from app.crud.range_cache import range_etag
+from app.db.database import SessionLocal
 from app.db.session import get_db
 from app.schemas.property import (
     PropertyCreate, PropertyUpdate, PropertyBase,
-    PropertyListings, PropertyListing, PaginatedPropertyListingsResponse, PropertyRangeSchema
+    PropertyListings, PropertyListing, PaginatedPropertyListingsResponse, PropertyBatchGetRequest,
+    PropertyBatchGetResponse, PropertyBulkUpdateRequest, PropertyBulkDeleteRequest, BulkWriteResult,
+    PropertyRangeSchema, PropertyChangesResponse,
+    PropertyCluster, PropertyClustersResponse, PropertyFacetsResponse, GroupStats, GroupStatsResponse, BulkIngestReport,
+    BulkRowError
 )
+from app.schemas.token import Token, TokenRefreshRequest
 
 
 router = APIRouter()
+# Routes backed by crud_property, included by app.main after `router` (see the bottom of this module).
+crud_router = APIRouter()
 
 
-@router.post("/token")
+@router.post("/token", response_model=Token, response_model_exclude_none=True)
 async def login_for_access_token(credentials: HTTPBasicCredentials = Depends(security)):
-    """Generate an access token for authenticated users."""
+    """Generate an access token, and a refresh token when enabled, for authenticated users."""
     user = authenticate_user(credentials)
-    access_token_expires = timedelta(minutes=5)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return issue_tokens(user.username)
+
 
+@router.post("/token/refresh", response_model=Token, response_model_exclude_none=True)
+async def refresh_access_token(body: TokenRefreshRequest):
+    """Exchange a refresh token for a new access token and refresh token, without Basic credentials."""
+    if REFRESH_TOKEN_EXPIRE_MINUTES <= 0:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Refresh tokens are disabled")
+    username = verify_token(body.refresh_token, token_type=REFRESH_TOKEN)
+    return issue_tokens(username)
 
-@router.post("/properties/", response_model=PropertyCreate, status_code=status.HTTP_201_CREATED)
+
+@crud_router.post("/properties/", response_model=PropertyCreate, status_code=status.HTTP_201_CREATED)
 def create_property_endpoint(property_: PropertyBase, db: Session = Depends(get_db),
                              token: str = Depends(get_current_user)):
-    """Endpoint to create a new property."""
-    return create_property_db(db=db, property=property_)
+    """Endpoint to create a new property. Responds 409 if another property has the same PIN."""
+    try:
+        return create_property_db(db=db, property=property_)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A property with this pin already exists")
 
 
-@router.get("/properties/", response_model=List[PropertyBase], status_code=status.HTTP_200_OK)
-def read_properties_endpoint(skip: int = 0, limit: int = 100, db: Session = Depends(get_db),
-                             token: str = Depends(get_current_user)):
-    """Endpoint to retrieve a list of properties."""
-    properties = get_properties_db(db, skip=skip, limit=limit)
+@router.post("/properties/bulk", response_model=BulkIngestReport)
+async def bulk_create_properties_endpoint(request: Request, delimiter: str = ",", mode: str = "insert",
+                                          db: Session = Depends(get_db), token: str = Depends(get_current_user)):
+    """
+    Endpoint to create many properties from an NDJSON (application/x-ndjson) or CSV (text/csv) body.
+
+    The body is read as a stream and committed in chunks of `BULK_BATCH_SIZE` rows. Rows failing
+    validation are skipped and reported by their 1-based position in the stream. With `mode=upsert`,
+    rows whose PIN already exists update that property when their values changed and are otherwise
+    counted as unchanged, so re-importing a roll only writes the difference.
+    """
+    if mode not in ("insert", "upsert"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="mode must be insert or upsert")
+    if len(delimiter) != 1 or delimiter in '"\r\n':
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="delimiter must be a single character other than a quote or line break")
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in ("application/x-ndjson", "application/jsonl", "application/json-lines"):
+        records = iter_ndjson_records(request.stream())
+    elif content_type == "text/csv":
+        records = iter_csv_records(request.stream(), delimiter=delimiter)
+    else:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                            detail="Send application/x-ndjson or text/csv")
+
+    report = BulkIngestReport()
+    async for batch in iter_batches(records, settings.BULK_BATCH_SIZE):
+        result = await run_in_threadpool(ingest_batch, db, batch, report.received + 1, mode == "upsert")
+        report.received += result["received"]
+        report.inserted += result["inserted"]
+        report.updated += result["updated"]
+        report.unchanged += result["unchanged"]
+        report.failed += result["failed"]
+        room = settings.BULK_MAX_REPORTED_ERRORS - len(report.errors)
+        report.errors.extend(BulkRowError.model_construct(**error) for error in result["errors"][:max(room, 0)])
+    return report
+
+
+@crud_router.post("/properties/batch-get", response_model=PropertyBatchGetResponse, status_code=status.HTTP_200_OK)
+def batch_get_properties_endpoint(body: PropertyBatchGetRequest, db: Session = Depends(get_db),
+                                  token: str = Depends(get_current_user)):
+    """
+    Endpoint to retrieve up to `BATCH_GET_MAX_IDS` properties in one request. Results follow the
+    order of `ids`, with null entries for IDs that do not exist; those are also listed in `missing`.
+    """
+    if len(body.ids) > settings.BATCH_GET_MAX_IDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"At most {settings.BATCH_GET_MAX_IDS} ids may be requested at once")
+    rows = get_properties_by_ids_db(db, body.ids)
+    return model_response(PropertyBatchGetResponse.model_construct(
+        properties=[from_row(PropertyListing, row) if row is not None else None for row in rows],
+        missing=[property_id for property_id, row in zip(body.ids, rows) if row is None]
+    ))
+
+
+@crud_router.get("/properties/", response_model=List[PropertyBase], status_code=status.HTTP_200_OK)
+def read_properties_endpoint(response: Response, skip: int = 0, limit: int = 100, cursor: str = None,
+                             db: Session = Depends(get_db), token: str = Depends(get_current_user)):
+    """Endpoint to retrieve a list of properties. The next page's cursor is sent in the X-Next-Cursor header."""
+    try:
+        properties, next_cursor = get_properties_db(db, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return properties
 
 
-@router.get("/properties_listings/", response_model=PaginatedPropertyListingsResponse,
+@crud_router.get("/properties_listings/", response_model=PaginatedPropertyListingsResponse,
             status_code=status.HTTP_200_OK)
 def read_property_listings_endpoint(
     full_address: str = None, class_description: str = None,
     estimated_market_value_min: int = None, estimated_market_value_max: int = None,
     bldg_use: str = None, building_sq_ft_min: int = None, building_sq_ft_max: int = None,
-    skip: int = 0, limit: int = 25, db: Session = Depends(get_db), token: str = Depends(get_current_user)
+    skip: int = 0, limit: int = 25, cursor: str = None, sort_by: str = None, descending: bool = False,
+    exact_match: bool = False, db: Session = Depends(get_db), token: str = Depends(get_current_user)
 ):
-    """Endpoint to retrieve a filtered list of property listings."""
-    properties = get_filtered_properties_db(
-        db, full_address=full_address, class_description=class_description,
+    """
+    Endpoint to retrieve a filtered list of property listings. Pass `next_cursor` back as `cursor` for the next page.
+    Responses are served from the listing cache when possible; `X-Cache` tells whether this one was.
+    """
+    query = dict(
+        full_address=full_address, class_description=class_description,
         estimated_market_value_min=estimated_market_value_min, estimated_market_value_max=estimated_market_value_max,
         bldg_use=bldg_use, building_sq_ft_min=building_sq_ft_min, building_sq_ft_max=building_sq_ft_max,
-        skip=skip, limit=limit
+        skip=skip, limit=limit, cursor=cursor, sort_by=sort_by, descending=descending, exact_match=exact_match
     )
+    cache_key = listing_cache.key(query)
+    cached = listing_cache.get(cache_key)
+    if cached is not None:
+        return cached_response(cached)
+    try:
+        properties, next_cursor = get_filtered_properties_db(db, **query, columns=LISTING_COLUMNS)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    properties_models = [PropertyListings.from_orm(prop) for prop in properties]
-    more_exists = len(properties) == limit
-    return PaginatedPropertyListingsResponse(properties=properties_models, moreExists=more_exists)
+    properties_models = [from_row(PropertyListings, row) for row in properties]
+    response = model_response(PaginatedPropertyListingsResponse.model_construct(
+        properties=properties_models, moreExists=next_cursor is not None, next_cursor=next_cursor
+    ))
+    listing_cache.set(cache_key, response.body)
+    response.headers["X-Cache"] = "MISS"
+    return response
 
 
-@router.get("/properties/range", response_model=PropertyRangeSchema)
-def get_property_range_endpoint(db: Session = Depends(get_db)):
-    """Endpoint to retrieve min and max values for property filters."""
+@crud_router.get("/properties/range", response_model=PropertyRangeSchema)
+def get_property_range_endpoint(request: Request, response: Response, db: Session = Depends(get_db)):
+    """Endpoint to retrieve min and max values for property filters. Supports revalidation with If-None-Match."""
     range_values = get_property_value_range(db)
-    return range_values
+    not_modified = conditional_response(
+        request, response, range_etag(range_values), f"public, max-age={settings.RANGE_CACHE_MAX_AGE}"
+    )
+    return not_modified or range_values
+
+
+@crud_router.get("/properties/within", response_model=PaginatedPropertyListingsResponse,
+                 status_code=status.HTTP_200_OK)
+def read_properties_within_endpoint(
+    bbox: str = None, lat: float = None, lon: float = None, radius: float = None, limit: int = 500,
+    db: Session = Depends(get_db), token: str = Depends(get_current_user)
+):
+    """
+    Endpoint to retrieve the properties shown on a map view: those inside `bbox` ("west,south,east,north"
+    in degrees), or within `radius` metres of `lat`/`lon`, nearest first.
+    """
+    if not 0 < limit <= settings.WITHIN_MAX_RESULTS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"limit must be between 1 and {settings.WITHIN_MAX_RESULTS}")
+    try:
+        properties, more_exists = get_properties_within_db(
+            db, bbox=parse_bbox(bbox) if bbox else None, latitude=lat, longitude=lon, radius=radius, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return model_response(PaginatedPropertyListingsResponse.model_construct(
+        properties=[from_row(PropertyListings, row) for row in properties], moreExists=more_exists, next_cursor=None
+    ))
+
+
+def _export_batches(filters: dict):
+    # The request's session is closed when the endpoint returns, before the body is streamed,
+    # so the export reads through a session of its own.
+    db = SessionLocal()
+    try:
+        yield from iter_export_batches(db, settings.EXPORT_BATCH_SIZE, **filters)
+    finally:
+        db.close()
+
+
+@crud_router.get("/properties/changes", response_model=PropertyChangesResponse, status_code=status.HTTP_200_OK)
+def read_property_changes_endpoint(since: int = 0, limit: int = 1000, db: Session = Depends(get_db),
+                                   token: str = Depends(get_current_user)):
+    """
+    Endpoint to retrieve properties written or deleted since a version, for incremental syncing.
+    Start from `since=0` and pass `next_since` back as `since` until `moreExists` is false.
+    """
+    if since < 0 or not 1 <= limit <= settings.CHANGES_MAX_LIMIT:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"since must be >= 0 and limit between 1 and {settings.CHANGES_MAX_LIMIT}")
+    changes, next_since, more_exists = get_property_changes_db(db, since, limit)
+    return model_response(changes_response(changes, next_since, more_exists))
 
 
-@router.get("/properties/{property_id}", response_model=PropertyListing, status_code=status.HTTP_200_OK)
+@crud_router.get("/properties/export", status_code=status.HTTP_200_OK)
+def export_properties_endpoint(
+    full_address: str = None, class_description: str = None,
+    estimated_market_value_min: int = None, estimated_market_value_max: int = None,
+    bldg_use: str = None, building_sq_ft_min: int = None, building_sq_ft_max: int = None,
+    exact_match: bool = False, export_format: str = Query("csv", alias="format"),
+    token: str = Depends(get_current_user)
+):
+    """
+    Endpoint to download every property matching the listing filters as CSV, NDJSON or Parquet.
+
+    The rows are read from a cursor and encoded a batch of `EXPORT_BATCH_SIZE` at a time while the
+    response is sent, so memory use does not grow with the size of the export.
+    """
+    try:
+        encoder = export_encoder(export_format, EXPORT_COLUMNS)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    filters = dict(
+        full_address=full_address, class_description=class_description,
+        estimated_market_value_min=estimated_market_value_min, estimated_market_value_max=estimated_market_value_max,
+        bldg_use=bldg_use, building_sq_ft_min=building_sq_ft_min, building_sq_ft_max=building_sq_ft_max,
+        exact_match=exact_match,
+    )
+    media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(iter_export(encoder, _export_batches(filters)), media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="properties.{extension}"'})
+
+
+@crud_router.get("/properties/clusters", response_model=PropertyClustersResponse, status_code=status.HTTP_200_OK)
+def read_property_clusters_endpoint(zoom: int, bbox: str, db: Session = Depends(get_db),
+                                     token: str = Depends(get_current_user)):
+    """
+    Endpoint to retrieve marker clusters for a map view: count, centroid and median estimated market value
+    per grid cell of `bbox` ("west,south,east,north" in degrees) at `zoom`.
+    """
+    try:
+        clusters = get_property_clusters_db(db, zoom, parse_bbox(bbox))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return model_response(PropertyClustersResponse.model_construct(
+        zoom=zoom, clusters=[from_row(PropertyCluster, row) for row in clusters]
+    ))
+
+
+@crud_router.get("/properties/facets", response_model=PropertyFacetsResponse, status_code=status.HTTP_200_OK)
+def read_property_facets_endpoint(
+    full_address: str = None, class_description: str = None,
+    estimated_market_value_min: int = None, estimated_market_value_max: int = None,
+    bldg_use: str = None, building_sq_ft_min: int = None, building_sq_ft_max: int = None,
+    exact_match: bool = False, buckets: int = 10, facet_limit: int = 50,
+    db: Session = Depends(get_db), token: str = Depends(get_current_user)
+):
+    """
+    Endpoint to retrieve value counts for class description and building use, and histograms of
+    estimated market value and building square footage, for the properties matching the listing filters.
+    """
+    if not (1 <= buckets <= 100 and 1 <= facet_limit <= 1000):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="buckets must be between 1 and 100 and facet_limit between 1 and 1000")
+    return get_property_facets_db(
+        db, full_address=full_address, class_description=class_description,
+        estimated_market_value_min=estimated_market_value_min, estimated_market_value_max=estimated_market_value_max,
+        bldg_use=bldg_use, building_sq_ft_min=building_sq_ft_min, building_sq_ft_max=building_sq_ft_max,
+        exact_match=exact_match, buckets=buckets, facet_limit=facet_limit
+    )
+
+
+@crud_router.get("/properties/stats/{grouping}", response_model=GroupStatsResponse, status_code=status.HTTP_200_OK)
+def read_group_stats_endpoint(grouping: str, town: int = None, db: Session = Depends(get_db),
+                              token: str = Depends(get_current_user)):
+    """
+    Endpoint to retrieve summary statistics (median values, assessment change, sale ratio) per town,
+    neighborhood or tax code, optionally limited to one town.
+    """
+    try:
+        groups = get_group_stats_db(db, grouping, town=town)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return model_response(GroupStatsResponse.model_construct(
+        grouping=grouping, groups=[GroupStats.model_construct(**row._mapping) for row in groups]
+    ))
+
+
+@crud_router.patch("/properties/bulk", response_model=BulkWriteResult, status_code=status.HTTP_200_OK)
+def bulk_update_properties_endpoint(body: PropertyBulkUpdateRequest, db: Session = Depends(get_db),
+                                    token: str = Depends(get_current_user)):
+    """
+    Endpoint to set the same values on every property listed in `ids` or matching `filter`, with one
+    UPDATE in one transaction. Returns the number of properties updated.
+    """
+    filters = body.filter.dict() if body.filter is not None else None
+    values = body.values.dict(exclude_unset=True)
+    try:
+        affected = bulk_update_properties_db(db, values, ids=body.ids, filters=filters)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except IntegrityError as e:
+        # The transaction was rolled back, so no property was changed.
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail=f"Conflicts with existing properties: {e.orig}")
+    return {"affected": affected}
+
+
+@crud_router.delete("/properties/bulk", response_model=BulkWriteResult, status_code=status.HTTP_200_OK)
+def bulk_delete_properties_endpoint(body: PropertyBulkDeleteRequest, db: Session = Depends(get_db),
+                                    token: str = Depends(get_current_user)):
+    """
+    Endpoint to delete every property listed in `ids` or matching `filter`, with one DELETE in one
+    transaction. Returns the number of properties deleted.
+    """
+    filters = body.filter.dict() if body.filter is not None else None
+    try:
+        affected = bulk_delete_properties_db(db, ids=body.ids, filters=filters)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except IntegrityError as e:
+        # The transaction was rolled back, so no property was changed.
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail=f"Conflicts with existing properties: {e.orig}")
+    return {"affected": affected}
+
+
+@crud_router.get("/properties/{property_id}", response_model=PropertyListing, status_code=status.HTTP_200_OK)
 def read_property_endpoint(property_id: int, db: Session = Depends(get_db),
                            token: str = Depends(get_current_user)):
     """Endpoint to retrieve details of a specific property."""
     db_property = get_property_db(db, property_id=property_id)
     if db_property is None:
         raise HTTPException(status_code=404, detail="Property not found")
-    return jsonable_encoder(db_property)
+    return model_response(from_row(PropertyListing, db_property))
 
 
-@router.put("/properties/{property_id}", response_model=PropertyUpdate, status_code=status.HTTP_200_OK)
+@crud_router.put("/properties/{property_id}", response_model=PropertyUpdate, status_code=status.HTTP_200_OK)
 def update_property_endpoint(property_id: int, property_: PropertyUpdate, db: Session = Depends(get_db),
                              token: str = Depends(get_current_user)):
     """Endpoint to update details of a specific property."""
@@ -96,7 +379,7 @@ def update_property_endpoint(property_id: int, property_: PropertyUpdate, db: Se
     return db_property
 
 
-@router.delete("/properties/{property_id}", status_code=status.HTTP_204_NO_CONTENT)
+@crud_router.delete("/properties/{property_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_property_endpoint(property_id: int, db: Session = Depends(get_db),
                              token: str = Depends(get_current_user)):
     """Endpoint to delete a specific property."""
@@ -109,3 +392,9 @@ def delete_property_endpoint(property_id: int, db: Session = Depends(get_db),
 # def get_property_range_endpoint(db: Session = Depends(get_db), token: str = Depends(get_current_user)):
 #     """Endpoint to retrieve min and max values for property filters."""
 
+
+# Fixed paths on `router` must be matched before /properties/{property_id}, so app.main includes the CRUD
+# routes after it. They are not included into `router` here, since every include_router call rebuilds
+# each route it copies. With USE_ASYNC_DATABASE they are served by the async implementations instead.
+if settings.USE_ASYNC_DATABASE:
+    from app.api.endpoints.property_async import router as crud_router
@@ -0,0 +1,326 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.caching import conditional_response
+from app.api.exports import EXPORT_FORMATS, aiter_export, export_encoder
+from app.api.responses import cached_response, changes_response, from_row, model_response
+from app.core.auth import get_current_user
+from app.core.config import settings
+from app.crud.async_crud_property import (
+    create_property_db, get_property_db, get_properties_by_ids_db, update_property_db, delete_property_db,
+    get_properties_db, get_filtered_properties_db, get_property_value_range, get_properties_within_db,
+    iter_export_batches
+)
+from app.crud.crud_bulk import bulk_delete_properties_db, bulk_update_properties_db
+from app.crud.crud_changes import get_property_changes_db
+from app.crud.crud_clusters import get_property_clusters_db
+from app.crud.crud_facets import get_property_facets_db
+from app.crud.crud_stats import get_group_stats_db
+from app.crud.crud_property import EXPORT_COLUMNS, LISTING_COLUMNS, listing_cache, parse_bbox
+from app.crud.range_cache import range_etag
+from app.db.session import get_async_db
+from app.schemas.property import (
+    PropertyCreate, PropertyUpdate, PropertyBase,
+    PropertyListings, PropertyListing, PaginatedPropertyListingsResponse, PropertyBatchGetRequest,
+    PropertyBatchGetResponse, PropertyBulkUpdateRequest, PropertyBulkDeleteRequest, BulkWriteResult,
+    PropertyRangeSchema, PropertyChangesResponse,
+    PropertyCluster, PropertyClustersResponse, PropertyFacetsResponse, GroupStats, GroupStatsResponse
+)
+
+# Async versions of the CRUD routes in property.py, used when settings.USE_ASYNC_DATABASE is on.
+router = APIRouter()
+
+
+@router.post("/properties/", response_model=PropertyCreate, status_code=status.HTTP_201_CREATED)
+async def create_property_endpoint(property_: PropertyBase, db: AsyncSession = Depends(get_async_db),
+                                   token: str = Depends(get_current_user)):
+    """Endpoint to create a new property. Responds 409 if another property has the same PIN."""
+    try:
+        return await create_property_db(db=db, property=property_)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A property with this pin already exists")
+
+
+@router.post("/properties/batch-get", response_model=PropertyBatchGetResponse, status_code=status.HTTP_200_OK)
+async def batch_get_properties_endpoint(body: PropertyBatchGetRequest, db: AsyncSession = Depends(get_async_db),
+                                        token: str = Depends(get_current_user)):
+    """
+    Endpoint to retrieve up to `BATCH_GET_MAX_IDS` properties in one request. Results follow the
+    order of `ids`, with null entries for IDs that do not exist; those are also listed in `missing`.
+    """
+    if len(body.ids) > settings.BATCH_GET_MAX_IDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"At most {settings.BATCH_GET_MAX_IDS} ids may be requested at once")
+    rows = await get_properties_by_ids_db(db, body.ids)
+    return model_response(PropertyBatchGetResponse.model_construct(
+        properties=[from_row(PropertyListing, row) if row is not None else None for row in rows],
+        missing=[property_id for property_id, row in zip(body.ids, rows) if row is None]
+    ))
+
+
+@router.get("/properties/", response_model=List[PropertyBase], status_code=status.HTTP_200_OK)
+async def read_properties_endpoint(response: Response, skip: int = 0, limit: int = 100, cursor: str = None,
+                                   db: AsyncSession = Depends(get_async_db), token: str = Depends(get_current_user)):
+    """Endpoint to retrieve a list of properties. The next page's cursor is sent in the X-Next-Cursor header."""
+    try:
+        properties, next_cursor = await get_properties_db(db, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return properties
+
+
+@router.get("/properties_listings/", response_model=PaginatedPropertyListingsResponse,
+            status_code=status.HTTP_200_OK)
+async def read_property_listings_endpoint(
+    full_address: str = None, class_description: str = None,
+    estimated_market_value_min: int = None, estimated_market_value_max: int = None,
+    bldg_use: str = None, building_sq_ft_min: int = None, building_sq_ft_max: int = None,
+    skip: int = 0, limit: int = 25, cursor: str = None, sort_by: str = None, descending: bool = False,
+    exact_match: bool = False, db: AsyncSession = Depends(get_async_db), token: str = Depends(get_current_user)
+):
+    """
+    Endpoint to retrieve a filtered list of property listings. Pass `next_cursor` back as `cursor` for the next page.
+    Responses are served from the listing cache when possible; `X-Cache` tells whether this one was.
+    """
+    query = dict(
+        full_address=full_address, class_description=class_description,
+        estimated_market_value_min=estimated_market_value_min, estimated_market_value_max=estimated_market_value_max,
+        bldg_use=bldg_use, building_sq_ft_min=building_sq_ft_min, building_sq_ft_max=building_sq_ft_max,
+        skip=skip, limit=limit, cursor=cursor, sort_by=sort_by, descending=descending, exact_match=exact_match
+    )
+    cache_key = listing_cache.key(query)
+    cached = listing_cache.get(cache_key)
+    if cached is not None:
+        return cached_response(cached)
+    try:
+        properties, next_cursor = await get_filtered_properties_db(db, **query, columns=LISTING_COLUMNS)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    properties_models = [from_row(PropertyListings, row) for row in properties]
+    response = model_response(PaginatedPropertyListingsResponse.model_construct(
+        properties=properties_models, moreExists=next_cursor is not None, next_cursor=next_cursor
+    ))
+    listing_cache.set(cache_key, response.body)
+    response.headers["X-Cache"] = "MISS"
+    return response
+
+
+@router.get("/properties/range", response_model=PropertyRangeSchema)
+async def get_property_range_endpoint(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """Endpoint to retrieve min and max values for property filters. Supports revalidation with If-None-Match."""
+    range_values = await get_property_value_range(db)
+    not_modified = conditional_response(
+        request, response, range_etag(range_values), f"public, max-age={settings.RANGE_CACHE_MAX_AGE}"
+    )
+    return not_modified or range_values
+
+
+@router.get("/properties/within", response_model=PaginatedPropertyListingsResponse,
+            status_code=status.HTTP_200_OK)
+async def read_properties_within_endpoint(
+    bbox: str = None, lat: float = None, lon: float = None, radius: float = None, limit: int = 500,
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(get_current_user)
+):
+    """
+    Endpoint to retrieve the properties shown on a map view: those inside `bbox` ("west,south,east,north"
+    in degrees), or within `radius` metres of `lat`/`lon`, nearest first.
+    """
+    if not 0 < limit <= settings.WITHIN_MAX_RESULTS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"limit must be between 1 and {settings.WITHIN_MAX_RESULTS}")
+    try:
+        properties, more_exists = await get_properties_within_db(
+            db, bbox=parse_bbox(bbox) if bbox else None, latitude=lat, longitude=lon, radius=radius, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return model_response(PaginatedPropertyListingsResponse.model_construct(
+        properties=[from_row(PropertyListings, row) for row in properties], moreExists=more_exists, next_cursor=None
+    ))
+
+
+async def _export_batches(filters: dict):
+    # The request's session is closed when the endpoint returns, before the body is streamed,
+    # so the export reads through a session of its own.
+    from app.db.async_database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        async for batch in iter_export_batches(db, settings.EXPORT_BATCH_SIZE, **filters):
+            yield batch
+
+
+@router.get("/properties/changes", response_model=PropertyChangesResponse, status_code=status.HTTP_200_OK)
+async def read_property_changes_endpoint(since: int = 0, limit: int = 1000, db: AsyncSession = Depends(get_async_db),
+                                         token: str = Depends(get_current_user)):
+    """
+    Endpoint to retrieve properties written or deleted since a version, for incremental syncing.
+    Start from `since=0` and pass `next_since` back as `since` until `moreExists` is false.
+    """
+    if since < 0 or not 1 <= limit <= settings.CHANGES_MAX_LIMIT:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"since must be >= 0 and limit between 1 and {settings.CHANGES_MAX_LIMIT}")
+    changes, next_since, more_exists = await db.run_sync(get_property_changes_db, since, limit)
+    return model_response(changes_response(changes, next_since, more_exists))
+
+
+@router.get("/properties/export", status_code=status.HTTP_200_OK)
+async def export_properties_endpoint(
+    full_address: str = None, class_description: str = None,
+    estimated_market_value_min: int = None, estimated_market_value_max: int = None,
+    bldg_use: str = None, building_sq_ft_min: int = None, building_sq_ft_max: int = None,
+    exact_match: bool = False, export_format: str = Query("csv", alias="format"),
+    token: str = Depends(get_current_user)
+):
+    """
+    Endpoint to download every property matching the listing filters as CSV, NDJSON or Parquet.
+
+    The rows are read from a cursor and encoded a batch of `EXPORT_BATCH_SIZE` at a time while the
+    response is sent, so memory use does not grow with the size of the export.
+    """
+    try:
+        encoder = export_encoder(export_format, EXPORT_COLUMNS)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    filters = dict(
+        full_address=full_address, class_description=class_description,
+        estimated_market_value_min=estimated_market_value_min, estimated_market_value_max=estimated_market_value_max,
+        bldg_use=bldg_use, building_sq_ft_min=building_sq_ft_min, building_sq_ft_max=building_sq_ft_max,
+        exact_match=exact_match,
+    )
+    media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(aiter_export(encoder, _export_batches(filters)), media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="properties.{extension}"'})
+
+
+@router.get("/properties/clusters", response_model=PropertyClustersResponse, status_code=status.HTTP_200_OK)
+async def read_property_clusters_endpoint(zoom: int, bbox: str, db: AsyncSession = Depends(get_async_db),
+                                           token: str = Depends(get_current_user)):
+    """
+    Endpoint to retrieve marker clusters for a map view: count, centroid and median estimated market value
+    per grid cell of `bbox` ("west,south,east,north" in degrees) at `zoom`.
+    """
+    try:
+        clusters = await db.run_sync(get_property_clusters_db, zoom, parse_bbox(bbox))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return model_response(PropertyClustersResponse.model_construct(
+        zoom=zoom, clusters=[from_row(PropertyCluster, row) for row in clusters]
+    ))
+
+
+@router.get("/properties/facets", response_model=PropertyFacetsResponse, status_code=status.HTTP_200_OK)
+async def read_property_facets_endpoint(
+    full_address: str = None, class_description: str = None,
+    estimated_market_value_min: int = None, estimated_market_value_max: int = None,
+    bldg_use: str = None, building_sq_ft_min: int = None, building_sq_ft_max: int = None,
+    exact_match: bool = False, buckets: int = 10, facet_limit: int = 50,
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(get_current_user)
+):
+    """
+    Endpoint to retrieve value counts for class description and building use, and histograms of
+    estimated market value and building square footage, for the properties matching the listing filters.
+    """
+    if not (1 <= buckets <= 100 and 1 <= facet_limit <= 1000):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="buckets must be between 1 and 100 and facet_limit between 1 and 1000")
+    return await db.run_sync(
+        get_property_facets_db, full_address=full_address, class_description=class_description,
+        estimated_market_value_min=estimated_market_value_min, estimated_market_value_max=estimated_market_value_max,
+        bldg_use=bldg_use, building_sq_ft_min=building_sq_ft_min, building_sq_ft_max=building_sq_ft_max,
+        exact_match=exact_match, buckets=buckets, facet_limit=facet_limit
+    )
+
+
+@router.get("/properties/stats/{grouping}", response_model=GroupStatsResponse, status_code=status.HTTP_200_OK)
+async def read_group_stats_endpoint(grouping: str, town: int = None, db: AsyncSession = Depends(get_async_db),
+                                    token: str = Depends(get_current_user)):
+    """
+    Endpoint to retrieve summary statistics (median values, assessment change, sale ratio) per town,
+    neighborhood or tax code, optionally limited to one town.
+    """
+    try:
+        groups = await db.run_sync(get_group_stats_db, grouping, town=town)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return model_response(GroupStatsResponse.model_construct(
+        grouping=grouping, groups=[GroupStats.model_construct(**row._mapping) for row in groups]
+    ))
+
+
+@router.patch("/properties/bulk", response_model=BulkWriteResult, status_code=status.HTTP_200_OK)
+async def bulk_update_properties_endpoint(body: PropertyBulkUpdateRequest, db: AsyncSession = Depends(get_async_db),
+                                          token: str = Depends(get_current_user)):
+    """
+    Endpoint to set the same values on every property listed in `ids` or matching `filter`, with one
+    UPDATE in one transaction. Returns the number of properties updated.
+    """
+    filters = body.filter.dict() if body.filter is not None else None
+    values = body.values.dict(exclude_unset=True)
+    try:
+        affected = await db.run_sync(bulk_update_properties_db, values, ids=body.ids, filters=filters)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except IntegrityError as e:
+        # The transaction was rolled back, so no property was changed.
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail=f"Conflicts with existing properties: {e.orig}")
+    return {"affected": affected}
+
+
+@router.delete("/properties/bulk", response_model=BulkWriteResult, status_code=status.HTTP_200_OK)
+async def bulk_delete_properties_endpoint(body: PropertyBulkDeleteRequest, db: AsyncSession = Depends(get_async_db),
+                                          token: str = Depends(get_current_user)):
+    """
+    Endpoint to delete every property listed in `ids` or matching `filter`, with one DELETE in one
+    transaction. Returns the number of properties deleted.
+    """
+    filters = body.filter.dict() if body.filter is not None else None
+    try:
+        affected = await db.run_sync(bulk_delete_properties_db, ids=body.ids, filters=filters)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except IntegrityError as e:
+        # The transaction was rolled back, so no property was changed.
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail=f"Conflicts with existing properties: {e.orig}")
+    return {"affected": affected}
+
+
+@router.get("/properties/{property_id}", response_model=PropertyListing, status_code=status.HTTP_200_OK)
+async def read_property_endpoint(property_id: int, db: AsyncSession = Depends(get_async_db),
+                                 token: str = Depends(get_current_user)):
+    """Endpoint to retrieve details of a specific property."""
+    db_property = await get_property_db(db, property_id=property_id)
+    if db_property is None:
+        raise HTTPException(status_code=404, detail="Property not found")
+    return model_response(from_row(PropertyListing, db_property))
+
+
+@router.put("/properties/{property_id}", response_model=PropertyUpdate, status_code=status.HTTP_200_OK)
+async def update_property_endpoint(property_id: int, property_: PropertyUpdate,
+                                   db: AsyncSession = Depends(get_async_db), token: str = Depends(get_current_user)):
+    """Endpoint to update details of a specific property."""
+    db_property = await update_property_db(db=db, property_id=property_id, property=property_)
+    if db_property is None:
+        raise HTTPException(status_code=404, detail="Property not found")
+    return db_property
+
+
+@router.delete("/properties/{property_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_property_endpoint(property_id: int, db: AsyncSession = Depends(get_async_db),
+                                   token: str = Depends(get_current_user)):
+    """Endpoint to delete a specific property."""
+    success = await delete_property_db(db, property_id=property_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Property not found")
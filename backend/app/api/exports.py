@@ -0,0 +1,162 @@
+import csv
+import io
+from typing import AsyncIterator, Iterator
+
+import orjson
+from sqlalchemy import Column, Date, DateTime, Float, Integer
+
+# Export formats: media type and file extension.
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class CsvEncoder:
+    """Encode row batches as CSV, with a header row of the column names."""
+
+    def __init__(self, columns: tuple):
+        self._names = [column.key for column in columns]
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def begin(self) -> bytes:
+        self._writer.writerow(self._names)
+        return self._drain()
+
+    def encode(self, rows: list) -> bytes:
+        self._writer.writerows(rows)
+        return self._drain()
+
+    def end(self) -> bytes:
+        return b""
+
+
+class NdjsonEncoder:
+    """Encode row batches as one JSON object per line."""
+
+    def __init__(self, columns: tuple):
+        self._names = [column.key for column in columns]
+
+    def begin(self) -> bytes:
+        return b""
+
+    def encode(self, rows: list) -> bytes:
+        names = self._names
+        return b"".join(orjson.dumps(dict(zip(names, row)), option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+    def end(self) -> bytes:
+        return b""
+
+
+class _ChunkSink:
+    """Write-only file collecting what Parquet writes until it is drained, while reporting the total offset."""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ParquetEncoder:
+    """Encode row batches as a Parquet file with one row group per batch."""
+
+    def __init__(self, columns: tuple):
+        # Imported here so pyarrow is only required for Parquet exports.
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([(column.key, self._arrow_type(column)) for column in columns])
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(pa.PythonFile(self._sink, mode="w"), self._schema)
+
+    def _arrow_type(self, column: Column):
+        pa = self._pa
+        if isinstance(column.type, Integer):
+            return pa.int64()
+        if isinstance(column.type, Float):
+            return pa.float64()
+        if isinstance(column.type, DateTime):
+            return pa.timestamp("us")
+        if isinstance(column.type, Date):
+            return pa.date32()
+        return pa.string()
+
+    def begin(self) -> bytes:
+        return self._sink.drain()
+
+    def encode(self, rows: list) -> bytes:
+        arrays = [self._pa.array(values, type=field.type) for values, field in zip(zip(*rows), self._schema)]
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+        return self._sink.drain()
+
+    def end(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+_ENCODERS = {"csv": CsvEncoder, "ndjson": NdjsonEncoder, "parquet": ParquetEncoder}
+
+
+def export_encoder(export_format: str, columns: tuple):
+    """
+    Create the encoder of an export format.
+
+    Parameters:
+        export_format (str): Key of `EXPORT_FORMATS`.
+        columns (tuple): Columns of the exported rows, in row order.
+
+    Raises:
+        ValueError: If the format is unknown or its library is not installed.
+    """
+    if export_format not in _ENCODERS:
+        raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    try:
+        return _ENCODERS[export_format](columns)
+    except ImportError:
+        raise ValueError(f"{export_format} exports need pyarrow installed")
+
+
+def iter_export(encoder, batches: Iterator[list]) -> Iterator[bytes]:
+    """Encode a stream of row batches into the chunks of an export file, one chunk per batch."""
+    yield encoder.begin()
+    for rows in batches:
+        yield encoder.encode(rows)
+    yield encoder.end()
+
+
+async def aiter_export(encoder, batches: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    """Async counterpart of `iter_export`."""
+    yield encoder.begin()
+    async for rows in batches:
+        yield encoder.encode(rows)
+    yield encoder.end()
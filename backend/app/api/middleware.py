@@ -0,0 +1,47 @@
+import time
+
+from ..core.metrics import REQUEST_LATENCY, REQUEST_QUERIES, RequestQueries, current_request_queries
+
+# Route label for requests no route matched, so unknown paths cannot grow the label set.
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording each request's latency and database queries by route template.
+
+    Latency runs until the response body is complete, so streamed responses count their whole
+    transfer. The response also carries a Server-Timing header with the time and number of queries
+    spent before it started; queries run while a streamed body is produced are only in the metrics.
+    """
+
+    def __init__(self, app, excluded_paths: tuple = ("/metrics", "/ready")):
+        self.app = app
+        self.excluded_paths = excluded_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = current_request_queries.set(queries)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                header = f'db;dur={queries.seconds * 1000:.1f};desc="{queries.count} queries"'
+                message["headers"] = [*message.get("headers", []), (b"server-timing", header.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request_queries.reset(token)
+            # The router records the matched route in the scope it was given.
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            REQUEST_LATENCY.observe(time.perf_counter() - started, scope["method"], route, str(status_code))
+            REQUEST_QUERIES.observe(queries.count, scope["method"], route)
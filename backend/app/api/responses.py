@@ -0,0 +1,59 @@
+from typing import Type
+
+from fastapi import Response, status
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from app.schemas.property import PropertyChange, PropertyChangesResponse, PropertyListing
+
+
+def from_row(schema: Type[BaseModel], row) -> BaseModel:
+    """
+    Build a response model from a database row without validating it.
+
+    Rows read back from the properties table already satisfy the schemas they are served with, so
+    validating them again only costs time. Do not use this for data that did not come from the database.
+
+    Parameters:
+        schema (Type[BaseModel]): Response model to build.
+        row: ORM instance or result row (e.g. from a column projection) holding the schema's fields.
+
+    Returns:
+        BaseModel: An instance of `schema` made with `model_construct`.
+    """
+    mapping = getattr(row, "_mapping", None)
+    if mapping is not None:
+        return schema.model_construct(**{name: mapping[name] for name in schema.model_fields})
+    return schema.model_construct(**{name: getattr(row, name) for name in schema.model_fields})
+
+
+def model_response(model: BaseModel, status_code: int = status.HTTP_200_OK) -> ORJSONResponse:
+    """
+    Serialize a response model once with orjson.
+
+    Returning a Response skips FastAPI's response_model validation and encoding, which would
+    otherwise run a second time over an already built model. The route's response_model is still
+    used for the OpenAPI schema.
+    """
+    return ORJSONResponse(model.model_dump(), status_code=status_code)
+
+
+def cached_response(body: bytes) -> Response:
+    """Serve a JSON body kept by a response cache, marked with `X-Cache: HIT`."""
+    return Response(body, media_type="application/json", headers={"X-Cache": "HIT"})
+
+
+def changes_response(changes: list, next_since: int, more_exists: bool) -> PropertyChangesResponse:
+    """Build the change feed response from the result of `crud_changes.get_property_changes_db`."""
+    return PropertyChangesResponse.model_construct(
+        changes=[
+            PropertyChange.model_construct(
+                version=version, id=row.id, deleted=False, updated_at=row.updated_at,
+                property=from_row(PropertyListing, row)
+            ) if row is not None else PropertyChange.model_construct(
+                version=version, id=tombstone.id, deleted=True, updated_at=tombstone.deleted_at, property=None
+            )
+            for version, row, tombstone in changes
+        ],
+        next_since=next_since, moreExists=more_exists
+    )
@@ -0,0 +1,63 @@
+import csv
+import json
+from typing import AsyncIterator
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines without holding more than one partial line in memory."""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8-sig").rstrip("\r")
+
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator:
+    """Yield one parsed JSON value per non-blank line; unparseable lines are yielded as None."""
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes], delimiter: str = ",") -> AsyncIterator:
+    """
+    Yield one dict per CSV record, keyed by the header row.
+
+    Lines are joined until their quotes balance, so quoted fields may contain newlines.
+    Records with a different number of fields than the header are yielded as None.
+    """
+    header, record = None, ""
+    async for line in iter_lines(chunks):
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        if not record.strip():
+            record = ""
+            continue
+        fields = next(csv.reader([record], delimiter=delimiter))
+        record = ""
+        if header is None:
+            header = fields
+        elif len(fields) != len(header):
+            yield None
+        else:
+            yield dict(zip(header, fields))
+
+
+async def iter_batches(records: AsyncIterator, size: int) -> AsyncIterator[list]:
+    """Group an async record stream into lists of at most `size` records."""
+    batch = []
+    async for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -3,13 +3,23 @@ from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials, OAuth2PasswordBearer
-from jose import JWTError, jwt
 import secrets
 
+from app.core.config import settings
+from app.core.token_cache import VerifiedTokenCache
+
 # Constants for JWT token creation and verification
 SECRET_KEY = "a very secret key"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 5  # token expiry limit in minutes
+REFRESH_TOKEN_EXPIRE_MINUTES = settings.REFRESH_TOKEN_EXPIRE_MINUTES  # 0 disables refresh tokens
+
+# Value of the "type" claim. Tokens issued before refresh tokens existed have none and count as access tokens.
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+# Access tokens that already passed `verify_token`, so repeat requests skip decoding them.
+token_cache = VerifiedTokenCache(max_entries=settings.TOKEN_CACHE_SIZE)
 
 # Initialize HTTPBasic auth scheme
 security = HTTPBasic()
@@ -54,31 +64,91 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta if expires_delta else timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
+    # python-jose is imported on first use rather than with the app, keeping it out of startup.
+    from jose import jwt
+
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-def verify_token(token: str, credentials_exception: HTTPException) -> str:
+def create_refresh_token(data: dict) -> str:
+    """
+    Create a refresh token, which `/token/refresh` exchanges for a new access token.
+
+    Parameters:
+        data (dict): The payload data to include in the token.
+
+    Returns:
+        str: The encoded JWT refresh token.
+    """
+    return create_access_token({**data, "type": REFRESH_TOKEN}, timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES))
+
+
+def issue_tokens(username: str) -> dict:
+    """
+    Build the token response for a user: an access token, plus a refresh token when they are enabled.
+
+    Parameters:
+        username (str): Subject of the tokens.
+
+    Returns:
+        dict: The token response body.
+    """
+    tokens = {
+        "access_token": create_access_token(
+            data={"sub": username}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        ),
+        "token_type": "bearer",
+    }
+    if REFRESH_TOKEN_EXPIRE_MINUTES > 0:
+        tokens["refresh_token"] = create_refresh_token(data={"sub": username})
+    return tokens
+
+
+def invalid_credentials() -> HTTPException:
+    """Build the 401 raised for a missing, invalid or expired token."""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def verify_token(token: str, credentials_exception: Optional[HTTPException] = None,
+                 token_type: str = ACCESS_TOKEN) -> str:
     """
     Verifies the given JWT token.
 
+    Access tokens that verified before are answered from `token_cache` until they expire.
+
     Args:
         token (str): The JWT token to be verified.
-        credentials_exception (HTTPException): The exception to be raised in case of failure.
+        credentials_exception (HTTPException, optional): The exception to be raised in case of failure.
+            Defaults to the one built by `invalid_credentials`, which is only created when verification fails.
+        token_type (str, optional): Expected "type" claim, ACCESS_TOKEN or REFRESH_TOKEN. Defaults to ACCESS_TOKEN.
 
     Returns:
         str: The username extracted from the token payload if verification is successful.
 
     Raises:
-        credentials_exception: If the token is invalid or the username is not found in the token payload.
+        credentials_exception: If the token is invalid, of the wrong type or the username is not found
+            in the token payload.
     """
+    if token_type == ACCESS_TOKEN:
+        username = token_cache.get(token)
+        if username is not None:
+            return username
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise credentials_exception or invalid_credentials()
+    username = payload.get("sub")
+    if username is None or payload.get("type", ACCESS_TOKEN) != token_type:
+        raise credentials_exception or invalid_credentials()
+    if token_type == ACCESS_TOKEN:
+        token_cache.put(token, username, payload["exp"])
     return username
 
 
@@ -95,9 +165,4 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> str:
     Raises:
         HTTPException: If the token verification fails.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    return verify_token(token, credentials_exception)
+    return verify_token(token)
@@ -1,5 +1,23 @@
 import os
 
+# Async drivers substituted for the sync ones when USE_ASYNC_DATABASE is on.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Rewrite a sync database URL to use the matching async driver."""
+    scheme, separator, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{separator}{rest}"
+
+
+def env_flag(name: str, default: str = "false") -> bool:
+    """Read a boolean environment variable such as "1", "true" or "yes"."""
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
 
 class Settings:
     PROJECT_NAME: str = "Property Finder"
@@ -10,5 +28,74 @@ class Settings:
 
     DATABASE_URL: str = os.getenv("DATABASE_URL", PRODUCTION_DATABASE_URL)
 
+    # Connection pool. Sizes are per process; SQLite in-memory databases ignore them.
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING: bool = env_flag("DB_POOL_PRE_PING", "true")
+    # Threads serving the sync routes, per worker process. Each holds at most one pooled connection, so by
+    # default there are as many threads as connections; more would only queue for the pool.
+    THREADPOOL_SIZE: int = int(os.getenv("THREADPOOL_SIZE", DB_POOL_SIZE + DB_MAX_OVERFLOW))
+
+    # Pragmas applied to every SQLite connection. WAL lets readers run alongside the single writer,
+    # and synchronous=NORMAL is durable across application crashes in WAL mode.
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+
+    # Serve the property CRUD routes with async sessions (aiosqlite / asyncpg) instead of sync ones.
+    USE_ASYNC_DATABASE: bool = env_flag("USE_ASYNC_DATABASE")
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", async_database_url(DATABASE_URL))
+
+    # Seconds a cached /properties/range summary is trusted before it is re-read from the database.
+    RANGE_CACHE_TTL_SECONDS: int = int(os.getenv("RANGE_CACHE_TTL_SECONDS", 60))
+    # max-age sent to clients for /properties/range; they revalidate with the ETag afterwards.
+    RANGE_CACHE_MAX_AGE: int = int(os.getenv("RANGE_CACHE_MAX_AGE", 60))
+
+    # Encoded /properties_listings/ responses kept by the read-through listing cache; 0 turns it off.
+    LISTING_CACHE_SIZE: int = int(os.getenv("LISTING_CACHE_SIZE", 1024))
+    # Seconds a cached listing is served; bounds how long writes made outside the CRUD functions go unseen.
+    LISTING_CACHE_TTL_SECONDS: float = float(os.getenv("LISTING_CACHE_TTL_SECONDS", 30))
+    # Redis-compatible server shared by every process (e.g. redis://cache:6379/0); empty keeps the cache in-process.
+    LISTING_CACHE_URL: str = os.getenv("LISTING_CACHE_URL", "")
+    # Worker processes serving the app, as read by gunicorn.conf.py and uvicorn (set it rather than passing
+    # `uvicorn --workers`, which leaves it unset). A worker only sees its own writes, so with more than one the
+    # in-process caches above are turned off (see crud_property).
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", 1))
+
+    # Rows validated and committed together by POST /properties/bulk.
+    BULK_BATCH_SIZE: int = int(os.getenv("BULK_BATCH_SIZE", 1000))
+    # Per-row errors returned by a bulk request before further ones are only counted.
+    BULK_MAX_REPORTED_ERRORS: int = int(os.getenv("BULK_MAX_REPORTED_ERRORS", 10000))
+
+    # Most IDs one POST /properties/batch-get request may ask for.
+    BATCH_GET_MAX_IDS: int = int(os.getenv("BATCH_GET_MAX_IDS", 1000))
+
+    # Most changes one GET /properties/changes request may return.
+    CHANGES_MAX_LIMIT: int = int(os.getenv("CHANGES_MAX_LIMIT", 10000))
+
+    # Rows fetched from the database and encoded per chunk of a GET /properties/export stream.
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+    # Most properties GET /properties/within returns for one map view.
+    WITHIN_MAX_RESULTS: int = int(os.getenv("WITHIN_MAX_RESULTS", 5000))
+
+    # Most grid cells one GET /properties/clusters request may cover.
+    CLUSTER_MAX_CELLS: int = int(os.getenv("CLUSTER_MAX_CELLS", 4096))
+
+    # Record request latency and database query metrics, served in the Prometheus text format at /metrics.
+    METRICS_ENABLED: bool = env_flag("METRICS_ENABLED", "true")
+    # Statements taking at least this many milliseconds are logged to "app.slow_queries"; 0 turns the log off.
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", 500))
+    # Include the database's query plan in slow-query log entries.
+    SLOW_QUERY_EXPLAIN: bool = env_flag("SLOW_QUERY_EXPLAIN", "true")
+
+    # Lifetime of refresh tokens issued by /token; 0 turns refresh tokens off.
+    REFRESH_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", 24 * 60))
+    # Verified access tokens remembered per process, so each request does not decode its token again.
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", 4096))
+
 
 settings = Settings()
@@ -0,0 +1,223 @@
+"""Async counterparts of the functions in crud_property, sharing its statements and caches."""
+from typing import AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.crud_property import (
+    EXPORT_COLUMNS, LISTING_COLUMNS, LISTING_FIELDS, default_listing_sort, export_statement, listing_cache,
+    listing_statement, page_statements, range_cache, split_page, within_statement
+)
+from app.crud.range_cache import range_values
+from app.models.models import Property
+
+
+async def paginate(db: AsyncSession, statement, sort_by: str = "id", descending: bool = False, cursor: str = None,
+                   skip: int = 0, limit: int = 100, rank=None, projected: bool = False) -> tuple:
+    """
+    Fetch one page of a Property select. Parameters are as for `crud_property.paginate`.
+
+    Returns:
+        tuple: The page of Property instances (or column rows when projected) and the cursor for the
+        next page, or None on the last page.
+    """
+    rows = []
+    for page_statement in page_statements(statement, sort_by, descending, cursor, skip, limit, rank):
+        rows.extend((await db.execute(page_statement.limit(limit + 1 - len(rows)))).all())
+        if len(rows) > limit:
+            break
+    return split_page(rows, sort_by, descending, limit, projected)
+
+
+async def get_property_db(db: AsyncSession, property_id: int) -> Property:
+    """
+    Retrieve a single property by its ID.
+
+    Parameters:
+        db (AsyncSession): SQLAlchemy async database session.
+        property_id (int): Unique identifier of the property.
+
+    Returns:
+        Property: An instance of the Property model.
+    """
+    result = await db.execute(select(Property).where(Property.id == property_id))
+    return result.scalars().first()
+
+
+async def get_properties_by_ids_db(db: AsyncSession, property_ids: list, columns: tuple = EXPORT_COLUMNS) -> list:
+    """
+    Retrieve many properties by their IDs with a single query. Parameters are as for
+    `crud_property.get_properties_by_ids_db`.
+
+    Returns:
+        list: One row per requested ID, in request order, with None where no property has that ID.
+    """
+    result = await db.execute(select(*columns).where(Property.id.in_(sorted(set(property_ids)))))
+    found = {row.id: row for row in result.all()}
+    return [found.get(property_id) for property_id in property_ids]
+
+
+async def get_properties_db(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: str = None) -> tuple:
+    """
+    Retrieve a page of properties ordered by ID.
+
+    Parameters:
+        db (AsyncSession): SQLAlchemy async database session.
+        skip (int): Number of records to skip when no cursor is given (default is 0).
+        limit (int): Maximum number of records to return (default is 100).
+        cursor (str): Cursor returned with the previous page (optional).
+
+    Returns:
+        tuple: A list of Property instances and the cursor for the next page, or None on the last page.
+    """
+    return await paginate(db, select(Property), cursor=cursor, skip=skip, limit=limit)
+
+
+async def create_property_db(db: AsyncSession, property: Property) -> Property:
+    """
+    Create a new property in the database.
+
+    Parameters:
+        db (AsyncSession): SQLAlchemy async database session.
+        property (Property): Property data to create.
+
+    Returns:
+        Property: The newly created Property instance.
+    """
+    db_property = Property(**property.dict())
+    db.add(db_property)
+    await db.commit()
+    await db.refresh(db_property)
+    range_cache.observe_insert(range_values(db_property))
+    listing_cache.invalidate()
+    return db_property
+
+
+async def update_property_db(db: AsyncSession, property_id: int, property: Property) -> Property:
+    """
+    Update an existing property by its ID.
+
+    Parameters:
+        db (AsyncSession): SQLAlchemy async database session.
+        property_id (int): Unique identifier of the property to update.
+        property (Property): New data for the property.
+
+    Returns:
+        Property: The updated Property instance, or None if not found.
+    """
+    db_property = await get_property_db(db, property_id=property_id)
+    if not db_property:
+        return None
+
+    before = range_values(db_property)
+    update_data = property.dict(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(db_property, key, value)
+    # The row no longer holds what was imported, so the next upsert must rewrite it.
+    db_property.content_hash = None
+
+    db.add(db_property)
+    await db.commit()
+    await db.refresh(db_property)
+    range_cache.observe_update(before, range_values(db_property))
+    if LISTING_FIELDS.intersection(update_data):
+        listing_cache.invalidate()
+    return db_property
+
+
+async def delete_property_db(db: AsyncSession, property_id: int) -> bool:
+    """
+    Delete a property by its ID.
+
+    Parameters:
+        db (AsyncSession): SQLAlchemy async database session.
+        property_id (int): Unique identifier of the property to delete.
+
+    Returns:
+        bool: True if the property was deleted, False otherwise.
+    """
+    db_property = await get_property_db(db, property_id=property_id)
+    if db_property is not None:
+        removed = range_values(db_property)
+        await db.delete(db_property)
+        await db.commit()
+        range_cache.observe_delete(removed)
+        listing_cache.invalidate()
+        return True
+    return False
+
+
+async def get_filtered_properties_db(
+        db: AsyncSession,
+        full_address: str = None,
+        class_description: str = None,
+        estimated_market_value_min: int = None,
+        estimated_market_value_max: int = None,
+        bldg_use: str = None,
+        building_sq_ft_min: int = None,
+        building_sq_ft_max: int = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str = None,
+        sort_by: str = None,
+        descending: bool = False,
+        exact_match: bool = False,
+        columns: tuple = None
+) -> tuple:
+    """
+    Retrieve a filtered list of properties. Parameters are as for `crud_property.get_filtered_properties_db`.
+
+    Returns:
+        tuple: A list of filtered Property instances (or column rows when `columns` is given) and the cursor
+        for the next page, or None on the last page.
+    """
+    statement, rank = listing_statement(
+        db.bind.dialect.name, full_address=full_address, class_description=class_description,
+        estimated_market_value_min=estimated_market_value_min, estimated_market_value_max=estimated_market_value_max,
+        bldg_use=bldg_use, building_sq_ft_min=building_sq_ft_min, building_sq_ft_max=building_sq_ft_max,
+        exact_match=exact_match, columns=columns
+    )
+    if sort_by is None:
+        sort_by = default_listing_sort(full_address, class_description, bldg_use, exact_match)
+
+    return await paginate(db, statement, sort_by=sort_by, descending=descending, cursor=cursor, skip=skip,
+                          limit=limit, rank=rank, projected=columns is not None)
+
+
+async def get_properties_within_db(
+        db: AsyncSession,
+        bbox: tuple = None,
+        latitude: float = None,
+        longitude: float = None,
+        radius: float = None,
+        limit: int = 500,
+        columns: tuple = LISTING_COLUMNS
+) -> tuple:
+    """
+    Retrieve the properties inside a bounding box or a circle. Parameters are as for
+    `crud_property.get_properties_within_db`.
+
+    Returns:
+        tuple: A list of rows and whether more properties matched than were returned.
+    """
+    statement = within_statement(db.bind.dialect.name, bbox, latitude, longitude, radius, columns)
+    rows = (await db.execute(statement.limit(limit + 1))).all()
+    return rows[:limit], len(rows) > limit
+
+
+async def iter_export_batches(db: AsyncSession, batch_size: int = 1000, **filters) -> AsyncIterator[list]:
+    """
+    Stream the properties matching a set of listing filters as lists of at most `batch_size` rows.
+    Parameters are as for `crud_property.iter_export_batches`.
+    """
+    result = await db.stream(export_statement(db.bind.dialect.name, batch_size, **filters))
+    try:
+        async for batch in result.partitions():
+            yield batch
+    finally:
+        await result.close()
+
+
+async def get_property_value_range(db: AsyncSession) -> dict:
+    """Retrieve the minimum and maximum values for estimated market value and building square footage."""
+    return await range_cache.get_async(db)
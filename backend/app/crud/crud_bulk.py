@@ -0,0 +1,321 @@
+import hashlib
+import re
+from collections import Counter
+from datetime import date, datetime
+from typing import get_args
+
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.crud.crud_property import LISTING_FIELDS, listing_cache, listing_statement, range_cache
+from app.crud.range_cache import RANGE_COLUMNS
+from app.models.models import Property
+from app.schemas.property import PropertyBase
+
+
+# IDs or PINs matched per statement of a bulk write or upsert lookup, under SQLite's bound parameter limit.
+BULK_WRITE_CHUNK = 10000
+
+# Columns whose values make up a row's content hash, in a fixed order.
+HASHED_FIELDS = tuple(PropertyBase.model_fields)
+
+# Whole numbers written with periods between groups of thousands ("1.302.750"), as in the assessor exports.
+# Only bulk ingest reads them this way; PropertyBase itself rejects them like any other fractional string.
+THOUSANDS_GROUPED_INT = r"[+-]?\d{1,3}(?:\.\d{3})+"
+
+# PropertyBase fields holding whole numbers.
+INT_FIELDS = frozenset(
+    name for name, field in PropertyBase.model_fields.items() if int in (field.annotation, *get_args(field.annotation))
+)
+
+
+def normalize_field_name(name: str) -> str:
+    """Map an assessor file header such as "Full Address" or "BLDG_USE" to its PropertyBase field name."""
+    return name.strip().lower().replace(" ", "_")
+
+
+def ungroup_thousands(name: str, value):
+    """Drop the periods from a period-grouped whole number in an integer field; other values are returned as is."""
+    if name in INT_FIELDS and isinstance(value, str) and re.fullmatch(THOUSANDS_GROUPED_INT, value.strip()):
+        return value.strip().replace(".", "")
+    return value
+
+
+def validate_batch(records: list, first_row: int) -> tuple:
+    """
+    Validate a batch of raw records against PropertyBase, reading period-grouped thousands in integer fields.
+
+    Parameters:
+        records (list): Raw records keyed by field or header name.
+        first_row (int): 1-based row number of the first record, used in error reports.
+
+    Returns:
+        tuple: The valid rows as column dicts, and an error report for each rejected row.
+    """
+    rows, errors = [], []
+    for row_number, record in enumerate(records, start=first_row):
+        if not isinstance(record, dict):
+            errors.append({"row": row_number, "errors": [{"msg": "Row is not an object"}]})
+            continue
+        try:
+            fields = {normalize_field_name(key): value for key, value in record.items()}
+            validated = PropertyBase(**{name: ungroup_thousands(name, value) for name, value in fields.items()})
+        except ValidationError as e:
+            errors.append({"row": row_number, "errors": e.errors(include_url=False, include_context=False)})
+            continue
+        rows.append(validated.dict())
+    return rows, errors
+
+
+def bulk_insert_properties_db(db: Session, rows: list) -> int:
+    """
+    Insert validated rows with a single executemany and commit them as one transaction.
+
+    Parameters:
+        db (Session): SQLAlchemy database session.
+        rows (list): Column dicts as produced by `validate_batch`.
+
+    Returns:
+        int: The number of rows inserted.
+    """
+    if not rows:
+        return 0
+    db.execute(insert(Property), [{**row, "content_hash": content_hash(row)} for row in rows])
+    db.commit()
+    _observe_inserted(rows)
+    return len(rows)
+
+
+def _observe_inserted(rows: list) -> None:
+    """Widen the cached value ranges to the extremes of newly inserted rows and drop cached listings."""
+    listing_cache.invalidate()
+    for bound in (min, max):
+        range_cache.observe_insert({
+            column: bound((value for row in rows if (value := row.get(column)) is not None), default=None)
+            for column in RANGE_COLUMNS
+        })
+
+
+def _canonical(value) -> str:
+    if value is None:
+        return "\x00"
+    if isinstance(value, datetime):
+        # Date columns arrive as datetimes from PropertyBase and as dates from the offline importer.
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def content_hash(row: dict) -> str:
+    """
+    Digest a row's column values, so an upsert can tell an unchanged row from a changed one.
+
+    Values are compared as text, so the API and offline importer, which coerce some columns to
+    different Python types, produce the same digest for the same data.
+    """
+    text = "\x1f".join(_canonical(row.get(name)) for name in HASHED_FIELDS)
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def upsert_statement(dialect_name: str, columns: list):
+    """
+    Build an INSERT of property rows that updates the existing row with the same PIN instead.
+
+    The update only runs when the stored content hash differs from the incoming one, so an unchanged
+    row is neither written nor returned. The statement returns the PIN of every row it wrote.
+
+    Parameters:
+        dialect_name (str): "sqlite" or "postgresql".
+        columns (list): Columns set by the rows being upserted.
+
+    Raises:
+        NotImplementedError: For other dialects.
+    """
+    dialects = {"sqlite": sqlite, "postgresql": postgresql}
+    if dialect_name not in dialects:
+        raise NotImplementedError(f"Upserts are not available for {dialect_name}")
+    statement = dialects[dialect_name].insert(Property)
+    return statement.on_conflict_do_update(
+        index_elements=[Property.pin],
+        set_={name: statement.excluded[name] for name in columns if name != "pin"},
+        where=Property.content_hash.is_distinct_from(statement.excluded.content_hash),
+    ).returning(Property.pin)
+
+
+def upsert_properties_db(db: Session, rows: list) -> dict:
+    """
+    Insert rows whose PIN is new, update those whose values changed and skip the rest, in one transaction.
+
+    A PIN repeated within `rows` is applied in order, as if the rows had been sent one at a time.
+
+    Parameters:
+        db (Session): SQLAlchemy database session.
+        rows (list): Column dicts as produced by `validate_batch`.
+
+    Returns:
+        dict: Counts of inserted, updated and unchanged rows.
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    if not rows:
+        return counts
+    # Rows are split into rounds holding each PIN at most once, since one statement may not update a row twice.
+    rounds, seen = [], Counter()
+    for row in rows:
+        pin = row.get("pin")
+        occurrence = seen[pin] if pin is not None else 0
+        if pin is not None:
+            seen[pin] += 1
+        if occurrence == len(rounds):
+            rounds.append([])
+        rounds[occurrence].append({**row, "content_hash": content_hash(row)})
+
+    statement = upsert_statement(db.get_bind().dialect.name, list(rows[0]) + ["content_hash"])
+    for batch in rounds:
+        pins = [row["pin"] for row in batch if row.get("pin") is not None]
+        stored = {}
+        for start in range(0, len(pins), BULK_WRITE_CHUNK):
+            chunk = pins[start:start + BULK_WRITE_CHUNK]
+            stored.update(db.execute(select(Property.pin, Property.content_hash).where(Property.pin.in_(chunk))).all())
+        # Unchanged rows are dropped here rather than sent to be skipped by the statement's WHERE.
+        changed = [row for row in batch if row.get("pin") not in stored or stored[row["pin"]] != row["content_hash"]]
+        written = db.execute(statement, changed).scalars().all() if changed else []
+        updated = sum(1 for pin in written if pin in stored)
+        counts["updated"] += updated
+        counts["inserted"] += len(written) - updated
+        counts["unchanged"] += len(batch) - len(written)
+    db.commit()
+    if counts["updated"]:
+        range_cache.invalidate()
+        listing_cache.invalidate()
+    elif counts["inserted"]:
+        _observe_inserted(rows)
+    return counts
+
+
+def ingest_batch(db: Session, records: list, first_row: int, upsert: bool = False) -> dict:
+    """
+    Validate and insert one chunk of an ingest stream in its own transaction.
+
+    A database error rolls back only this chunk, and every row in it is reported as failed.
+
+    Parameters:
+        db (Session): SQLAlchemy database session.
+        records (list): Raw records keyed by field or header name.
+        first_row (int): 1-based row number of the first record.
+        upsert (bool): Update rows whose PIN already exists instead of inserting them (default is False).
+
+    Returns:
+        dict: Counts of received, inserted, updated, unchanged and failed rows, and the per-row errors.
+    """
+    rows, errors = validate_batch(records, first_row)
+    try:
+        if upsert:
+            counts = upsert_properties_db(db, rows)
+        else:
+            counts = {"inserted": bulk_insert_properties_db(db, rows), "updated": 0, "unchanged": 0}
+    except SQLAlchemyError as e:
+        db.rollback()
+        message = str(e.orig if getattr(e, "orig", None) is not None else e)
+        errors = sorted(errors + [
+            {"row": row_number, "errors": [{"msg": f"Chunk rolled back: {message}"}]}
+            for row_number in range(first_row, first_row + len(records))
+            if row_number not in {error["row"] for error in errors}
+        ], key=lambda error: error["row"])
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    return {"received": len(records), **counts, "failed": len(errors), "errors": errors}
+
+
+def bulk_predicates(dialect_name: str, ids: list = None, filters: dict = None) -> list:
+    """
+    Build the WHERE clauses selecting the properties of a bulk update or delete.
+
+    Parameters:
+        dialect_name (str): Name of the database dialect the statements will run on.
+        ids (list): IDs of the properties to change (optional).
+        filters (dict): Listing filters, as accepted by `listing_statement`, selecting them instead (optional).
+
+    Returns:
+        list: One clause per statement to run; ID lists are split into chunks of `BULK_WRITE_CHUNK`.
+
+    Raises:
+        ValueError: Unless exactly one of ids and filters is given, or if the filters match every property.
+    """
+    if (ids is None) == (filters is None):
+        raise ValueError("Give either ids or filter")
+    if ids is not None:
+        unique = sorted(set(ids))
+        return [Property.id.in_(unique[start:start + BULK_WRITE_CHUNK])
+                for start in range(0, len(unique), BULK_WRITE_CHUNK)]
+    matching, _ = listing_statement(dialect_name, columns=(Property.id,), **filters)
+    # Checked on the built statement, since text filters without word tokens (e.g. "-") are dropped by it.
+    if matching.compare(listing_statement(dialect_name, columns=(Property.id,))[0]):
+        raise ValueError("filter must set at least one condition")
+    return [Property.id.in_(matching.scalar_subquery())]
+
+
+def _execute_bulk(db: Session, statements: list) -> int:
+    """Run set-based statements in one transaction and return the number of rows they affected."""
+    try:
+        affected = sum(db.execute(statement.execution_options(synchronize_session=False)).rowcount
+                       for statement in statements)
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        raise
+    return affected
+
+
+def bulk_update_properties_db(db: Session, values: dict, ids: list = None, filters: dict = None) -> int:
+    """
+    Set the same column values on many properties with UPDATE ... WHERE, in a single transaction.
+
+    Parameters:
+        db (Session): SQLAlchemy database session.
+        values (dict): New values keyed by column name.
+        ids (list): IDs of the properties to update (optional).
+        filters (dict): Listing filters selecting the properties to update instead (optional).
+
+    Returns:
+        int: The number of properties updated.
+
+    Raises:
+        ValueError: If there are no values, or the selection is invalid (see `bulk_predicates`).
+    """
+    if not values:
+        raise ValueError("values must set at least one column")
+    predicates = bulk_predicates(db.get_bind().dialect.name, ids, filters)
+    # The rows no longer hold what was imported, so the next upsert must rewrite them.
+    values = {**values, "content_hash": None}
+    affected = _execute_bulk(db, [update(Property).where(predicate).values(**values) for predicate in predicates])
+    if affected and LISTING_FIELDS.intersection(values):
+        listing_cache.invalidate()
+    if affected and any(column in values for column in RANGE_COLUMNS):
+        range_cache.invalidate()
+    return affected
+
+
+def bulk_delete_properties_db(db: Session, ids: list = None, filters: dict = None) -> int:
+    """
+    Delete many properties with DELETE ... WHERE, in a single transaction.
+
+    Parameters:
+        db (Session): SQLAlchemy database session.
+        ids (list): IDs of the properties to delete (optional).
+        filters (dict): Listing filters selecting the properties to delete instead (optional).
+
+    Returns:
+        int: The number of properties deleted.
+
+    Raises:
+        ValueError: If the selection is invalid (see `bulk_predicates`).
+    """
+    predicates = bulk_predicates(db.get_bind().dialect.name, ids, filters)
+    affected = _execute_bulk(db, [delete(Property).where(predicate) for predicate in predicates])
+    if affected:
+        range_cache.invalidate()
+        listing_cache.invalidate()
+    return affected
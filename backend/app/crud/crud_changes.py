@@ -0,0 +1,39 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.crud.crud_property import EXPORT_COLUMNS
+from app.db.changes import property_tombstones
+from app.models.models import Property
+
+
+def get_property_changes_db(db: Session, since: int = 0, limit: int = 1000) -> tuple:
+    """
+    Retrieve the properties written and deleted after a version, oldest change first.
+
+    Every insert and update stamps the row with a new version, so a property changed several times
+    appears once, at its latest version; a deleted property appears as its tombstone. Versions are
+    committed in order (see `create_change_tracking`), so resuming from the returned version never
+    skips a change that was still being written.
+
+    Parameters:
+        db (Session): SQLAlchemy database session.
+        since (int): Version returned by the previous call, or 0 for the whole table (default is 0).
+        limit (int): Maximum number of changes to return (default is 1000).
+
+    Returns:
+        tuple: A list of (version, property row or None, tombstone row or None) ordered by version, the
+        version to pass as `since` next time, and whether more changes are waiting.
+    """
+    rows = db.execute(
+        select(*EXPORT_COLUMNS).where(Property.version > since).order_by(Property.version).limit(limit + 1)
+    ).all()
+    tombstones = db.execute(
+        select(property_tombstones).where(property_tombstones.c.version > since)
+        .order_by(property_tombstones.c.version).limit(limit + 1)
+    ).all()
+    changes = sorted(
+        [(row.version, row, None) for row in rows] + [(row.version, None, row) for row in tombstones],
+        key=lambda change: change[0]
+    )
+    page = changes[:limit]
+    return page, page[-1][0] if page else since, len(changes) > limit
@@ -0,0 +1,123 @@
+import logging
+import threading
+from collections import defaultdict
+from statistics import median_low
+
+from sqlalchemy import and_, delete, insert, select, tuple_
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.clusters import (
+    CLUSTER_MAX_ZOOM, cell_degrees, cell_range, finest_cell, property_cluster_dirty, property_clusters
+)
+from app.db.spatial import apply_bbox
+from app.models.models import Property
+
+logger = logging.getLogger(__name__)
+
+# Cells per IN (...) list when replacing cluster rows, well under SQLite's bound parameter limit.
+_DELETE_CHUNK = 400
+
+# Readers in this process refresh one at a time, so they do not contend for the database's write lock.
+_refresh_lock = threading.Lock()
+
+
+def _claim_dirty_cells(db: Session, zoom: int, x0: int, y0: int, x1: int, y1: int) -> set:
+    """
+    Remove and return the dirty cells at `zoom` inside a cell range.
+
+    The markers are deleted before the properties are read, in the same transaction, so a write that
+    lands in the meantime marks its cell again and is picked up by the next read.
+
+    Returns:
+        set: The (cell_x, cell_y) cells that have to be recomputed.
+    """
+    dirty = property_cluster_dirty.c
+    claimed = db.execute(
+        delete(property_cluster_dirty)
+        .where(dirty.zoom == zoom, dirty.cell_x.between(x0, x1), dirty.cell_y.between(y0, y1))
+        .returning(dirty.cell_x, dirty.cell_y)
+    ).all()
+    return {(row.cell_x, row.cell_y) for row in claimed}
+
+
+def _recompute_cells(db: Session, zoom: int, cells: set) -> None:
+    """Replace the cluster rows of `cells` at `zoom` with ones computed from the properties table."""
+    size = cell_degrees(zoom)
+    shift = CLUSTER_MAX_ZOOM - zoom
+    # Read the smallest box around the cells, padded so points on its edges are not lost to rounding;
+    # each point is then assigned to its cell exactly as the triggers would.
+    xs, ys = [x for x, _ in cells], [y for _, y in cells]
+    padding = 1e-9
+    statement = apply_bbox(
+        select(Property.latitude, Property.longitude, Property.estimated_market_value),
+        db.get_bind().dialect.name,
+        min(xs) * size - 180.0 - padding, min(ys) * size - 90.0 - padding,
+        (max(xs) + 1) * size - 180.0 + padding, (max(ys) + 1) * size - 90.0 + padding,
+    )
+    members = defaultdict(list)
+    for latitude, longitude, value in db.execute(statement):
+        x, y = finest_cell(latitude, longitude)
+        cell = (x >> shift, y >> shift)
+        if cell in cells:
+            members[cell].append((latitude, longitude, value))
+
+    cells = list(cells)
+    for start in range(0, len(cells), _DELETE_CHUNK):
+        db.execute(delete(property_clusters).where(
+            property_clusters.c.zoom == zoom,
+            tuple_(property_clusters.c.cell_x, property_clusters.c.cell_y).in_(cells[start:start + _DELETE_CHUNK]),
+        ))
+    rows = []
+    for (x, y), points in members.items():
+        values = [value for _, _, value in points if value is not None]
+        rows.append({
+            "zoom": zoom, "cell_x": x, "cell_y": y, "count": len(points),
+            "latitude": sum(point[0] for point in points) / len(points),
+            "longitude": sum(point[1] for point in points) / len(points),
+            "median_estimated_market_value": median_low(values) if values else None,
+        })
+    if rows:
+        db.execute(insert(property_clusters), rows)
+
+
+def get_property_clusters_db(db: Session, zoom: int, bbox: tuple) -> list:
+    """
+    Retrieve the property clusters of a map view, refreshing any grid cells changed since they were computed.
+    When the refresh cannot take the database's write lock, the stored clusters are returned.
+
+    Parameters:
+        db (Session): SQLAlchemy database session.
+        zoom (int): Map zoom level, from 0 to `CLUSTER_MAX_ZOOM`.
+        bbox (tuple): (west, south, east, north) in degrees, as returned by `parse_bbox`.
+
+    Returns:
+        list: Cluster rows with count, centroid latitude/longitude and median estimated market value.
+
+    Raises:
+        ValueError: If the zoom level is out of range or the view spans more than `CLUSTER_MAX_CELLS` cells.
+    """
+    if not 0 <= zoom <= CLUSTER_MAX_ZOOM:
+        raise ValueError(f"zoom must be between 0 and {CLUSTER_MAX_ZOOM}; use /properties/within beyond that")
+    x0, y0, x1, y1 = cell_range(zoom, *bbox)
+    if (x1 - x0 + 1) * (y1 - y0 + 1) > settings.CLUSTER_MAX_CELLS:
+        raise ValueError("bbox covers too many cells at this zoom; zoom out or narrow the box")
+
+    with _refresh_lock:
+        try:
+            stale = _claim_dirty_cells(db, zoom, x0, y0, x1, y1)
+            if stale:
+                _recompute_cells(db, zoom, stale)
+            db.commit()
+        except OperationalError:
+            # Another process is writing (e.g. SQLite's "database is locked"). Rolling back keeps the dirty
+            # markers, so a later read recomputes those cells; this one serves the clusters as they are.
+            db.rollback()
+            logger.warning("Refreshing zoom %d clusters failed; serving the stored ones", zoom, exc_info=True)
+
+    clusters = property_clusters.c
+    return db.execute(
+        select(clusters.count, clusters.latitude, clusters.longitude, clusters.median_estimated_market_value)
+        .where(and_(clusters.zoom == zoom, clusters.cell_x.between(x0, x1), clusters.cell_y.between(y0, y1)))
+    ).all()
@@ -0,0 +1,142 @@
+import math
+
+from sqlalchemy import Integer, Select, String, cast, func, literal, null, select, union_all
+from sqlalchemy.orm import Session
+
+from app.crud.crud_property import listing_statement, range_cache
+from app.models.models import Property
+
+# Columns reported as value counts and as histograms. The histogram columns are the ones
+# summarised by the range cache, which provides their bounds when no range filter is given.
+FACET_COLUMNS = ("class_description", "bldg_use")
+HISTOGRAM_COLUMNS = ("estimated_market_value", "building_sq_ft")
+
+
+def histogram_bounds(summary: dict, column: str, minimum: int = None, maximum: int = None,
+                     buckets: int = 10) -> tuple:
+    """
+    Choose the lowest value and bucket width of a histogram.
+
+    The histogram spans the filtered range when one is given and the column's overall range otherwise.
+
+    Returns:
+        tuple: (low, high, width), or None when the column has no values to bucket.
+    """
+    values = summary.get(column) or {}
+    low = minimum if minimum is not None else values.get("min")
+    high = maximum if maximum is not None else values.get("max")
+    if low is None or high is None or high < low:
+        return None
+    return low, high, max(1, math.ceil((high - low + 1) / buckets))
+
+
+def facet_statement(dialect_name: str, filters: dict, bounds: dict) -> Select:
+    """
+    Build one UNION ALL statement computing every facet and histogram over the filtered properties.
+
+    Each branch groups the same filtered set: value counts for `FACET_COLUMNS`, bucket counts for the
+    histogram columns in `bounds`. Rows carry the facet name, then a value or a bucket index, then a count,
+    so the whole response costs a single round trip instead of one query per facet.
+
+    Parameters:
+        dialect_name (str): Name of the database dialect the select will run on.
+        filters (dict): Listing filters, as accepted by `listing_statement`.
+        bounds (dict): (low, high, width) per histogram column, from `histogram_bounds`.
+
+    Returns:
+        Select: The compound statement.
+    """
+    columns = tuple(getattr(Property, name) for name in FACET_COLUMNS + tuple(bounds))
+    filtered, _ = listing_statement(dialect_name, columns=columns, **filters)
+    filtered = filtered.cte("filtered")
+    if not any(value for name, value in filters.items() if name != "exact_match"):
+        # Over the whole table each branch is best served by scanning its own covering index; with filters
+        # the matches are computed once and shared by the branches.
+        filtered = filtered.prefix_with("NOT MATERIALIZED")
+
+    branches = []
+    for name in FACET_COLUMNS:
+        column = filtered.c[name]
+        branches.append(
+            select(literal(name).label("facet"), column.label("value"), cast(null(), Integer).label("bucket"),
+                   func.count().label("count"))
+            .group_by(column)
+        )
+    for name, (low, high, width) in bounds.items():
+        column = filtered.c[name]
+        bucket = (column - low) // width
+        branches.append(
+            select(literal(name), cast(null(), String), bucket, func.count())
+            .where(column.between(low, high))
+            .group_by(bucket)
+        )
+    return union_all(*branches)
+
+
+def get_property_facets_db(
+        db: Session,
+        full_address: str = None,
+        class_description: str = None,
+        estimated_market_value_min: int = None,
+        estimated_market_value_max: int = None,
+        bldg_use: str = None,
+        building_sq_ft_min: int = None,
+        building_sq_ft_max: int = None,
+        exact_match: bool = False,
+        buckets: int = 10,
+        facet_limit: int = 50
+) -> dict:
+    """
+    Count the values of the filter columns for the properties matching a set of listing filters.
+
+    Parameters:
+        db (Session): SQLAlchemy database session.
+        buckets (int): Number of histogram buckets per range column (default is 10).
+        facet_limit (int): Most frequent values reported per facet column (default is 50).
+        Other parameters are as for `crud_property.get_filtered_properties_db`.
+
+    Returns:
+        dict: The total number of matches, value counts per facet column (most frequent first) and
+        histogram buckets per range column.
+    """
+    filters = dict(
+        full_address=full_address, class_description=class_description,
+        estimated_market_value_min=estimated_market_value_min, estimated_market_value_max=estimated_market_value_max,
+        bldg_use=bldg_use, building_sq_ft_min=building_sq_ft_min, building_sq_ft_max=building_sq_ft_max,
+        exact_match=exact_match,
+    )
+    summary = range_cache.get(db)
+    bounds = {
+        name: bound for name, minimum, maximum in (
+            ("estimated_market_value", estimated_market_value_min, estimated_market_value_max),
+            ("building_sq_ft", building_sq_ft_min, building_sq_ft_max),
+        ) if (bound := histogram_bounds(summary, name, minimum, maximum, buckets)) is not None
+    }
+
+    values = {name: [] for name in FACET_COLUMNS}
+    counts = {name: {} for name in bounds}
+    for facet, value, bucket, count in db.execute(facet_statement(db.get_bind().dialect.name, filters, bounds)):
+        if facet in values:
+            values[facet].append((value, count))
+        else:
+            counts[facet][bucket] = count
+
+    total = sum(count for _, count in values[FACET_COLUMNS[0]])
+    facets = {
+        name: [{"value": value, "count": count}
+               for value, count in sorted(pairs, key=lambda pair: (-pair[1], pair[0] or ""))
+               if value][:facet_limit]
+        for name, pairs in values.items()
+    }
+    histograms = {}
+    for name in HISTOGRAM_COLUMNS:
+        if name not in bounds:
+            histograms[name] = []
+            continue
+        low, high, width = bounds[name]
+        histograms[name] = [
+            {"min": low + index * width, "max": min(low + (index + 1) * width - 1, high),
+             "count": counts[name].get(index, 0)}
+            for index in range((high - low) // width + 1)
+        ]
+    return {"total": total, **facets, **histograms}
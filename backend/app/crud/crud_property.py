@@ -1,6 +1,190 @@
-from sqlalchemy import func
+import base64
+import json
+from typing import Iterator
+
+from sqlalchemy import Select, select, tuple_
 from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.crud.listing_cache import ListingCache, cache_backend
+from app.crud.range_cache import PropertyRangeCache, range_values
+from app.db.search import apply_text_search
+from app.db.spatial import apply_bbox, radius_bbox, squared_distance
 from app.models.models import Property
+from app.schemas.property import PropertyBase
+
+# Columns a listing may be ordered by. Every ordering is made unique by appending the primary key,
+# which is what lets a cursor of (sort value, id) resume exactly where the previous page stopped.
+LISTING_SORT_COLUMNS = {
+    "id": Property.id,
+    "estimated_market_value": Property.estimated_market_value,
+    "building_sq_ft": Property.building_sq_ft,
+}
+
+# Columns of a PropertyListings row. Listing queries select only these, which keeps them on the
+# covering index and returns plain rows instead of hydrating 60-column ORM objects.
+LISTING_COLUMNS = (
+    Property.id, Property.full_address, Property.class_description, Property.estimated_market_value,
+    Property.bldg_use, Property.building_sq_ft, Property.longitude, Property.latitude,
+)
+
+# Columns written by the exports, in table order: the property's fields and its id, version and update time.
+# Bookkeeping such as the upsert content_hash stays internal.
+EXPORTED_FIELDS = frozenset(("id", *PropertyBase.model_fields, "version", "updated_at"))
+EXPORT_COLUMNS = tuple(
+    getattr(Property, column.key) for column in Property.__table__.columns if column.key in EXPORTED_FIELDS
+)
+
+LISTING_FIELDS = frozenset(column.key for column in LISTING_COLUMNS)
+
+
+def build_caches(config) -> tuple:
+    """
+    Create the process's range and listing caches from the settings.
+
+    The write functions below only invalidate the caches of the process they run in. With several
+    workers, the listing cache is therefore kept only on a shared backend (LISTING_CACHE_URL), and
+    the range summary, which has no shared backend, is read from the database on every request.
+
+    Returns:
+        tuple: The PropertyRangeCache and the ListingCache.
+    """
+    single_process = config.WEB_CONCURRENCY <= 1
+    range_cache = PropertyRangeCache(ttl_seconds=config.RANGE_CACHE_TTL_SECONDS if single_process else 0)
+    listing_cache = ListingCache(
+        cache_backend(config.LISTING_CACHE_URL, config.LISTING_CACHE_SIZE),
+        ttl_seconds=config.LISTING_CACHE_TTL_SECONDS,
+        enabled=config.LISTING_CACHE_SIZE > 0 and (single_process or bool(config.LISTING_CACHE_URL)),
+    )
+    return range_cache, listing_cache
+
+
+# The summary served by `get_property_value_range` and the encoded listing responses, kept current by the
+# write functions below. Listings only show and filter on LISTING_COLUMNS, so updates leaving those alone
+# keep the cached listings.
+range_cache, listing_cache = build_caches(settings)
+
+
+def encode_cursor(sort_by: str, descending: bool, value, property_id: int) -> str:
+    """Encode the position after a row as an opaque, URL-safe cursor."""
+    payload = json.dumps({"s": sort_by, "d": descending, "v": value, "id": property_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, descending: bool) -> tuple:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for a different ordering.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, property_id = payload["v"], int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if payload.get("s") != sort_by or bool(payload.get("d")) != descending:
+        raise ValueError("Cursor does not match the requested ordering")
+    return value, property_id
+
+
+def page_statements(statement: Select, sort_by: str = "id", descending: bool = False, cursor: str = None,
+                    skip: int = 0, limit: int = 100, rank=None) -> list:
+    """
+    Order and limit a Property select for one page, seeking past the cursor when one is given.
+
+    With a cursor the query seeks directly to the rows after `(sort value, id)`, so every page costs
+    the same regardless of depth and `skip` is ignored. Without one the first `skip` rows are
+    skipped as before. One extra row is selected to tell whether another page exists, and the sort
+    value is added as a `sort_value` column for building the next cursor with `split_page`.
+
+    Rows whose sort value is NULL come after all others in both directions, ordered by ID, and a
+    cursor may point into them. A cursor on a non-NULL value therefore yields two statements: the
+    index seek past it, then the NULL rows. A single `(sort value, id) > boundary OR value IS NULL`
+    condition would select the same rows but can no longer seek, making deep pages scan from the start.
+
+    Parameters:
+        statement (Select): Select over Property to page.
+        sort_by (str): Key of `LISTING_SORT_COLUMNS`, or "relevance" when `rank` is given (default is "id").
+        descending (bool): Order from the highest value down (default is False).
+        cursor (str): Cursor returned with the previous page (optional).
+        skip (int): Number of records to skip when no cursor is given (default is 0).
+        limit (int): Maximum number of records to return (default is 100).
+        rank: Text search rank expression used for the "relevance" ordering (optional).
+
+    Returns:
+        list: Statements to run in order, stopping once they have returned `limit` + 1 rows.
+
+    Raises:
+        ValueError: If `sort_by` is unknown or the cursor is invalid.
+    """
+    if sort_by == "relevance" and rank is not None:
+        sort_column = rank
+    elif sort_by in LISTING_SORT_COLUMNS:
+        sort_column = LISTING_SORT_COLUMNS[sort_by]
+    else:
+        raise ValueError(f"Cannot sort by {sort_by!r}")
+
+    def _page(statement: Select) -> Select:
+        if descending:
+            statement = statement.order_by(sort_column.desc().nulls_last(), Property.id.desc())
+        else:
+            statement = statement.order_by(sort_column.nulls_last(), Property.id)
+        return statement.add_columns(sort_column.label("sort_value")).limit(limit + 1)
+
+    def _after_id(last_id: int):
+        return Property.id < last_id if descending else Property.id > last_id
+
+    if not cursor:
+        return [_page(statement.offset(skip) if skip else statement)]
+    value, last_id = decode_cursor(cursor, sort_by, descending)
+    if sort_column is Property.id:
+        return [_page(statement.where(_after_id(last_id)))]
+    if value is None:
+        return [_page(statement.where(sort_column.is_(None), _after_id(last_id)))]
+    sort_key, boundary = tuple_(sort_column, Property.id), tuple_(value, last_id)
+    return [
+        _page(statement.where(sort_key < boundary if descending else sort_key > boundary)),
+        _page(statement.where(sort_column.is_(None))),
+    ]
+
+
+def split_page(rows: list, sort_by: str, descending: bool, limit: int, projected: bool = False) -> tuple:
+    """
+    Split the rows of the `page_statements` into the page and the cursor for the next one.
+
+    Parameters:
+        rows (list): Rows returned by the page statements.
+        sort_by (str): Ordering the page was fetched with.
+        descending (bool): Direction the page was fetched in.
+        limit (int): Page size the statement was built for.
+        projected (bool): The statement selected columns rather than the Property entity (default is False).
+
+    Returns:
+        tuple: The page of Property instances (or column rows when projected) and the next cursor,
+        or None on the last page.
+    """
+    page = rows[:limit] if projected else [row[0] for row in rows[:limit]]
+    if len(rows) <= limit:
+        return page, None
+    return page, encode_cursor(sort_by, descending, rows[limit - 1].sort_value, page[-1].id)
+
+
+def paginate(db: Session, statement: Select, sort_by: str = "id", descending: bool = False, cursor: str = None,
+             skip: int = 0, limit: int = 100, rank=None, projected: bool = False) -> tuple:
+    """
+    Fetch one page of a Property select. Parameters are as for `page_statements` and `split_page`.
+
+    Returns:
+        tuple: The page of Property instances (or column rows when projected) and the cursor for the
+        next page, or None on the last page.
+    """
+    rows = []
+    for page_statement in page_statements(statement, sort_by, descending, cursor, skip, limit, rank):
+        rows.extend(db.execute(page_statement.limit(limit + 1 - len(rows))).all())
+        if len(rows) > limit:
+            break
+    return split_page(rows, sort_by, descending, limit, projected)
 
 
 def get_property_db(db: Session, property_id: int) -> Property:
@@ -14,22 +198,40 @@ def get_property_db(db: Session, property_id: int) -> Property:
     Returns:
         Property: An instance of the Property model.
     """
-    return db.query(Property).filter(Property.id == property_id).first()
+    return db.execute(select(Property).where(Property.id == property_id)).scalars().first()
 
 
-def get_properties_db(db: Session, skip: int = 0, limit: int = 100) -> list:
+def get_properties_by_ids_db(db: Session, property_ids: list, columns: tuple = EXPORT_COLUMNS) -> list:
     """
-    Retrieve a list of properties, with optional skipping and limiting for pagination.
+    Retrieve many properties by their IDs with a single query.
 
     Parameters:
         db (Session): SQLAlchemy database session.
-        skip (int): Number of records to skip (default is 0).
+        property_ids (list): IDs to look up, in the order results are wanted; duplicates are allowed.
+        columns (tuple): Columns to select, including `Property.id` (default is every column).
+
+    Returns:
+        list: One row per requested ID, in request order, with None where no property has that ID.
+    """
+    rows = db.execute(select(*columns).where(Property.id.in_(sorted(set(property_ids))))).all()
+    found = {row.id: row for row in rows}
+    return [found.get(property_id) for property_id in property_ids]
+
+
+def get_properties_db(db: Session, skip: int = 0, limit: int = 100, cursor: str = None) -> tuple:
+    """
+    Retrieve a page of properties ordered by ID.
+
+    Parameters:
+        db (Session): SQLAlchemy database session.
+        skip (int): Number of records to skip when no cursor is given (default is 0).
         limit (int): Maximum number of records to return (default is 100).
+        cursor (str): Cursor returned with the previous page (optional).
 
     Returns:
-        list: A list of Property instances.
+        tuple: A list of Property instances and the cursor for the next page, or None on the last page.
     """
-    return db.query(Property).offset(skip).limit(limit).all()
+    return paginate(db, select(Property), cursor=cursor, skip=skip, limit=limit)
 
 
 def create_property_db(db: Session, property: Property) -> Property:
@@ -47,6 +249,8 @@ def create_property_db(db: Session, property: Property) -> Property:
     db.add(db_property)
     db.commit()
     db.refresh(db_property)
+    range_cache.observe_insert(range_values(db_property))
+    listing_cache.invalidate()
     return db_property
 
 
@@ -66,13 +270,19 @@ def update_property_db(db: Session, property_id: int, property: Property) -> Pro
     if not db_property:
         return None
 
+    before = range_values(db_property)
     update_data = property.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_property, key, value)
+    # The row no longer holds what was imported, so the next upsert must rewrite it.
+    db_property.content_hash = None
 
     db.add(db_property)
     db.commit()
     db.refresh(db_property)
+    range_cache.observe_update(before, range_values(db_property))
+    if LISTING_FIELDS.intersection(update_data):
+        listing_cache.invalidate()
     return db_property
 
 
@@ -89,12 +299,117 @@ def delete_property_db(db: Session, property_id: int) -> bool:
     """
     db_property = get_property_db(db, property_id=property_id)
     if db_property is not None:
+        removed = range_values(db_property)
         db.delete(db_property)
         db.commit()
+        range_cache.observe_delete(removed)
+        listing_cache.invalidate()
         return True
     return False
 
 
+def _range_predicates(column, minimum=None, maximum=None) -> list:
+    """Express an optional two-sided range on a column, as a single BETWEEN when both ends are given."""
+    if minimum is not None and maximum is not None:
+        return [column.between(minimum, maximum)]
+    if minimum is not None:
+        return [column >= minimum]
+    if maximum is not None:
+        return [column <= maximum]
+    return []
+
+
+def listing_predicates(
+        class_description: str = None,
+        estimated_market_value_min: int = None,
+        estimated_market_value_max: int = None,
+        bldg_use: str = None,
+        building_sq_ft_min: int = None,
+        building_sq_ft_max: int = None,
+        exact_match: bool = False
+) -> list:
+    """
+    Build the structured listing criteria in the order of the composite indexes on Property.
+
+    Exact class description and building use filters come first, each followed by the range on the
+    column it shares an index with (`ix_properties_class_description_emv`,
+    `ix_properties_bldg_use_building_sq_ft`), so an equality prefix plus a range is always available
+    to the planner. Two-sided ranges become one BETWEEN, which SQLite costs as a single bounded
+    index scan. Free-text filters are not handled here; see `apply_text_search`.
+
+    Parameters:
+        class_description (str): Class description to match exactly, used only with `exact_match`.
+        estimated_market_value_min (int): Minimum estimated market value (optional).
+        estimated_market_value_max (int): Maximum estimated market value (optional).
+        bldg_use (str): Building use to match exactly, used only with `exact_match`.
+        building_sq_ft_min (int): Minimum building square footage (optional).
+        building_sq_ft_max (int): Maximum building square footage (optional).
+        exact_match (bool): Treat class description and building use as equality filters (default is False).
+
+    Returns:
+        list: SQLAlchemy criteria to apply with `Query.filter`.
+    """
+    ranges = {
+        Property.estimated_market_value: (estimated_market_value_min, estimated_market_value_max),
+        Property.building_sq_ft: (building_sq_ft_min, building_sq_ft_max),
+    }
+    predicates = []
+    if exact_match:
+        for column, value, paired in (
+            (Property.class_description, class_description, Property.estimated_market_value),
+            (Property.bldg_use, bldg_use, Property.building_sq_ft),
+        ):
+            if value:
+                predicates.append(column == value.strip())
+                predicates.extend(_range_predicates(paired, *ranges.pop(paired)))
+    for column, (minimum, maximum) in ranges.items():
+        predicates.extend(_range_predicates(column, minimum, maximum))
+    return predicates
+
+
+def listing_statement(
+        dialect_name: str,
+        full_address: str = None,
+        class_description: str = None,
+        estimated_market_value_min: int = None,
+        estimated_market_value_max: int = None,
+        bldg_use: str = None,
+        building_sq_ft_min: int = None,
+        building_sq_ft_max: int = None,
+        exact_match: bool = False,
+        columns: tuple = None
+) -> tuple:
+    """
+    Build the unordered Property select for a set of listing filters.
+
+    Parameters:
+        dialect_name (str): Name of the database dialect the select will run on.
+        columns (tuple): Property columns to select instead of the whole entity (optional).
+        Other parameters are as for `get_filtered_properties_db`.
+
+    Returns:
+        tuple: The filtered select and the text search rank expression for relevance ordering.
+    """
+    terms = {"full_address": full_address}
+    if not exact_match:
+        terms.update(class_description=class_description, bldg_use=bldg_use)
+    statement, rank = apply_text_search(select(*columns) if columns else select(Property), dialect_name, terms)
+    statement = statement.where(*listing_predicates(
+        class_description=class_description,
+        estimated_market_value_min=estimated_market_value_min, estimated_market_value_max=estimated_market_value_max,
+        bldg_use=bldg_use, building_sq_ft_min=building_sq_ft_min, building_sq_ft_max=building_sq_ft_max,
+        exact_match=exact_match
+    ))
+    return statement, rank
+
+
+def default_listing_sort(full_address: str = None, class_description: str = None, bldg_use: str = None,
+                         exact_match: bool = False) -> str:
+    """Order text searches by relevance and everything else by ID."""
+    searching = full_address or (not exact_match and (class_description or bldg_use))
+    return "relevance" if searching else "id"
+
+
 def get_filtered_properties_db(
         db: Session,
         full_address: str = None,
@@ -105,55 +420,166 @@ def get_filtered_properties_db(
         building_sq_ft_min: int = None,
         building_sq_ft_max: int = None,
         skip: int = 0,
-        limit: int = 100
-) -> list:
+        limit: int = 100,
+        cursor: str = None,
+        sort_by: str = None,
+        descending: bool = False,
+        exact_match: bool = False,
+        columns: tuple = None
+) -> tuple:
     """
     Retrieve a filtered list of properties based on various criteria.
 
     Parameters:
         db (Session): SQLAlchemy database session.
-        full_address (str): Full address to filter by (optional).
-        class_description (str): Class description to filter by (optional).
+        full_address (str): Words the full address must contain as prefixes (optional).
+        class_description (str): Words the class description must contain as prefixes (optional).
         estimated_market_value_min (int): Minimum estimated market value to filter by (optional).
         estimated_market_value_max (int): Maximum estimated market value to filter by (optional).
-        bldg_use (str): Building use to filter by (optional).
+        bldg_use (str): Words the building use must contain as prefixes (optional).
         building_sq_ft_min (int): Minimum building square footage to filter by (optional).
         building_sq_ft_max (int): Maximum building square footage to filter by (optional).
-        skip (int): Number of records to skip (default is 0).
+        skip (int): Number of records to skip when no cursor is given (default is 0).
         limit (int): Maximum number of records to return (default is 100).
+        cursor (str): Cursor returned with the previous page (optional).
+        sort_by (str): Key of `LISTING_SORT_COLUMNS` or "relevance" (default is relevance when searching, else "id").
+        descending (bool): Order from the highest value down (default is False).
+        exact_match (bool): Match class description and building use exactly instead of by words (default is False).
+        columns (tuple): Columns to select, such as `LISTING_COLUMNS`, instead of whole Property objects (optional).
 
     Returns:
-        list: A list of filtered Property instances.
+        tuple: A list of filtered Property instances (or column rows when `columns` is given) and the cursor
+        for the next page, or None on the last page.
+    """
+    statement, rank = listing_statement(
+        db.get_bind().dialect.name, full_address=full_address, class_description=class_description,
+        estimated_market_value_min=estimated_market_value_min, estimated_market_value_max=estimated_market_value_max,
+        bldg_use=bldg_use, building_sq_ft_min=building_sq_ft_min, building_sq_ft_max=building_sq_ft_max,
+        exact_match=exact_match, columns=columns
+    )
+    if sort_by is None:
+        sort_by = default_listing_sort(full_address, class_description, bldg_use, exact_match)
+
+    return paginate(db, statement, sort_by=sort_by, descending=descending, cursor=cursor, skip=skip, limit=limit,
+                    rank=rank, projected=columns is not None)
+
+
+def export_statement(dialect_name: str, batch_size: int = 1000, **filters) -> Select:
     """
-    query = db.query(Property)
+    Build the select streamed by the exports: every column of the matching properties, ordered by ID.
 
-    if full_address:
-        query = query.filter(Property.full_address.ilike(f"%{full_address}%"))
-    if class_description:
-        query = query.filter(Property.class_description.ilike(f"%{class_description}%"))
-    if estimated_market_value_min is not None:
-        query = query.filter(Property.estimated_market_value >= estimated_market_value_min)
-    if estimated_market_value_max is not None:
-        query = query.filter(Property.estimated_market_value <= estimated_market_value_max)
-    if bldg_use:
-        query = query.filter(Property.bldg_use.ilike(f"%{bldg_use}%"))
-    if building_sq_ft_min is not None:
-        query = query.filter(Property.building_sq_ft >= building_sq_ft_min)
-    if building_sq_ft_max is not None:
-        query = query.filter(Property.building_sq_ft <= building_sq_ft_max)
+    The select is fetched `batch_size` rows at a time, on a server-side cursor where the driver has one,
+    so an export never holds more than one batch in memory.
 
-    return query.offset(skip).limit(limit).all()
+    Parameters:
+        dialect_name (str): Name of the database dialect the select will run on.
+        batch_size (int): Rows fetched from the cursor at a time (default is 1000).
+        **filters: Listing filters, as accepted by `listing_statement`.
+    """
+    statement, _ = listing_statement(dialect_name, columns=EXPORT_COLUMNS, **filters)
+    return statement.order_by(Property.id).execution_options(yield_per=batch_size)
+
+
+def iter_export_batches(db: Session, batch_size: int = 1000, **filters) -> Iterator[list]:
+    """
+    Stream the properties matching a set of listing filters as lists of at most `batch_size` rows.
+
+    Parameters:
+        db (Session): SQLAlchemy database session, kept open until the iterator is exhausted or closed.
+        batch_size (int): Rows per batch (default is 1000).
+        **filters: Listing filters, as accepted by `listing_statement`.
+
+    Returns:
+        Iterator[list]: Batches of rows holding `EXPORT_COLUMNS`.
+    """
+    result = db.execute(export_statement(db.get_bind().dialect.name, batch_size, **filters))
+    try:
+        yield from result.partitions()
+    finally:
+        result.close()
+
+
+def parse_bbox(text: str) -> tuple:
+    """
+    Parse a "west,south,east,north" bounding box in degrees, as sent by the map.
+
+    Raises:
+        ValueError: If the box is malformed, out of range or has its edges the wrong way round.
+    """
+    try:
+        west, south, east, north = (float(part) for part in text.split(","))
+    except ValueError:
+        raise ValueError("bbox must be four comma-separated numbers: west,south,east,north")
+    if not (-180 <= west <= east <= 180 and -90 <= south <= north <= 90):
+        raise ValueError("bbox edges must satisfy -180 <= west <= east <= 180 and -90 <= south <= north <= 90")
+    return west, south, east, north
+
+
+def within_statement(
+        dialect_name: str,
+        bbox: tuple = None,
+        latitude: float = None,
+        longitude: float = None,
+        radius: float = None,
+        columns: tuple = LISTING_COLUMNS
+) -> Select:
+    """
+    Build the select of properties inside a bounding box or a circle.
+
+    Parameters:
+        dialect_name (str): Name of the database dialect the select will run on.
+        Other parameters are as for `get_properties_within_db`.
+
+    Returns:
+        Select: The filtered select; circles are ordered nearest first, boxes are unordered.
+
+    Raises:
+        ValueError: Unless exactly one of a bbox or a complete latitude/longitude/radius is given.
+    """
+    circle = (latitude, longitude, radius)
+    if bbox is not None and any(value is not None for value in circle):
+        raise ValueError("Give either bbox or lat/lon/radius, not both")
+    if bbox is not None:
+        return apply_bbox(select(*columns), dialect_name, *bbox)
+    if any(value is None for value in circle):
+        raise ValueError("Give a bbox, or lat, lon and radius together")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or radius <= 0:
+        raise ValueError("lat must be within [-90, 90], lon within [-180, 180] and radius positive")
+
+    distance = squared_distance(latitude, longitude)
+    statement = apply_bbox(select(*columns), dialect_name, *radius_bbox(latitude, longitude, radius))
+    return statement.where(distance <= radius * radius).order_by(distance)
+
+
+def get_properties_within_db(
+        db: Session,
+        bbox: tuple = None,
+        latitude: float = None,
+        longitude: float = None,
+        radius: float = None,
+        limit: int = 500,
+        columns: tuple = LISTING_COLUMNS
+) -> tuple:
+    """
+    Retrieve the properties inside a bounding box, or within a radius of a point, using the spatial index.
+
+    Parameters:
+        db (Session): SQLAlchemy database session.
+        bbox (tuple): (west, south, east, north) in degrees, as returned by `parse_bbox` (optional).
+        latitude (float): Latitude of the circle's centre in degrees (optional).
+        longitude (float): Longitude of the circle's centre in degrees (optional).
+        radius (float): Radius of the circle in metres (optional).
+        limit (int): Maximum number of records to return (default is 500).
+        columns (tuple): Columns to select (default is `LISTING_COLUMNS`).
+
+    Returns:
+        tuple: A list of rows and whether more properties matched than were returned.
+    """
+    statement = within_statement(db.get_bind().dialect.name, bbox, latitude, longitude, radius, columns)
+    rows = db.execute(statement.limit(limit + 1)).all()
+    return rows[:limit], len(rows) > limit
 
 
 def get_property_value_range(db: Session) -> dict:
     """Retrieve the minimum and maximum values for estimated market value and building square footage."""
-    max_min_values = db.query(
-        func.min(Property.estimated_market_value).label("min_estimated_market_value"),
-        func.max(Property.estimated_market_value).label("max_estimated_market_value"),
-        func.min(Property.building_sq_ft).label("min_building_sq_ft"),
-        func.max(Property.building_sq_ft).label("max_building_sq_ft")
-    ).first()
-    return {
-        "estimated_market_value": {"min": max_min_values.min_estimated_market_value, "max": max_min_values.max_estimated_market_value},
-        "building_sq_ft": {"min": max_min_values.min_building_sq_ft, "max": max_min_values.max_building_sq_ft}
-    }
\ No newline at end of file
+    return range_cache.get(db)
@@ -0,0 +1,140 @@
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime
+from statistics import median_low
+
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.db.stats import DIRTY_TABLES, GROUPINGS, SOURCE_COLUMNS, STATS_TABLES
+from app.models.models import Property
+
+logger = logging.getLogger(__name__)
+
+# Groups read, deleted or written per statement, well under SQLite's bound parameter limit.
+_CHUNK = 400
+
+# Readers in this process refresh one at a time, so they do not contend for the database's write lock.
+_refresh_lock = threading.Lock()
+
+
+def _key_filter(columns: list, keys: list):
+    """Match rows whose key columns equal one of `keys`."""
+    if len(columns) == 1:
+        return columns[0].in_([key[0] for key in keys])
+    return tuple_(*columns).in_(keys)
+
+
+def _change(current: int, previous: int):
+    return current / previous - 1 if previous else None
+
+
+def summarize_group(rows: list) -> dict:
+    """
+    Compute a group's summary from its properties' source values.
+
+    Parameters:
+        rows (list): (estimated_market_value, current_total, prior_total, pprior_total, sale_amount) per property.
+
+    Returns:
+        dict: The summary columns of a stats table.
+    """
+    values = [row[0] for row in rows if row[0] is not None]
+    assessed = [row[1] for row in rows if row[1] is not None]
+    prior = [row[2] for row in rows if row[2] is not None]
+    pprior = [row[3] for row in rows if row[3] is not None]
+    year_over_year = [(row[1], row[2]) for row in rows if row[1] is not None and row[2] is not None]
+    prior_year = [(row[2], row[3]) for row in rows if row[2] is not None and row[3] is not None]
+    ratios = [row[0] / row[4] for row in rows if row[0] is not None and row[4]]
+    return {
+        "property_count": len(rows),
+        "median_estimated_market_value": median_low(values) if values else None,
+        "median_current_total": median_low(assessed) if assessed else None,
+        "current_total": sum(assessed) if assessed else None,
+        "prior_total": sum(prior) if prior else None,
+        "pprior_total": sum(pprior) if pprior else None,
+        "assessment_change": _change(sum(c for c, _ in year_over_year), sum(p for _, p in year_over_year)),
+        "prior_assessment_change": _change(sum(c for c, _ in prior_year), sum(p for _, p in prior_year)),
+        "sales_count": len(ratios),
+        "median_sale_ratio": median_low(ratios) if ratios else None,
+    }
+
+
+def refresh_group_stats(db: Session, grouping: str) -> int:
+    """
+    Recompute the summaries of every group marked dirty since the last refresh.
+
+    The dirty markers are removed before the properties are read, in the same transaction, so a
+    write that lands in the meantime marks its group again and is picked up by the next refresh.
+
+    Parameters:
+        db (Session): SQLAlchemy database session.
+        grouping (str): Key of `GROUPINGS`.
+
+    Returns:
+        int: The number of groups recomputed.
+    """
+    keys = GROUPINGS[grouping]
+    stats, dirty = STATS_TABLES[grouping], DIRTY_TABLES[grouping]
+    claimed = [tuple(row) for row in db.execute(delete(dirty).returning(*dirty.c))]
+    if not claimed:
+        db.commit()
+        return 0
+
+    key_columns = [getattr(Property, key) for key in keys]
+    source_columns = [getattr(Property, column) for column in SOURCE_COLUMNS]
+    members = defaultdict(list)
+    refreshed_at = datetime.utcnow()
+    for start in range(0, len(claimed), _CHUNK):
+        chunk = claimed[start:start + _CHUNK]
+        for row in db.execute(select(*key_columns, *source_columns).where(_key_filter(key_columns, chunk))):
+            members[tuple(row[:len(keys)])].append(tuple(row[len(keys):]))
+        db.execute(delete(stats).where(_key_filter([stats.c[key] for key in keys], chunk)))
+
+    rows = [
+        {**dict(zip(keys, key)), **summarize_group(group), "refreshed_at": refreshed_at}
+        for key, group in members.items()
+    ]
+    for start in range(0, len(rows), _CHUNK):
+        db.execute(insert(stats), rows[start:start + _CHUNK])
+    db.commit()
+    return len(claimed)
+
+
+def get_group_stats_db(db: Session, grouping: str, town: int = None) -> list:
+    """
+    Retrieve the summaries of a grouping, refreshing groups changed since they were last computed.
+    When the refresh cannot take the database's write lock, the stored summaries are returned.
+
+    Parameters:
+        db (Session): SQLAlchemy database session.
+        grouping (str): "town", "neighborhood" or "tax_code".
+        town (int): Only return groups within this town (optional; not for tax codes).
+
+    Returns:
+        list: Summary rows ordered by their keys.
+
+    Raises:
+        ValueError: If the grouping is unknown or cannot be filtered by town.
+    """
+    if grouping not in GROUPINGS:
+        raise ValueError(f"grouping must be one of {', '.join(GROUPINGS)}")
+    keys = GROUPINGS[grouping]
+    if town is not None and "town" not in keys:
+        raise ValueError(f"{grouping} summaries cannot be filtered by town")
+
+    with _refresh_lock:
+        try:
+            refresh_group_stats(db, grouping)
+        except OperationalError:
+            # Another process is writing (e.g. SQLite's "database is locked"). Rolling back keeps the dirty
+            # markers, so a later read refreshes those groups; this one serves the summaries as they are.
+            db.rollback()
+            logger.warning("Refreshing %s summaries failed; serving the stored ones", grouping, exc_info=True)
+    stats = STATS_TABLES[grouping]
+    statement = select(stats).order_by(*(stats.c[key] for key in keys))
+    if town is not None:
+        statement = statement.where(stats.c.town == town)
+    return db.execute(statement).all()
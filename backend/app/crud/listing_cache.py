@@ -0,0 +1,163 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.metrics import Counter, registry
+
+logger = logging.getLogger(__name__)
+
+LISTING_CACHE_REQUESTS = registry.register(Counter(
+    "listing_cache_requests_total", "Listing cache lookups by result: hit, miss or error.", ("result",),
+))
+
+
+class MemoryCacheBackend:
+    """Bounded in-process store: least recently used entries are evicted once `max_entries` are held."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generation = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self) -> int:
+        return self._generation
+
+    def bump_generation(self) -> None:
+        # Entries of older generations can no longer be read, so they are dropped rather than left to age out.
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """
+    Store shared by every process through a Redis-compatible server.
+
+    The generation is a server-side counter, so a write in one process invalidates the entries of all
+    of them. Memory is bounded by the entry TTLs and the server's own maxmemory policy.
+    """
+
+    def __init__(self, url: str, prefix: str = "listings"):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("LISTING_CACHE_URL requires the redis package (pip install redis)") from exc
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(f"{self._prefix}:{key}")
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self._client.set(f"{self._prefix}:{key}", value, px=max(1, int(ttl_seconds * 1000)))
+
+    def generation(self) -> int:
+        return int(self._client.get(f"{self._prefix}:generation") or 0)
+
+    def bump_generation(self) -> None:
+        self._client.incr(f"{self._prefix}:generation")
+
+
+def cache_backend(url: str, max_entries: int):
+    """Return a Redis backend for a redis:// (or rediss://, unix://) URL, otherwise an in-process one."""
+    if url:
+        return RedisCacheBackend(url)
+    return MemoryCacheBackend(max_entries)
+
+
+class ListingCache:
+    """
+    Read-through cache of encoded `/properties_listings/` responses, keyed on normalized filters.
+
+    Keys embed the backend's generation, which every write made through the CRUD functions bumps,
+    so a write hides all earlier entries at once; a response computed while a write was in flight
+    is stored under the generation it started with and is never served. Writes made outside the
+    CRUD functions (e.g. by the bulk importer) show after `ttl_seconds`.
+    Backend failures are logged and treated as misses, so a cache outage only costs speed.
+    """
+
+    def __init__(self, backend, ttl_seconds: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled and ttl_seconds > 0
+
+    @staticmethod
+    def normalize(filters: dict) -> dict:
+        """Drop unset filters and surrounding whitespace, so equivalent requests share an entry."""
+        normalized = {}
+        for name, value in filters.items():
+            if isinstance(value, str):
+                value = value.strip() or None
+            if value is not None:
+                normalized[name] = value
+        return normalized
+
+    def key(self, filters: dict) -> Optional[str]:
+        """Return the cache key of a listing request under the current generation, or None when disabled."""
+        if not self.enabled:
+            return None
+        digest = hashlib.sha1(json.dumps(self.normalize(filters), sort_keys=True).encode()).hexdigest()
+        try:
+            return f"{self.backend.generation()}:{digest}"
+        except Exception:
+            logger.warning("Listing cache unavailable", exc_info=True)
+            LISTING_CACHE_REQUESTS.inc("error")
+            return None
+
+    def get(self, key: Optional[str]) -> Optional[bytes]:
+        """Return the cached body for a key from `key`, counting the hit or miss."""
+        if key is None:
+            return None
+        try:
+            body = self.backend.get(key)
+        except Exception:
+            logger.warning("Listing cache unavailable", exc_info=True)
+            LISTING_CACHE_REQUESTS.inc("error")
+            return None
+        LISTING_CACHE_REQUESTS.inc("miss" if body is None else "hit")
+        return body
+
+    def set(self, key: Optional[str], body: bytes) -> None:
+        """Store a response body under a key from `key`."""
+        if key is None:
+            return
+        try:
+            self.backend.set(key, body, self.ttl_seconds)
+        except Exception:
+            logger.warning("Listing cache unavailable", exc_info=True)
+
+    def invalidate(self) -> None:
+        """Hide every cached response; called after each write to the properties table."""
+        if not self.enabled:
+            return
+        try:
+            self.backend.bump_generation()
+        except Exception:
+            logger.warning("Listing cache invalidation failed", exc_info=True)
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import threading
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.models import Property
+
+# Columns summarised for the filter sliders.
+RANGE_COLUMNS = ("estimated_market_value", "building_sq_ft")
+
+
+def range_values(db_property: Property) -> dict:
+    """Pick a property's values for the summarised columns."""
+    return {column: getattr(db_property, column) for column in RANGE_COLUMNS}
+
+
+def range_etag(summary: dict) -> str:
+    """Return a weak ETag identifying a range summary's contents."""
+    digest = hashlib.sha1(json.dumps(summary, sort_keys=True).encode()).hexdigest()[:16]
+    return f'W/"{digest}"'
+
+
+class PropertyRangeCache:
+    """
+    Process-wide cache of the MIN/MAX summary behind `/properties/range`.
+
+    Writes made through the CRUD functions keep the cached summary current: a new value can only
+    widen a range, so inserts and updates extend it in place, while removing a value that sits on
+    a boundary drops the summary to be recomputed on the next read. Entries also expire after
+    `ttl_seconds` so writes made by other processes are picked up.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._summary = None
+        self._loaded_at = 0.0
+        # Bumped on every observed write, so a load that raced with a write is not stored.
+        self._generation = 0
+
+    def get(self, db: Session) -> dict:
+        """Return the cached summary, loading it from the database when missing or expired."""
+        summary, generation = self._cached()
+        if summary is None:
+            summary = self._store(self._summarize(db.execute(self._statement()).one()), generation)
+        return summary
+
+    async def get_async(self, db: AsyncSession) -> dict:
+        """Async counterpart of `get`."""
+        summary, generation = self._cached()
+        if summary is None:
+            summary = self._store(self._summarize((await db.execute(self._statement())).one()), generation)
+        return summary
+
+    def invalidate(self) -> None:
+        """Drop the cached summary."""
+        with self._lock:
+            self._generation += 1
+            self._summary = None
+
+    def observe_insert(self, values: dict) -> None:
+        """Widen the cached ranges to include a newly stored row's values."""
+        with self._lock:
+            self._generation += 1
+            if self._summary is not None:
+                self._summary = self._widen(self._summary, values)
+
+    def observe_delete(self, values: dict) -> None:
+        """Account for a removed row, invalidating if it held a minimum or maximum."""
+        with self._lock:
+            self._generation += 1
+            if self._summary is not None and self._on_boundary(self._summary, values):
+                self._summary = None
+
+    def observe_update(self, before: dict, after: dict) -> None:
+        """Account for a row whose range columns changed from `before` to `after`."""
+        changed = [column for column in RANGE_COLUMNS if before.get(column) != after.get(column)]
+        if not changed:
+            return
+        with self._lock:
+            self._generation += 1
+            if self._summary is None:
+                return
+            if self._on_boundary(self._summary, {column: before.get(column) for column in changed}):
+                self._summary = None
+            else:
+                self._summary = self._widen(self._summary, {column: after.get(column) for column in changed})
+
+    def _cached(self) -> tuple:
+        with self._lock:
+            if self._summary is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+                return self._summary, self._generation
+            return None, self._generation
+
+    def _store(self, summary: dict, generation: int) -> dict:
+        # A write observed while loading makes the loaded summary suspect, so it is not kept.
+        with self._lock:
+            if generation == self._generation:
+                self._summary, self._loaded_at = summary, time.monotonic()
+        return summary
+
+    @staticmethod
+    def _statement():
+        return select(*(
+            aggregate(getattr(Property, column))
+            for column in RANGE_COLUMNS for aggregate in (func.min, func.max)
+        ))
+
+    @staticmethod
+    def _summarize(values) -> dict:
+        return {
+            column: {"min": values[2 * i], "max": values[2 * i + 1]}
+            for i, column in enumerate(RANGE_COLUMNS)
+        }
+
+    @staticmethod
+    def _widen(summary: dict, values: dict) -> dict:
+        widened = dict(summary)
+        for column, value in values.items():
+            if column not in summary or value is None:
+                continue
+            current = summary[column]
+            widened[column] = {
+                "min": value if current["min"] is None else min(current["min"], value),
+                "max": value if current["max"] is None else max(current["max"], value),
+            }
+        return widened
+
+    @staticmethod
+    def _on_boundary(summary: dict, values: dict) -> bool:
+        return any(
+            value is not None and value in (summary[column]["min"], summary[column]["max"])
+            for column, value in values.items() if column in summary
+        )
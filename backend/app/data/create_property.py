@@ -1,4 +1,7 @@
+import csv
+import io
 import json
+import os
 import sys
 
 import pandas as pd
@@ -7,30 +10,56 @@ from requests.auth import HTTPBasicAuth
 
 # Constants
 EXCEL_FILE = "/Users/soumyatalikoti/Downloads/Enodo_Skills_Assessment_Data_File.xlsx"
+CSV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Enodo_Skills_Assessment_Data_File.csv")
+CSV_DELIMITER = ";"
+CHUNK_ROWS = 5000
 
 BASE_URL = "http://localhost:8000"
 LOGIN_URL = "http://localhost:8000/token"
+REFRESH_URL = f"{BASE_URL}/token/refresh"
 CREATE_PROPERTY_URL = "http://localhost:8000/properties/"
 UPDATE_PROPERTY_URL = f"{BASE_URL}/properties/{{}}"
 DELETE_PROPERTY_URL = f"{BASE_URL}/properties/{{}}"
 RANGE_PROPERTY_URL = f"{BASE_URL}/properties/range"
 PROPERTY_LISTINGS = f"{BASE_URL}/properties_listings/"
+BULK_PROPERTY_URL = f"{BASE_URL}/properties/bulk"
 LOG_FILE = "failed_logs.txt"
 
+# One pooled session, so every request reuses the same keep-alive connection.
+SESSION = requests.Session()
 
-def get_access_token():
+
+def get_tokens():
+    """Log in and return the token response: an access token, and a refresh token when the API issues them."""
     try:
-        response = requests.post(
+        response = SESSION.post(
             LOGIN_URL,
             auth=HTTPBasicAuth("admin", "password")
         )
         response.raise_for_status()
-        return response.json().get("access_token")
+        return response.json()
     except requests.RequestException as e:
         print(f"Error getting access token: {e}")
         return None
 
 
+def get_access_token():
+    tokens = get_tokens()
+    return tokens.get("access_token") if tokens else None
+
+
+def refresh_tokens(tokens):
+    """Replace expired tokens, through /token/refresh when there is a refresh token, otherwise by logging in."""
+    if tokens.get("refresh_token"):
+        try:
+            response = SESSION.post(REFRESH_URL, json={"refresh_token": tokens["refresh_token"]})
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            print(f"Error refreshing access token: {e}")
+    return get_tokens()
+
+
 class CustomJSONEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, float):
@@ -110,7 +139,7 @@ def post_property(token_, property_data):
         "Content-Type": "application/json"
     }
     json_data = json.dumps(property_data, cls=CustomJSONEncoder)
-    response = requests.post(CREATE_PROPERTY_URL, data=json_data, headers=headers)
+    response = SESSION.post(CREATE_PROPERTY_URL, data=json_data, headers=headers)
     if response.status_code != 201:
         print(f"Failed to post property. Response: {response.text}")
     return response
@@ -120,7 +149,7 @@ def get_property(property_id):
     url = f"{BASE_URL}/properties/{property_id}"
     headers = {"Authorization": f"Bearer {token}"}
 
-    response = requests.get(url, headers=headers)
+    response = SESSION.get(url, headers=headers)
 
     if response.status_code == 200:
         property_data = response.json()
@@ -136,59 +165,97 @@ def update_property(token_, property_id, property_data):
     url = UPDATE_PROPERTY_URL.format(property_id)
     headers = {"Authorization": f"Bearer {token_}", "Content-Type": "application/json"}
     json_data = json.dumps(property_data, cls=CustomJSONEncoder)
-    response = requests.put(url, data=json_data, headers=headers)
+    response = SESSION.put(url, data=json_data, headers=headers)
     return response
 
 
 def delete_property(token_, property_id):
     url = DELETE_PROPERTY_URL.format(property_id)
     headers = {"Authorization": f"Bearer {token_}"}
-    response = requests.delete(url, headers=headers)
+    response = SESSION.delete(url, headers=headers)
     return response.json()
 
 
 def get_property_listings(token_):
     url = PROPERTY_LISTINGS
     headers = {"Authorization": f"Bearer {token_}"}
-    response = requests.get(url, headers=headers)
+    response = SESSION.get(url, headers=headers)
     return response.json()
 
 
 def get_property_listings_range(token_):
     url = RANGE_PROPERTY_URL
     headers = {"Authorization": f"Bearer {token_}", "Content-Type": "application/json"}
-    response = requests.get(url, headers=headers)
+    response = SESSION.get(url, headers=headers)
     return response.json()
 
 
+def iter_csv_chunks(path, chunk_rows=CHUNK_ROWS, delimiter=CSV_DELIMITER):
+    """Yield the file as CSV bodies of at most `chunk_rows` records, each starting with the header."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader)
+        rows = []
+        for row in reader:
+            rows.append(row)
+            if len(rows) == chunk_rows:
+                yield _csv_body(header, rows, delimiter)
+                rows = []
+        if rows:
+            yield _csv_body(header, rows, delimiter)
+
+
+def _csv_body(header, rows, delimiter):
+    body = io.StringIO()
+    writer = csv.writer(body, delimiter=delimiter)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return body.getvalue().encode()
+
+
+def iter_excel_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Yield the workbook as NDJSON bodies of at most `chunk_rows` records."""
+    df = pd.read_excel(path, dtype=str).fillna("")
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_json(orient="records", lines=True).encode()
+
+
+def load_file(tokens, path, chunk_rows=CHUNK_ROWS):
+    """
+    Stream a CSV or Excel file to POST /properties/bulk in chunks and log rejected rows.
+
+    `tokens` is the response of `get_tokens`. Access tokens expire during long loads, so a chunk
+    answered with 401 is sent again with refreshed tokens.
+    """
+    if path.lower().endswith(".csv"):
+        chunks, content_type, params = iter_csv_chunks(path, chunk_rows), "text/csv", {"delimiter": CSV_DELIMITER}
+    else:
+        chunks, content_type, params = iter_excel_chunks(path, chunk_rows), "application/x-ndjson", {}
+
+    totals = {"received": 0, "inserted": 0, "failed": 0}
+    with open(LOG_FILE, "w") as log:
+        for body in chunks:
+            headers = {"Authorization": f"Bearer {tokens['access_token']}", "Content-Type": content_type}
+            response = SESSION.post(BULK_PROPERTY_URL, data=body, headers=headers, params=params)
+            if response.status_code == 401:
+                tokens = refresh_tokens(tokens)
+                if not tokens:
+                    raise RuntimeError(f"Could not renew the access token after {totals['received']} rows")
+                headers["Authorization"] = f"Bearer {tokens['access_token']}"
+                response = SESSION.post(BULK_PROPERTY_URL, data=body, headers=headers, params=params)
+            response.raise_for_status()
+            report = response.json()
+            for error in report["errors"]:
+                log.write(f"Failed to post row {totals['received'] + error['row']}: {json.dumps(error['errors'])}\n")
+            for key in totals:
+                totals[key] += report[key]
+            print(f"{totals['received']} rows sent, {totals['inserted']} inserted, {totals['failed']} failed")
+    return totals
+
+
 if __name__ == "__main__":
-    token = get_access_token()
-    print(get_property_listings_range(token))
-    # if token:
-    #     df = pd.read_excel(EXCEL_FILE, dtype=str)
-    #
-    #     for index, row in df.iterrows():
-    #         property_data = row_to_property_base(row)
-    #         post_response = post_property(token, property_data)
-    #         print(post_response.json())
-    #         if post_response.status_code == 201:
-    #             property_id = post_response.json().get("id")
-    #             print(f"Property {property_id} created.")
-
-                # # Update the property
-                # update_response = update_property(token, property_id, {"zip": "99999"})
-                # if update_response.status_code == 200:
-                #     print(f"Property {property_id} updated.")
-                # else:
-                #     print(f"Failed to update property {property_id}.")
-
-                # # Delete the property
-                # delete_response = delete_property(token, property_id)
-                # if delete_response.status_code == 204:
-                #     print(f"Property {property_id} deleted.")
-                # else:
-                #     print(f"Failed to delete property {property_id}.")
-    #         else:
-    #             print("Failed to create property.")
-    # else:
-    #     print("Failed to obtain access token.")
\ No newline at end of file
+    tokens = get_tokens()
+    if tokens:
+        load_file(tokens, sys.argv[1] if len(sys.argv) > 1 else CSV_FILE)
+    else:
+        print("Failed to obtain access token.")
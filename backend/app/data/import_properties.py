@@ -0,0 +1,211 @@
+"""
+Offline importer: load an assessor file straight into the database without going through the API.
+
+Usage:
+    python -m app.data.import_properties PATH [--delimiter ;] [--chunk-size 50000] [--database-url URL] [--upsert]
+
+CSV and Parquet files are read in chunks; Excel workbooks are read whole (openpyxl cannot stream
+them through pandas) and then processed in chunks. Each chunk is coerced column by column with the
+same rules as the PropertyBase validators, rejected rows are counted per offending column, and the
+rest is written with one executemany per chunk. With --upsert, rows whose PIN is already stored
+update that property only when their values changed, so re-importing a roll writes just the difference.
+"""
+import argparse
+import json
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Iterator, Optional, get_args
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.crud_bulk import (
+    THOUSANDS_GROUPED_INT, bulk_insert_properties_db, normalize_field_name, upsert_properties_db
+)
+from app.db.database import SessionLocal
+from app.db.migrate import upgrade_database
+from app.schemas.property import PropertyBase
+
+DEFAULT_CHUNK_SIZE = 50000
+NULL_STRINGS = ("", "null")
+DATE_FORMATS = ("%m/%d/%y", "%m/%d/%Y", "%Y-%m-%d")
+YEAR_FIELDS = ("pprior_year",)
+
+
+def _field_types() -> dict:
+    """Group PropertyBase fields by the Python type they are coerced to."""
+    groups = {str: [], int: [], float: [], datetime: []}
+    for name, field in PropertyBase.model_fields.items():
+        annotation = field.annotation
+        base = next((arg for arg in get_args(annotation) if arg is not type(None)), annotation)
+        groups[base].append(name)
+    return groups
+
+
+FIELD_TYPES = _field_types()
+REQUIRED_FIELDS = {name for name, field in PropertyBase.model_fields.items() if field.is_required()}
+
+
+def _blank(values: pd.Series) -> pd.Series:
+    return values.isna() | values.str.strip().str.lower().isin(NULL_STRINGS)
+
+
+def coerce_strings(values: pd.Series) -> tuple:
+    """Strip whitespace; missing cells become empty strings as in the assessor exports."""
+    return values.fillna("").str.strip(), pd.Series(False, index=values.index)
+
+
+def coerce_ints(values: pd.Series) -> tuple:
+    """
+    Parse whole numbers, also when thousands are grouped with periods ("1.302.750"); blank and 'null'
+    cells are missing, anything else non-integral is rejected.
+    """
+    stripped = values.str.strip()
+    blank = _blank(values)
+    grouped = stripped.str.fullmatch(THOUSANDS_GROUPED_INT).fillna(False).astype(bool)
+    stripped = stripped.mask(grouped, stripped.str.replace(".", "", regex=False))
+    integral = stripped.str.fullmatch(r"[+-]?\d+").fillna(False).astype(bool)
+    parsed = pd.to_numeric(stripped.where(integral), errors="coerce").astype("Int64")
+    return parsed, ~blank & ~integral
+
+
+def coerce_floats(values: pd.Series) -> tuple:
+    """Parse decimals written with either a comma or a dot, as the latitude/longitude validator does."""
+    blank = _blank(values)
+    parsed = pd.to_numeric(values.str.strip().str.replace(",", ".", regex=False), errors="coerce")
+    return parsed, ~blank & parsed.isna()
+
+
+def coerce_years(values: pd.Series) -> tuple:
+    """Parse four-digit years."""
+    parsed, rejected = coerce_ints(values)
+    out_of_range = parsed.notna() & ~parsed.between(1000, 9999)
+    return parsed.mask(out_of_range), rejected | out_of_range.fillna(False).astype(bool)
+
+
+def coerce_dates(values: pd.Series) -> tuple:
+    """Parse dates in the assessor's month/day/year layout or ISO format."""
+    blank = _blank(values)
+    stripped = values.str.strip()
+    parsed = pd.Series(pd.NaT, index=values.index)
+    for date_format in DATE_FORMATS:
+        missing = parsed.isna() & ~blank
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(stripped[missing], format=date_format, errors="coerce")
+    return parsed, ~blank & parsed.isna()
+
+
+def coerce_chunk(raw: pd.DataFrame) -> tuple:
+    """
+    Coerce a chunk of raw string columns into PropertyBase-compatible values.
+
+    Parameters:
+        raw (pd.DataFrame): Chunk with assessor or field-name headers and string values.
+
+    Returns:
+        tuple: The accepted rows as a DataFrame of field columns, and a Counter of rejections per column.
+    """
+    raw = raw.rename(columns=normalize_field_name)
+    coercers = {
+        **{name: coerce_strings for name in FIELD_TYPES[str]},
+        **{name: coerce_ints for name in FIELD_TYPES[int]},
+        **{name: coerce_floats for name in FIELD_TYPES[float]},
+        **{name: coerce_dates for name in FIELD_TYPES[datetime]},
+        **{name: coerce_years for name in YEAR_FIELDS},
+    }
+    columns, rejected, rejections = {}, pd.Series(False, index=raw.index), Counter()
+    for name, coerce in coercers.items():
+        values = raw[name].astype("string") if name in raw else pd.Series(pd.NA, index=raw.index, dtype="string")
+        parsed, bad = coerce(values)
+        if name in REQUIRED_FIELDS:
+            bad = bad | parsed.isna()
+        if bad.any():
+            rejections[name] += int(bad.sum())
+            rejected |= bad
+        columns[name] = parsed
+    return pd.DataFrame(columns)[~rejected], rejections
+
+
+def to_records(frame: pd.DataFrame) -> list:
+    """Convert coerced columns into insert parameters, with None for missing values."""
+    frame = frame.astype(object).where(frame.notna(), None)
+    for name in FIELD_TYPES[datetime]:
+        frame[name] = frame[name].map(lambda value: value.date() if value is not None else None)
+    return frame.to_dict("records")
+
+
+def read_chunks(path: str, chunk_size: int, delimiter: str) -> Iterator[pd.DataFrame]:
+    """Read a CSV, Parquet or Excel file as string-valued DataFrame chunks."""
+    lowered = path.lower()
+    if lowered.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas().astype("string")
+    elif lowered.endswith((".xlsx", ".xls")):
+        frame = pd.read_excel(path, dtype=str)
+        for start in range(0, len(frame), chunk_size):
+            yield frame.iloc[start:start + chunk_size]
+    else:
+        yield from pd.read_csv(path, sep=delimiter, dtype=str, keep_default_na=False, chunksize=chunk_size)
+
+
+def import_file(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, delimiter: str = ";",
+                database_url: Optional[str] = None, upsert: bool = False) -> dict:
+    """
+    Import an assessor file into the properties table.
+
+    Parameters:
+        path (str): CSV, Parquet or Excel file to import.
+        chunk_size (int): Rows read, coerced and committed together (default is 50000).
+        delimiter (str): CSV field delimiter (default is ";", as in the assessor export).
+        database_url (str): Database to load into (default is `settings.DATABASE_URL`).
+        upsert (bool): Update properties whose PIN is already stored instead of inserting them (default is False).
+
+    Returns:
+        dict: Row counts, throughput and rejection counts per column.
+    """
+    upgrade_database(database_url)
+    session_factory = sessionmaker(bind=create_engine(database_url)) if database_url else SessionLocal
+
+    started = time.perf_counter()
+    read = 0
+    written, rejections = Counter(), Counter()
+    with session_factory() as db:
+        for chunk in read_chunks(path, chunk_size, delimiter):
+            accepted, chunk_rejections = coerce_chunk(chunk)
+            if upsert:
+                written.update(upsert_properties_db(db, to_records(accepted)))
+            else:
+                written["inserted"] += bulk_insert_properties_db(db, to_records(accepted))
+            read += len(chunk)
+            rejections.update(chunk_rejections)
+    elapsed = time.perf_counter() - started
+    return {
+        "rows_read": read,
+        "rows_inserted": written["inserted"],
+        "rows_updated": written["updated"],
+        "rows_unchanged": written["unchanged"],
+        "rows_rejected": read - sum(written.values()),
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(read / elapsed, 1) if elapsed else None,
+        "rejections_by_column": dict(rejections.most_common()),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="CSV, Parquet or Excel file to import")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--delimiter", default=";", help="CSV field delimiter")
+    parser.add_argument("--database-url", help="database to load into (default: DATABASE_URL)")
+    parser.add_argument("--upsert", action="store_true", help="update properties whose PIN is already stored")
+    args = parser.parse_args(argv)
+    print(json.dumps(import_file(args.path, args.chunk_size, args.delimiter, args.database_url, args.upsert), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from ..core.config import settings
+from .database import engine_options, install_sqlite_pragmas
+from .instrumentation import install_query_instrumentation
+
+ASYNC_SQLALCHEMY_DATABASE_URL = settings.ASYNC_DATABASE_URL
+
+_options = engine_options(ASYNC_SQLALCHEMY_DATABASE_URL)
+if ASYNC_SQLALCHEMY_DATABASE_URL.startswith("sqlite") and "pool_size" in _options:
+    # aiosqlite defaults to NullPool; pool file databases like the sync engine does.
+    _options["poolclass"] = AsyncAdaptedQueuePool
+
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, **_options)
+if async_engine.dialect.name == "sqlite":
+    install_sqlite_pragmas(async_engine.sync_engine)
+if settings.METRICS_ENABLED:
+    install_query_instrumentation(async_engine.sync_engine)
+# Objects stay readable after commit, since lazy refreshes are not possible on an async session.
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
@@ -0,0 +1,139 @@
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+# One row per deleted property, holding the version its deletion was recorded at. A property that is
+# deleted again (after its ID was reused) replaces its earlier tombstone.
+property_tombstones = Table(
+    "property_tombstones", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("pin", Integer),
+    Column("version", Integer, nullable=False, index=True),
+    Column("deleted_at", DateTime, nullable=False),
+)
+
+# SQLite has no sequences; the last version handed out is kept in a single-row table.
+property_version_seq = Table(
+    "property_version_seq", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("value", Integer, nullable=False),
+)
+
+# SQLAlchemy's SQLite DateTime format, with microseconds.
+_SQLITE_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'"
+_SQLITE_NEXT = "UPDATE property_version_seq SET value = value + 1 WHERE id = 1"
+_SQLITE_CURRENT = "(SELECT value FROM property_version_seq WHERE id = 1)"
+
+_SQLITE_DDL = [
+    f"""CREATE TRIGGER IF NOT EXISTS property_versions_ai AFTER INSERT ON properties BEGIN
+        {_SQLITE_NEXT};
+        UPDATE properties SET version = {_SQLITE_CURRENT}, updated_at = {_SQLITE_NOW} WHERE id = new.id;
+    END""",
+    # Skipped for the trigger's own write, which is the only update that changes the version.
+    f"""CREATE TRIGGER IF NOT EXISTS property_versions_au AFTER UPDATE ON properties
+        WHEN new.version IS old.version BEGIN
+        {_SQLITE_NEXT};
+        UPDATE properties SET version = {_SQLITE_CURRENT}, updated_at = {_SQLITE_NOW} WHERE id = new.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS property_versions_ad AFTER DELETE ON properties BEGIN
+        {_SQLITE_NEXT};
+        INSERT OR REPLACE INTO property_tombstones (id, pin, version, deleted_at)
+        VALUES (old.id, old.pin, {_SQLITE_CURRENT}, {_SQLITE_NOW});
+    END""",
+]
+_SQLITE_TRIGGERS = ("property_versions_ai", "property_versions_au", "property_versions_ad")
+
+# Key of the transaction-level advisory lock taken before a version is handed out on PostgreSQL.
+VERSION_LOCK_KEY = 7301940207
+
+
+def postgres_version_functions(serialized: bool = True) -> list:
+    """
+    Statements defining the PostgreSQL trigger functions that stamp versions and record tombstones.
+
+    Sequence values are handed out in call order, not commit order, so without `serialized` a
+    transaction holding version N may commit after one holding N + 1 has been read, and a reader
+    that has moved past N + 1 never sees N. Serialized functions first take an advisory lock held
+    until commit, so writers to the properties table take versions, and commit, one at a time.
+    """
+    lock = f"PERFORM pg_advisory_xact_lock({VERSION_LOCK_KEY});" if serialized else ""
+    return [
+        f"""CREATE OR REPLACE FUNCTION stamp_property_version() RETURNS trigger AS $$
+        BEGIN
+            {lock}
+            NEW.version := nextval('property_version_seq');
+            NEW.updated_at := now() AT TIME ZONE 'UTC';
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql""",
+        f"""CREATE OR REPLACE FUNCTION record_property_tombstone() RETURNS trigger AS $$
+        BEGIN
+            {lock}
+            INSERT INTO property_tombstones (id, pin, version, deleted_at)
+            VALUES (OLD.id, OLD.pin, nextval('property_version_seq'), now() AT TIME ZONE 'UTC')
+            ON CONFLICT (id) DO UPDATE SET pin = EXCLUDED.pin, version = EXCLUDED.version,
+                deleted_at = EXCLUDED.deleted_at;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql""",
+    ]
+
+
+_POSTGRES_DDL = [
+    "CREATE SEQUENCE IF NOT EXISTS property_version_seq",
+    *postgres_version_functions(),
+    """CREATE OR REPLACE TRIGGER property_versions_stamp BEFORE INSERT OR UPDATE ON properties
+        FOR EACH ROW EXECUTE FUNCTION stamp_property_version()""",
+    """CREATE OR REPLACE TRIGGER property_versions_tombstone AFTER DELETE ON properties
+        FOR EACH ROW EXECUTE FUNCTION record_property_tombstone()""",
+]
+
+
+def create_change_tracking(connection: Connection) -> None:
+    """
+    Create the tombstone table and the triggers stamping every written property with a new version.
+
+    Each insert and update gives the row the next value of a database-wide version counter and the
+    current time in `updated_at`; each delete records a tombstone at the next version. Existing rows
+    are numbered by ID, so a feed read from version 0 starts with the whole table.
+
+    Versions become visible in order: once a version has been read, every lower version is already
+    committed, so a reader may resume after the highest version it saw without missing changes. On
+    SQLite this follows from its single writer; on PostgreSQL writers are serialized by an advisory
+    lock (see `postgres_version_functions`).
+
+    Parameters:
+        connection (Connection): Connection to the database holding the properties table, after the
+            version and updated_at columns were added.
+    """
+    if connection.dialect.name == "sqlite":
+        property_version_seq.create(connection, checkfirst=True)
+        ddl = _SQLITE_DDL
+    elif connection.dialect.name == "postgresql":
+        ddl = _POSTGRES_DDL
+    else:
+        raise NotImplementedError(f"Change tracking is not available for {connection.dialect.name}")
+    property_tombstones.create(connection, checkfirst=True)
+    connection.exec_driver_sql("UPDATE properties SET version = id, updated_at = CURRENT_TIMESTAMP")
+    last = connection.exec_driver_sql("SELECT COALESCE(MAX(id), 0) FROM properties").scalar()
+    for statement in ddl:
+        connection.exec_driver_sql(statement)
+    if connection.dialect.name == "sqlite":
+        connection.execute(property_version_seq.insert().values(id=1, value=last))
+    elif last:
+        connection.exec_driver_sql(f"SELECT setval('property_version_seq', {int(last)})")
+
+
+def drop_change_tracking(connection: Connection) -> None:
+    """Drop the triggers and tables created by `create_change_tracking`."""
+    if connection.dialect.name == "sqlite":
+        for trigger in _SQLITE_TRIGGERS:
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+    elif connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("DROP TRIGGER IF EXISTS property_versions_stamp ON properties")
+        connection.exec_driver_sql("DROP TRIGGER IF EXISTS property_versions_tombstone ON properties")
+        connection.exec_driver_sql("DROP FUNCTION IF EXISTS stamp_property_version()")
+        connection.exec_driver_sql("DROP FUNCTION IF EXISTS record_property_tombstone()")
+        connection.exec_driver_sql("DROP SEQUENCE IF EXISTS property_version_seq")
+    metadata.drop_all(connection)
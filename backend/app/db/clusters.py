@@ -0,0 +1,155 @@
+from sqlalchemy import Column, Float, Integer, MetaData, PrimaryKeyConstraint, Table, insert
+from sqlalchemy.engine import Connection
+
+# Map clusters are kept for zoom levels 0..CLUSTER_MAX_ZOOM on a grid of CELLS_PER_TILE x CELLS_PER_TILE
+# cells per map tile. Cell edges are measured in degrees and halve with each zoom level, so a property's
+# cell at zoom z is its cell on the finest grid shifted right by CLUSTER_MAX_ZOOM - z bits.
+CLUSTER_MAX_ZOOM = 16
+CELLS_PER_TILE = 4
+FINEST_CELL_DEGREES = 360.0 / (2 ** CLUSTER_MAX_ZOOM * CELLS_PER_TILE)
+
+metadata = MetaData()
+
+property_clusters = Table(
+    "property_clusters", metadata,
+    Column("zoom", Integer, nullable=False),
+    Column("cell_x", Integer, nullable=False),
+    Column("cell_y", Integer, nullable=False),
+    Column("count", Integer, nullable=False),
+    Column("latitude", Float, nullable=False),
+    Column("longitude", Float, nullable=False),
+    Column("median_estimated_market_value", Integer),
+    PrimaryKeyConstraint("zoom", "cell_x", "cell_y"),
+)
+
+# Cells whose properties changed since their clusters were last computed.
+property_cluster_dirty = Table(
+    "property_cluster_dirty", metadata,
+    Column("zoom", Integer, nullable=False),
+    Column("cell_x", Integer, nullable=False),
+    Column("cell_y", Integer, nullable=False),
+    PrimaryKeyConstraint("zoom", "cell_x", "cell_y"),
+)
+
+# One row per zoom level, joined by the triggers to mark a property's cell at every level at once.
+property_cluster_zooms = Table(
+    "property_cluster_zooms", metadata,
+    Column("zoom", Integer, primary_key=True, autoincrement=False),
+    Column("shift", Integer, nullable=False),
+)
+
+
+def _mark(row: str, floor: str) -> str:
+    x = floor.format(f"({row}.longitude + 180.0) / {FINEST_CELL_DEGREES!r}")
+    y = floor.format(f"({row}.latitude + 90.0) / {FINEST_CELL_DEGREES!r}")
+    # "WHERE true" keeps SQLite from reading ON CONFLICT as part of the SELECT.
+    return (
+        f"INSERT INTO property_cluster_dirty (zoom, cell_x, cell_y) "
+        f"SELECT zoom, {x} >> shift, {y} >> shift FROM property_cluster_zooms WHERE true "
+        f"ON CONFLICT DO NOTHING"
+    )
+
+
+# CAST truncates in SQLite, which is the floor here because both offsets are non-negative.
+_SQLITE_FLOOR = "CAST({} AS INTEGER)"
+_SQLITE_LOCATED = "{0}.latitude IS NOT NULL AND {0}.longitude IS NOT NULL"
+_SQLITE_DDL = [
+    f"""CREATE TRIGGER IF NOT EXISTS property_clusters_ai AFTER INSERT ON properties
+        WHEN {_SQLITE_LOCATED.format("new")} BEGIN
+        {_mark("new", _SQLITE_FLOOR)};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS property_clusters_ad AFTER DELETE ON properties
+        WHEN {_SQLITE_LOCATED.format("old")} BEGIN
+        {_mark("old", _SQLITE_FLOOR)};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS property_clusters_au_old
+        AFTER UPDATE OF latitude, longitude, estimated_market_value ON properties
+        WHEN {_SQLITE_LOCATED.format("old")} BEGIN
+        {_mark("old", _SQLITE_FLOOR)};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS property_clusters_au_new
+        AFTER UPDATE OF latitude, longitude, estimated_market_value ON properties
+        WHEN {_SQLITE_LOCATED.format("new")} BEGIN
+        {_mark("new", _SQLITE_FLOOR)};
+    END""",
+]
+_SQLITE_TRIGGERS = ("property_clusters_ai", "property_clusters_ad", "property_clusters_au_old",
+                    "property_clusters_au_new")
+
+_POSTGRES_FLOOR = "CAST(floor({}) AS INTEGER)"
+_POSTGRES_DDL = [
+    f"""CREATE OR REPLACE FUNCTION mark_property_clusters_dirty() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' AND OLD.latitude IS NOT NULL AND OLD.longitude IS NOT NULL THEN
+            {_mark("OLD", _POSTGRES_FLOOR)};
+        END IF;
+        IF TG_OP <> 'DELETE' AND NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL THEN
+            {_mark("NEW", _POSTGRES_FLOOR)};
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE TRIGGER property_clusters_dirty
+        AFTER INSERT OR DELETE OR UPDATE OF latitude, longitude, estimated_market_value ON properties
+        FOR EACH ROW EXECUTE FUNCTION mark_property_clusters_dirty()""",
+]
+
+
+def create_cluster_tables(connection: Connection) -> None:
+    """
+    Create the cluster tables and the triggers that mark changed grid cells.
+
+    Every located property's cells start out dirty, so clusters are computed on first read rather
+    than in the migration.
+
+    Parameters:
+        connection (Connection): Connection to the database holding the properties table.
+    """
+    metadata.create_all(connection)
+    if connection.dialect.name == "sqlite":
+        ddl, floor = _SQLITE_DDL, _SQLITE_FLOOR
+    elif connection.dialect.name == "postgresql":
+        ddl, floor = _POSTGRES_DDL, _POSTGRES_FLOOR
+    else:
+        raise NotImplementedError(f"Cluster triggers are not available for {connection.dialect.name}")
+    connection.execute(insert(property_cluster_zooms), [
+        {"zoom": zoom, "shift": CLUSTER_MAX_ZOOM - zoom} for zoom in range(CLUSTER_MAX_ZOOM + 1)
+    ])
+    for statement in ddl:
+        connection.exec_driver_sql(statement)
+    x = floor.format(f"(longitude + 180.0) / {FINEST_CELL_DEGREES!r}")
+    y = floor.format(f"(latitude + 90.0) / {FINEST_CELL_DEGREES!r}")
+    connection.exec_driver_sql(
+        f"INSERT INTO property_cluster_dirty (zoom, cell_x, cell_y) "
+        f"SELECT DISTINCT zoom, {x} >> shift, {y} >> shift FROM properties, property_cluster_zooms "
+        f"WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+    )
+
+
+def drop_cluster_tables(connection: Connection) -> None:
+    """Drop the tables and triggers created by `create_cluster_tables`."""
+    if connection.dialect.name == "sqlite":
+        for trigger in _SQLITE_TRIGGERS:
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+    elif connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("DROP TRIGGER IF EXISTS property_clusters_dirty ON properties")
+        connection.exec_driver_sql("DROP FUNCTION IF EXISTS mark_property_clusters_dirty()")
+    metadata.drop_all(connection)
+
+
+def cell_degrees(zoom: int) -> float:
+    """Edge length in degrees of a grid cell at a zoom level."""
+    return FINEST_CELL_DEGREES * 2 ** (CLUSTER_MAX_ZOOM - zoom)
+
+
+def finest_cell(latitude: float, longitude: float) -> tuple:
+    """Finest-grid (cell_x, cell_y) of a point, computed exactly as the triggers do."""
+    return int((longitude + 180.0) / FINEST_CELL_DEGREES), int((latitude + 90.0) / FINEST_CELL_DEGREES)
+
+
+def cell_range(zoom: int, west: float, south: float, east: float, north: float) -> tuple:
+    """Inclusive (x0, y0, x1, y1) range of the cells at `zoom` overlapping a bounding box."""
+    shift = CLUSTER_MAX_ZOOM - zoom
+    x0, y0 = finest_cell(south, west)
+    x1, y1 = finest_cell(north, east)
+    return x0 >> shift, y0 >> shift, x1 >> shift, y1 >> shift
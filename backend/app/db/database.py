@@ -1,12 +1,108 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
+import threading
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from ..core.config import settings
+from .instrumentation import install_query_instrumentation
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in SQLALCHEMY_DATABASE_URL else {}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def sqlite_pragmas() -> dict:
+    """Pragmas applied to each new SQLite connection, from the settings."""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+    }
+
+
+def engine_options(url: str) -> dict:
+    """
+    Keyword arguments for `create_engine` / `create_async_engine` on the given URL.
+
+    Pool sizing applies to file databases and servers; in-memory SQLite keeps SQLAlchemy's
+    single-connection pool, since each connection would otherwise see its own empty database.
+    """
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING, "pool_recycle": settings.DB_POOL_RECYCLE}
+    in_memory = url.startswith("sqlite") and (":memory:" in url or url.split("://", 1)[-1] in ("", "/"))
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}
+    if not in_memory:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW, pool_timeout=settings.DB_POOL_TIMEOUT
+        )
+    return options
+
+
+def install_sqlite_pragmas(engine: Engine, pragmas: dict = None) -> None:
+    """Run the SQLite pragmas on every connection the engine opens."""
+    pragmas = sqlite_pragmas() if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def create_database_engine(url: str, pragmas: dict = None, **overrides) -> Engine:
+    """
+    Create an engine configured from the settings.
+
+    Parameters:
+        url (str): Database URL.
+        pragmas (dict): SQLite pragmas to use instead of `sqlite_pragmas()` (optional).
+        **overrides: Keyword arguments replacing those from `engine_options`.
+
+    Returns:
+        Engine: The configured engine.
+    """
+    engine = create_engine(url, **{**engine_options(url), **overrides})
+    if engine.dialect.name == "sqlite":
+        install_sqlite_pragmas(engine, pragmas)
+    return engine
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """
+    Return the application's engine, creating it on first use.
+
+    Importing the application does not create the engine, so processes that never touch the
+    database (or only import the app, as the startup budget test does) skip the work.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_database_engine(SQLALCHEMY_DATABASE_URL)
+                if settings.METRICS_ENABLED:
+                    install_query_instrumentation(engine)
+                SessionLocal.configure(bind=engine)
+                _engine = engine
+    return _engine
+
+
+class _LazySessionmaker(sessionmaker):
+    """A sessionmaker that creates the application's engine when the first session is made."""
+
+    def __call__(self, **local_kw):
+        get_engine()
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+
+
+def __getattr__(name: str):
+    # `engine` is still importable from this module; it is created on first access.
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,107 @@
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..core.config import settings
+from ..core.metrics import QUERY_LATENCY, SLOW_QUERIES, current_request_queries
+
+logger = logging.getLogger("app.slow_queries")
+
+_OPERATIONS = ("select", "insert", "update", "delete", "with")
+# Savepoint wrapping a PostgreSQL EXPLAIN, so its failure leaves the request's transaction usable.
+_EXPLAIN_SAVEPOINT = "slow_query_explain"
+# Longest rendering of a slow statement's bound parameters written to the log.
+_MAX_LOGGED_PARAMETERS = 2000
+
+
+def statement_operation(statement: str) -> str:
+    """The statement type used to label query metrics, e.g. "select"; "other" for anything else."""
+    word = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    return word if word in _OPERATIONS else "other"
+
+
+def explain(cursor, dialect: str, statement: str, parameters) -> str:
+    """
+    Return the database's plan for a statement, or a note on why none was produced.
+
+    The plan is read through a new cursor on the same DBAPI connection, so it neither fires engine
+    events nor disturbs the cursor of the statement being explained. On PostgreSQL it runs inside a
+    savepoint, since a failed statement would otherwise abort the request's transaction.
+    """
+    if statement_operation(statement) == "other":
+        return "not explained"
+    if dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif dialect == "postgresql":
+        prefix = "EXPLAIN "
+    else:
+        return f"EXPLAIN is not supported for {dialect}"
+    savepoint = dialect == "postgresql"
+    try:
+        plan_cursor = cursor.connection.cursor()
+    except Exception as exc:
+        return f"EXPLAIN unavailable: {exc}"
+    try:
+        if savepoint:
+            plan_cursor.execute(f"SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+        try:
+            plan_cursor.execute(prefix + statement, parameters)
+            rows = plan_cursor.fetchall()
+        except Exception:
+            if savepoint:
+                plan_cursor.execute(f"ROLLBACK TO SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+            raise
+        if savepoint:
+            plan_cursor.execute(f"RELEASE SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+    except Exception as exc:
+        return f"EXPLAIN failed: {exc}"
+    finally:
+        plan_cursor.close()
+    # SQLite returns (id, parent, notused, detail) rows, PostgreSQL one line of text per row.
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def install_query_instrumentation(engine: Engine, slow_query_ms: float = None, explain_slow: bool = None) -> None:
+    """
+    Time every statement the engine executes.
+
+    Each statement is recorded in the query latency histogram and counted towards the current
+    request, if any. Statements taking `slow_query_ms` or longer are logged to "app.slow_queries"
+    at WARNING with their bound parameters and, unless run as an executemany, their query plan.
+
+    Parameters:
+        engine (Engine): Engine to instrument; pass `AsyncEngine.sync_engine` for async engines.
+        slow_query_ms (float): Slow-query threshold in milliseconds; 0 turns the log off
+            (defaults to the SLOW_QUERY_MS setting).
+        explain_slow (bool): Include the query plan in slow-query entries (defaults to the SLOW_QUERY_EXPLAIN setting).
+    """
+    slow_query_ms = settings.SLOW_QUERY_MS if slow_query_ms is None else slow_query_ms
+    explain_slow = settings.SLOW_QUERY_EXPLAIN if explain_slow is None else explain_slow
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        operation = statement_operation(statement)
+        QUERY_LATENCY.observe(elapsed, operation)
+        queries = current_request_queries.get()
+        if queries is not None:
+            queries.count += 1
+            queries.seconds += elapsed
+        if slow_query_ms and elapsed * 1000 >= slow_query_ms:
+            SLOW_QUERIES.inc(operation)
+            rendered = repr(parameters)
+            if len(rendered) > _MAX_LOGGED_PARAMETERS:
+                rendered = rendered[:_MAX_LOGGED_PARAMETERS] + "..."
+            plan = (
+                explain(cursor, conn.dialect.name, statement, parameters)
+                if explain_slow and not executemany else "not explained"
+            )
+            logger.warning(
+                "Slow query (%.1f ms): %s\nParameters: %s\nPlan:\n%s", elapsed * 1000, statement, rendered, plan
+            )
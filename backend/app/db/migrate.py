@@ -0,0 +1,49 @@
+from functools import lru_cache
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.engine import Connection
+
+from ..core.config import settings
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+
+
+def alembic_config(database_url: str = None) -> Config:
+    """
+    Build an Alembic configuration pointing at this package's migrations.
+
+    Parameters:
+        database_url (str): Database to migrate (default is `settings.DATABASE_URL`).
+
+    Returns:
+        Config: The Alembic configuration.
+    """
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    config.set_main_option("sqlalchemy.url", database_url or settings.DATABASE_URL)
+    return config
+
+
+def upgrade_database(database_url: str = None) -> None:
+    """Bring the database schema up to the latest migration."""
+    command.upgrade(alembic_config(database_url), "head")
+
+
+@lru_cache(maxsize=None)
+def head_revisions() -> frozenset:
+    """The revisions the latest migrations leave a database at."""
+    return frozenset(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+def schema_is_current(connection: Connection) -> bool:
+    """Tell whether the connected database has had every migration applied."""
+    return frozenset(MigrationContext.configure(connection).get_current_heads()) == head_revisions()
+
+
+if __name__ == "__main__":
+    # The one-shot migration step of a deployment: run once, before any API worker starts.
+    upgrade_database()
@@ -0,0 +1,98 @@
+"""Baseline properties schema and text search index
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+Databases created by the old `create_all` call at startup already have the properties table,
+so it is only created when missing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.search import create_search_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table("properties"):
+        op.create_table(
+            "properties",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("full_address", sa.String()),
+            sa.Column("longitude", sa.Float()),
+            sa.Column("latitude", sa.Float()),
+            sa.Column("zip", sa.Integer()),
+            sa.Column("rec_type", sa.String()),
+            sa.Column("pin", sa.Integer()),
+            sa.Column("ovacls", sa.Integer()),
+            sa.Column("class_description", sa.String()),
+            sa.Column("current_land", sa.Integer()),
+            sa.Column("current_building", sa.Integer()),
+            sa.Column("current_total", sa.Integer()),
+            sa.Column("estimated_market_value", sa.Integer()),
+            sa.Column("prior_land", sa.Integer()),
+            sa.Column("prior_building", sa.Integer()),
+            sa.Column("prior_total", sa.Integer()),
+            sa.Column("pprior_land", sa.Integer()),
+            sa.Column("pprior_building", sa.Integer()),
+            sa.Column("pprior_total", sa.Integer()),
+            sa.Column("pprior_year", sa.Integer()),
+            sa.Column("town", sa.Integer()),
+            sa.Column("volume", sa.Integer()),
+            sa.Column("loc", sa.String()),
+            sa.Column("tax_code", sa.Integer()),
+            sa.Column("neighborhood", sa.Integer()),
+            sa.Column("houseno", sa.Integer()),
+            sa.Column("dir", sa.String()),
+            sa.Column("street", sa.String()),
+            sa.Column("suffix", sa.String()),
+            sa.Column("apt", sa.String()),
+            sa.Column("city", sa.String()),
+            sa.Column("res_type", sa.String()),
+            sa.Column("bldg_use", sa.String()),
+            sa.Column("apt_desc", sa.Integer()),
+            sa.Column("comm_units", sa.Integer()),
+            sa.Column("ext_desc", sa.String()),
+            sa.Column("full_bath", sa.Integer()),
+            sa.Column("half_bath", sa.Integer()),
+            sa.Column("bsmt_desc", sa.String()),
+            sa.Column("attic_desc", sa.String()),
+            sa.Column("ac", sa.Integer()),
+            sa.Column("fireplace", sa.Integer()),
+            sa.Column("gar_desc", sa.String()),
+            sa.Column("age", sa.Integer()),
+            sa.Column("building_sq_ft", sa.Integer()),
+            sa.Column("land_sq_ft", sa.Integer()),
+            sa.Column("bldg_sf", sa.Integer()),
+            sa.Column("units_tot", sa.Integer()),
+            sa.Column("multi_sale", sa.Integer()),
+            sa.Column("deed_type", sa.Integer()),
+            sa.Column("sale_date", sa.Date()),
+            sa.Column("sale_amount", sa.Integer()),
+            sa.Column("appcnt", sa.Integer()),
+            sa.Column("appeal_a", sa.Integer()),
+            sa.Column("appeal_a_status", sa.String()),
+            sa.Column("appeal_a_result", sa.String()),
+            sa.Column("appeal_a_reason", sa.Integer()),
+            sa.Column("appeal_a_pin_result", sa.String()),
+            sa.Column("appeal_a_propav", sa.Integer()),
+            sa.Column("appeal_a_currav", sa.Integer()),
+            sa.Column("appeal_a_resltdate", sa.Date()),
+        )
+        op.create_index("ix_properties_id", "properties", ["id"])
+        op.create_index("ix_properties_full_address", "properties", ["full_address"])
+    create_search_index(op.get_bind())
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS properties_fts")
+    op.drop_table("properties")
@@ -0,0 +1,40 @@
+"""Composite and covering indexes for the listing filters
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "ix_properties_estimated_market_value_id": ["estimated_market_value", "id"],
+    "ix_properties_building_sq_ft_id": ["building_sq_ft", "id"],
+    "ix_properties_class_description_emv": ["class_description", "estimated_market_value"],
+    "ix_properties_bldg_use_building_sq_ft": ["bldg_use", "building_sq_ft"],
+    "ix_properties_listing_covering": [
+        "estimated_market_value", "building_sq_ft", "class_description", "bldg_use",
+        "full_address", "latitude", "longitude",
+    ],
+}
+
+
+def upgrade() -> None:
+    for name, columns in INDEXES.items():
+        op.create_index(name, "properties", columns, if_not_exists=True)
+    # Give the planner row-count statistics for choosing between the new indexes.
+    op.execute("ANALYZE properties")
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name="properties", if_exists=True)
@@ -0,0 +1,27 @@
+"""Spatial index on property coordinates
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.spatial import create_spatial_index, drop_spatial_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_spatial_index(op.get_bind())
+
+
+def downgrade() -> None:
+    drop_spatial_index(op.get_bind())
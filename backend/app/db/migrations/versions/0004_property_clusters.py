@@ -0,0 +1,27 @@
+"""Precomputed map cluster tables and their dirty-cell triggers
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.clusters import create_cluster_tables, drop_cluster_tables
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_cluster_tables(op.get_bind())
+
+
+def downgrade() -> None:
+    drop_cluster_tables(op.get_bind())
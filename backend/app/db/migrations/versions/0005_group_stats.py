@@ -0,0 +1,27 @@
+"""Town, neighborhood and tax code summary tables and their dirty-group triggers
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.stats import create_stats_tables, drop_stats_tables
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_stats_tables(op.get_bind())
+
+
+def downgrade() -> None:
+    drop_stats_tables(op.get_bind())
@@ -0,0 +1,41 @@
+"""Unique parcel PIN and row content hash for upserting re-imports
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 12:00:00.000000
+
+Re-imports without a key left duplicate PINs behind. The most recently inserted row of each PIN is
+kept, since later imports carry the later roll; the others are moved to properties_pin_duplicates,
+which the downgrade restores them from.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows that lost to a later row with the same PIN.
+_SUPERSEDED = (
+    "pin IS NOT NULL AND id NOT IN (SELECT MAX(id) FROM properties WHERE pin IS NOT NULL GROUP BY pin)"
+)
+
+
+def upgrade() -> None:
+    op.add_column("properties", sa.Column("content_hash", sa.String()))
+    op.execute(f"CREATE TABLE properties_pin_duplicates AS SELECT * FROM properties WHERE {_SUPERSEDED}")
+    op.execute("DELETE FROM properties WHERE id IN (SELECT id FROM properties_pin_duplicates)")
+    op.create_index("ux_properties_pin", "properties", ["pin"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ux_properties_pin", table_name="properties")
+    op.execute("INSERT INTO properties SELECT * FROM properties_pin_duplicates")
+    op.drop_table("properties_pin_duplicates")
+    op.drop_column("properties", "content_hash")
@@ -0,0 +1,34 @@
+"""Property versions, update times and delete tombstones for the change feed
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.changes import create_change_tracking, drop_change_tracking
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("properties", sa.Column("updated_at", sa.DateTime()))
+    op.add_column("properties", sa.Column("version", sa.Integer()))
+    create_change_tracking(op.get_bind())
+    op.create_index("ix_properties_version", "properties", ["version"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_properties_version", table_name="properties")
+    drop_change_tracking(op.get_bind())
+    op.drop_column("properties", "version")
+    op.drop_column("properties", "updated_at")
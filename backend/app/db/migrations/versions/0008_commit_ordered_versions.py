@@ -0,0 +1,35 @@
+"""Hand out change feed versions in commit order on PostgreSQL
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.changes import postgres_version_functions
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _replace_functions(serialized: bool) -> None:
+    # SQLite's single writer already commits versions in order; only the PostgreSQL functions change.
+    connection = op.get_bind()
+    if connection.dialect.name == "postgresql":
+        for statement in postgres_version_functions(serialized):
+            connection.exec_driver_sql(statement)
+
+
+def upgrade() -> None:
+    _replace_functions(serialized=True)
+
+
+def downgrade() -> None:
+    _replace_functions(serialized=False)
@@ -0,0 +1,122 @@
+import re
+
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, func, literal, literal_column, select
+from sqlalchemy import Select
+from sqlalchemy.engine import Connection
+
+from app.models.models import Property
+
+# Text columns served by the search index.
+SEARCH_COLUMNS = ("full_address", "class_description", "bldg_use")
+
+# The FTS5 table lives in its own MetaData so `create_all` never tries to create it as a plain table.
+properties_fts = Table(
+    "properties_fts", MetaData(),
+    Column("rowid", Integer),
+    Column("rank", Float),
+    *(Column(name, String) for name in SEARCH_COLUMNS),
+)
+
+_SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS properties_fts USING fts5(
+        {", ".join(SEARCH_COLUMNS)},
+        content='properties', content_rowid='id', prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS properties_fts_ai AFTER INSERT ON properties BEGIN
+        INSERT INTO properties_fts(rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES (new.id, {", ".join(f"new.{name}" for name in SEARCH_COLUMNS)});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS properties_fts_ad AFTER DELETE ON properties BEGIN
+        INSERT INTO properties_fts(properties_fts, rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES ('delete', old.id, {", ".join(f"old.{name}" for name in SEARCH_COLUMNS)});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS properties_fts_au AFTER UPDATE OF {", ".join(SEARCH_COLUMNS)} ON properties BEGIN
+        INSERT INTO properties_fts(properties_fts, rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES ('delete', old.id, {", ".join(f"old.{name}" for name in SEARCH_COLUMNS)});
+        INSERT INTO properties_fts(rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES (new.id, {", ".join(f"new.{name}" for name in SEARCH_COLUMNS)});
+    END""",
+]
+
+_POSTGRES_DDL = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX IF NOT EXISTS ix_properties_{name}_trgm ON properties USING gin ({name} gin_trgm_ops)"
+    for name in SEARCH_COLUMNS
+]
+
+
+def create_search_index(connection: Connection) -> None:
+    """
+    Create the text search index for the properties table if it does not exist yet.
+
+    On SQLite this is an external-content FTS5 table kept in sync with `properties` by triggers, so
+    every insert, update and delete (including bulk statements) is reflected without application code.
+    On PostgreSQL it is a set of pg_trgm GIN indexes, which PostgreSQL maintains itself.
+
+    Parameters:
+        connection (Connection): Connection to the database holding the properties table.
+    """
+    if connection.dialect.name == "sqlite":
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'properties_fts'"
+        ).first()
+        for statement in _SQLITE_DDL:
+            connection.exec_driver_sql(statement)
+        if not exists:
+            # Index any rows that were loaded before the search table existed.
+            connection.exec_driver_sql("INSERT INTO properties_fts(properties_fts) VALUES ('rebuild')")
+    elif connection.dialect.name == "postgresql":
+        for statement in _POSTGRES_DDL:
+            connection.exec_driver_sql(statement)
+
+
+def search_tokens(text: str) -> list:
+    """Split user input into lower-cased word tokens, dropping punctuation."""
+    return re.findall(r"\w+", text.lower())
+
+
+def _fts_expression(terms: dict) -> str:
+    """Build an FTS5 MATCH expression requiring every token as a prefix within its column."""
+    clauses = []
+    for column, text in terms.items():
+        tokens = search_tokens(text)
+        if tokens:
+            clauses.append(f"{column} : (" + " AND ".join(f'"{token}"*' for token in tokens) + ")")
+    return " AND ".join(clauses)
+
+
+def apply_text_search(statement: Select, dialect_name: str, terms: dict) -> tuple:
+    """
+    Restrict a Property select to rows matching the given per-column search text.
+
+    Every word of the search text must appear as a word prefix in its column, so "just st" matches
+    "210 N JUSTINE ST". On SQLite the match runs against the FTS5 index and is ranked by BM25; on
+    PostgreSQL it is an ILIKE served by the trigram indexes and ranked by similarity. Other databases
+    fall back to an unranked ILIKE scan.
+
+    Parameters:
+        statement (Select): Select over Property to restrict.
+        dialect_name (str): Name of the database dialect the select will run on.
+        terms (dict): Search text keyed by a column name from `SEARCH_COLUMNS`; empty values are ignored.
+
+    Returns:
+        tuple: The restricted select and a rank expression where lower values are better matches.
+    """
+    terms = {column: text for column, text in terms.items() if text and search_tokens(text)}
+    if not terms:
+        return statement, literal(0)
+
+    if dialect_name == "sqlite":
+        matches = (
+            select(properties_fts.c.rowid.label("id"), properties_fts.c.rank.label("rank"))
+            .where(literal_column("properties_fts").op("MATCH")(_fts_expression(terms)))
+            .subquery("search")
+        )
+        return statement.join(matches, Property.id == matches.c.id), matches.c.rank
+
+    for column, text in terms.items():
+        for token in search_tokens(text):
+            statement = statement.where(getattr(Property, column).ilike(f"%{token}%"))
+    if dialect_name == "postgresql":
+        rank = -sum(func.similarity(getattr(Property, column), text) for column, text in terms.items())
+        return statement, rank
+    return statement, literal(0)
@@ -7,3 +7,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    # Imported here so the async driver is only required when the async routes are enabled.
+    from .async_database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        yield db
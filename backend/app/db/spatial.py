@@ -0,0 +1,132 @@
+import math
+
+from sqlalchemy import Column, Float, Integer, MetaData, Select, Table, and_, select
+from sqlalchemy.engine import Connection
+
+from app.models.models import Property
+
+# Metres per degree of latitude (and of longitude at the equator) on a spherical Earth.
+METRES_PER_DEGREE = 111_320.0
+
+# Like properties_fts, the R*Tree lives in its own MetaData so `create_all` never creates it as a plain table.
+properties_rtree = Table(
+    "properties_rtree", MetaData(),
+    Column("id", Integer),
+    Column("min_lat", Float),
+    Column("max_lat", Float),
+    Column("min_lon", Float),
+    Column("max_lon", Float),
+)
+
+_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS properties_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+    """CREATE TRIGGER IF NOT EXISTS properties_rtree_ai AFTER INSERT ON properties
+        WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN
+        INSERT INTO properties_rtree VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS properties_rtree_ad AFTER DELETE ON properties BEGIN
+        DELETE FROM properties_rtree WHERE id = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS properties_rtree_au AFTER UPDATE OF latitude, longitude ON properties BEGIN
+        DELETE FROM properties_rtree WHERE id = old.id;
+        INSERT INTO properties_rtree
+        SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+        WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+    END""",
+]
+
+# Elsewhere a composite B-tree serves the latitude range and filters longitude from the index entries.
+_GENERIC_DDL = ["CREATE INDEX IF NOT EXISTS ix_properties_latitude_longitude ON properties (latitude, longitude)"]
+
+
+def create_spatial_index(connection: Connection) -> None:
+    """
+    Create the spatial index on property coordinates if it does not exist yet.
+
+    On SQLite this is an R*Tree holding one point per located property, kept in sync with
+    `properties` by triggers. Other databases get a (latitude, longitude) B-tree index.
+
+    Parameters:
+        connection (Connection): Connection to the database holding the properties table.
+    """
+    if connection.dialect.name == "sqlite":
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'properties_rtree'"
+        ).first()
+        for statement in _SQLITE_DDL:
+            connection.exec_driver_sql(statement)
+        if not exists:
+            connection.exec_driver_sql(
+                "INSERT INTO properties_rtree SELECT id, latitude, latitude, longitude, longitude FROM properties "
+                "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+            )
+    else:
+        for statement in _GENERIC_DDL:
+            connection.exec_driver_sql(statement)
+
+
+def drop_spatial_index(connection: Connection) -> None:
+    """Drop the spatial index created by `create_spatial_index`."""
+    if connection.dialect.name == "sqlite":
+        for trigger in ("properties_rtree_ai", "properties_rtree_ad", "properties_rtree_au"):
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+        connection.exec_driver_sql("DROP TABLE IF EXISTS properties_rtree")
+    else:
+        connection.exec_driver_sql("DROP INDEX IF EXISTS ix_properties_latitude_longitude")
+
+
+def radius_bbox(latitude: float, longitude: float, radius: float) -> tuple:
+    """
+    Bounding box of a circle, for narrowing a radius search through the index.
+
+    Parameters:
+        latitude (float): Latitude of the centre in degrees.
+        longitude (float): Longitude of the centre in degrees.
+        radius (float): Radius in metres.
+
+    Returns:
+        tuple: (west, south, east, north) in degrees.
+    """
+    d_lat = radius / METRES_PER_DEGREE
+    d_lon = radius / (METRES_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+    return longitude - d_lon, latitude - d_lat, longitude + d_lon, latitude + d_lat
+
+
+def squared_distance(latitude: float, longitude: float):
+    """
+    Squared distance in square metres from a point to each property, as a SQL expression.
+
+    Uses the equirectangular approximation, which needs only arithmetic (so it runs on any database)
+    and is accurate to well under one percent over the few kilometres a map view spans.
+    """
+    x = (Property.longitude - longitude) * (METRES_PER_DEGREE * math.cos(math.radians(latitude)))
+    y = (Property.latitude - latitude) * METRES_PER_DEGREE
+    return x * x + y * y
+
+
+def apply_bbox(statement: Select, dialect_name: str, west: float, south: float, east: float, north: float) -> Select:
+    """
+    Restrict a Property select to properties located inside a bounding box.
+
+    On SQLite the candidates come from the R*Tree. It stores 32-bit coordinates, so the exact
+    bounds are checked again on the property's own columns.
+
+    Parameters:
+        statement (Select): Select over Property to restrict.
+        dialect_name (str): Name of the database dialect the select will run on.
+        west, south, east, north (float): Box edges in degrees.
+
+    Returns:
+        Select: The restricted select.
+    """
+    exact = and_(Property.latitude.between(south, north), Property.longitude.between(west, east))
+    if dialect_name != "sqlite":
+        return statement.where(exact)
+
+    rtree = properties_rtree
+    candidates = (
+        select(rtree.c.id)
+        .where(rtree.c.max_lat >= south, rtree.c.min_lat <= north, rtree.c.max_lon >= west, rtree.c.min_lon <= east)
+        .subquery("spatial")
+    )
+    return statement.join(candidates, Property.id == candidates.c.id).where(exact)
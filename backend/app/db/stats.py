@@ -0,0 +1,138 @@
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, PrimaryKeyConstraint, Table
+from sqlalchemy.engine import Connection
+
+# Summary groupings and the Property columns identifying a group. Neighborhood codes are only unique
+# within a town, so neighborhoods are keyed by both.
+GROUPINGS = {
+    "town": ("town",),
+    "neighborhood": ("town", "neighborhood"),
+    "tax_code": ("tax_code",),
+}
+
+# Property columns the summaries are computed from; changing any of them (or a key) marks the group dirty.
+SOURCE_COLUMNS = ("estimated_market_value", "current_total", "prior_total", "pprior_total", "sale_amount")
+
+# Indexes that let a group's properties be read without scanning the table.
+KEY_INDEXES = {
+    "ix_properties_town_neighborhood": ["town", "neighborhood"],
+    "ix_properties_tax_code": ["tax_code"],
+}
+
+metadata = MetaData()
+
+
+def _stats_table(grouping: str, keys: tuple) -> Table:
+    return Table(
+        f"{grouping}_stats", metadata,
+        *(Column(key, Integer, nullable=False) for key in keys),
+        Column("property_count", Integer, nullable=False),
+        Column("median_estimated_market_value", Integer),
+        Column("median_current_total", Integer),
+        Column("current_total", Integer),
+        Column("prior_total", Integer),
+        Column("pprior_total", Integer),
+        # Change in summed assessed value, over properties assessed in both years.
+        Column("assessment_change", Float),
+        Column("prior_assessment_change", Float),
+        Column("sales_count", Integer, nullable=False),
+        # Median of estimated market value / sale amount over properties with a sale.
+        Column("median_sale_ratio", Float),
+        Column("refreshed_at", DateTime, nullable=False),
+        PrimaryKeyConstraint(*keys),
+    )
+
+
+def _dirty_table(grouping: str, keys: tuple) -> Table:
+    return Table(
+        f"{grouping}_stats_dirty", metadata,
+        *(Column(key, Integer, nullable=False) for key in keys),
+        PrimaryKeyConstraint(*keys),
+    )
+
+
+STATS_TABLES = {grouping: _stats_table(grouping, keys) for grouping, keys in GROUPINGS.items()}
+DIRTY_TABLES = {grouping: _dirty_table(grouping, keys) for grouping, keys in GROUPINGS.items()}
+
+
+def _mark(row: str) -> list:
+    """Statements marking the groups of `row` (NEW or OLD) dirty in every grouping."""
+    return [
+        f"INSERT INTO {grouping}_stats_dirty ({', '.join(keys)}) "
+        f"SELECT {', '.join(f'{row}.{key}' for key in keys)} "
+        f"WHERE {' AND '.join(f'{row}.{key} IS NOT NULL' for key in keys)} ON CONFLICT DO NOTHING"
+        for grouping, keys in GROUPINGS.items()
+    ]
+
+
+_WATCHED = ", ".join(sorted({key for keys in GROUPINGS.values() for key in keys} | set(SOURCE_COLUMNS)))
+
+_SQLITE_DDL = [
+    f"""CREATE TRIGGER IF NOT EXISTS property_stats_ai AFTER INSERT ON properties BEGIN
+        {"; ".join(_mark("new"))};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS property_stats_ad AFTER DELETE ON properties BEGIN
+        {"; ".join(_mark("old"))};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS property_stats_au AFTER UPDATE OF {_WATCHED} ON properties BEGIN
+        {"; ".join(_mark("old") + _mark("new"))};
+    END""",
+]
+_SQLITE_TRIGGERS = ("property_stats_ai", "property_stats_ad", "property_stats_au")
+
+_POSTGRES_DDL = [
+    f"""CREATE OR REPLACE FUNCTION mark_property_stats_dirty() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            {"; ".join(_mark("OLD"))};
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            {"; ".join(_mark("NEW"))};
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql""",
+    f"""CREATE OR REPLACE TRIGGER property_stats_dirty
+        AFTER INSERT OR DELETE OR UPDATE OF {_WATCHED} ON properties
+        FOR EACH ROW EXECUTE FUNCTION mark_property_stats_dirty()""",
+]
+
+
+def create_stats_tables(connection: Connection) -> None:
+    """
+    Create the summary tables, the triggers that mark changed groups and the group key indexes.
+
+    Every existing group starts out dirty, so summaries are computed on first read rather than in
+    the migration.
+
+    Parameters:
+        connection (Connection): Connection to the database holding the properties table.
+    """
+    if connection.dialect.name == "sqlite":
+        ddl = _SQLITE_DDL
+    elif connection.dialect.name == "postgresql":
+        ddl = _POSTGRES_DDL
+    else:
+        raise NotImplementedError(f"Stats triggers are not available for {connection.dialect.name}")
+    metadata.create_all(connection)
+    for name, columns in KEY_INDEXES.items():
+        connection.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {name} ON properties ({', '.join(columns)})")
+    for statement in ddl:
+        connection.exec_driver_sql(statement)
+    for grouping, keys in GROUPINGS.items():
+        connection.exec_driver_sql(
+            f"INSERT INTO {grouping}_stats_dirty ({', '.join(keys)}) SELECT DISTINCT {', '.join(keys)} "
+            f"FROM properties WHERE {' AND '.join(f'{key} IS NOT NULL' for key in keys)}"
+        )
+
+
+def drop_stats_tables(connection: Connection) -> None:
+    """Drop the tables, triggers and indexes created by `create_stats_tables`."""
+    if connection.dialect.name == "sqlite":
+        for trigger in _SQLITE_TRIGGERS:
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+    elif connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("DROP TRIGGER IF EXISTS property_stats_dirty ON properties")
+        connection.exec_driver_sql("DROP FUNCTION IF EXISTS mark_property_stats_dirty()")
+    for name in KEY_INDEXES:
+        connection.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+    metadata.drop_all(connection)
@@ -1,13 +1,29 @@
+from contextlib import asynccontextmanager
+
+from anyio import to_thread
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from app.api.endpoints import health as health_endpoint
+from app.api.endpoints import metrics as metrics_endpoint
 from app.api.endpoints import property as property_endpoint
-from app.db.base import Base
-from app.db.database import engine
+from app.api.middleware import MetricsMiddleware
+from app.core.config import settings
+from app.db.database import get_engine
 from fastapi.middleware.cors import CORSMiddleware
 
-# Generate the database schema
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup work lives here rather than at import, so importing the app stays cheap. The schema is
+    # not migrated here: with several workers starting at once the migrations would race, so they run
+    # once beforehand (python -m app.db.migrate, see entrypoint.sh).
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    # Created now rather than by the first request; this does not connect yet.
+    get_engine()
+    yield
+
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -15,5 +31,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.METRICS_ENABLED:
+    # Added last so it is outermost and times the other middleware too.
+    app.add_middleware(MetricsMiddleware)
 # Include your routers here
 app.include_router(property_endpoint.router)
+app.include_router(property_endpoint.crud_router)
+app.include_router(health_endpoint.router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_endpoint.router)
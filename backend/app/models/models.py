@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date
+from sqlalchemy import Column, Index, Integer, String, Float, Date, DateTime
 from app.db.base import Base
 
 from datetime import datetime
@@ -68,3 +68,31 @@ class Property(Base):
     appeal_a_propav = Column(Integer)
     appeal_a_currav = Column(Integer)
     appeal_a_resltdate = Column(Date)
+    # Digest of the imported values, compared by upserts to skip unchanged rows (see crud_bulk.content_hash).
+    content_hash = Column(String)
+    # Stamped by database triggers on every insert and update (see app/db/changes.py); never set them directly.
+    updated_at = Column(DateTime)
+    version = Column(Integer)
+
+    # Indexes serving the listing filters and orderings. They are created by migration 0002; keep
+    # the two in step. SQLite appends the rowid (id) to every index, so each one is also usable
+    # for the (column, id) keyset orderings.
+    __table_args__ = (
+        Index("ix_properties_estimated_market_value_id", "estimated_market_value", "id"),
+        Index("ix_properties_building_sq_ft_id", "building_sq_ft", "id"),
+        Index("ix_properties_class_description_emv", "class_description", "estimated_market_value"),
+        Index("ix_properties_bldg_use_building_sq_ft", "bldg_use", "building_sq_ft"),
+        # Covers a full listing row, so range-filtered listings never touch the table itself.
+        Index(
+            "ix_properties_listing_covering",
+            "estimated_market_value", "building_sq_ft", "class_description", "bldg_use",
+            "full_address", "latitude", "longitude",
+        ),
+        # Group keys of the town / neighborhood / tax code summaries, created by migration 0005.
+        Index("ix_properties_town_neighborhood", "town", "neighborhood"),
+        Index("ix_properties_tax_code", "tax_code"),
+        # Parcel key of upserting imports, created by migration 0006. NULL PINs are not constrained.
+        Index("ux_properties_pin", "pin", unique=True),
+        # Change feed order, created by migration 0007.
+        Index("ix_properties_version", "version"),
+    )
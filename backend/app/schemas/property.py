@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from pydantic import create_model
 
 
@@ -209,7 +209,7 @@ class PropertyListing(BaseModel):
     units_tot: Optional[int] = None
     multi_sale: Optional[int] = None
     deed_type: Optional[int] = None
-    sale_date: Optional[datetime] = None
+    sale_date: Optional[date] = None
     sale_amount: Optional[int] = None
     appcnt: Optional[int] = None
     appeal_a: Optional[int] = None
@@ -219,12 +219,138 @@ class PropertyListing(BaseModel):
     appeal_a_pin_result: Optional[str] = None
     appeal_a_propav: Optional[int] = None
     appeal_a_currav: Optional[int] = None
-    appeal_a_resltdate: Optional[datetime] = None
+    appeal_a_resltdate: Optional[date] = None
+
+
+class PropertyChange(BaseModel):
+    version: int
+    id: int
+    deleted: bool = False
+    updated_at: datetime
+    # The property as of this version; null for deletions.
+    property: Optional[PropertyListing] = None
+
+
+class PropertyChangesResponse(BaseModel):
+    changes: List[PropertyChange]
+    next_since: int
+    moreExists: bool
+
+
+class PropertyBatchGetRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, example=[1, 2, 3])
+
+
+class PropertyBatchGetResponse(BaseModel):
+    # One entry per requested ID, in request order; null where the ID does not exist.
+    properties: List[Optional[PropertyListing]]
+    missing: List[int]
 
 
 class PaginatedPropertyListingsResponse(BaseModel):
     properties: List[PropertyListings]
     moreExists: bool
+    next_cursor: Optional[str] = None
+
+
+class PropertyCluster(BaseModel):
+    count: int
+    latitude: float
+    longitude: float
+    median_estimated_market_value: Optional[int] = None
+
+
+class PropertyClustersResponse(BaseModel):
+    zoom: int
+    clusters: List[PropertyCluster]
+
+
+class FacetValue(BaseModel):
+    value: str
+    count: int
+
+
+class HistogramBucket(BaseModel):
+    min: int
+    max: int
+    count: int
+
+
+class PropertyFacetsResponse(BaseModel):
+    total: int
+    class_description: List[FacetValue]
+    bldg_use: List[FacetValue]
+    estimated_market_value: List[HistogramBucket]
+    building_sq_ft: List[HistogramBucket]
+
+
+class GroupStats(BaseModel):
+    town: Optional[int] = None
+    neighborhood: Optional[int] = None
+    tax_code: Optional[int] = None
+    property_count: int
+    median_estimated_market_value: Optional[int] = None
+    median_current_total: Optional[int] = None
+    current_total: Optional[int] = None
+    prior_total: Optional[int] = None
+    pprior_total: Optional[int] = None
+    assessment_change: Optional[float] = None
+    prior_assessment_change: Optional[float] = None
+    sales_count: int
+    median_sale_ratio: Optional[float] = None
+    refreshed_at: datetime
+
+
+class GroupStatsResponse(BaseModel):
+    grouping: str
+    groups: List[GroupStats]
+
+
+class BulkRowError(BaseModel):
+    row: int
+    errors: List[dict]
+
+
+class BulkIngestReport(BaseModel):
+    received: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    errors: List[BulkRowError] = []
+
+
+# Every PropertyBase field, optional and unvalidated beyond its type, for partial updates. Fields that
+# PropertyBase requires still reject an explicit null.
+PropertyPatch = create_model(
+    "PropertyPatch",
+    **{name: (field.annotation, None) for name, field in PropertyBase.model_fields.items()}
+)
+
+
+class PropertyFilter(BaseModel):
+    full_address: Optional[str] = None
+    class_description: Optional[str] = None
+    estimated_market_value_min: Optional[int] = None
+    estimated_market_value_max: Optional[int] = None
+    bldg_use: Optional[str] = None
+    building_sq_ft_min: Optional[int] = None
+    building_sq_ft_max: Optional[int] = None
+    exact_match: bool = False
+
+
+class PropertyBulkDeleteRequest(BaseModel):
+    # Either the IDs of the properties to change, or the listing filters selecting them.
+    ids: Optional[List[int]] = None
+    filter: Optional[PropertyFilter] = None
+
+
+class PropertyBulkUpdateRequest(PropertyBulkDeleteRequest):
+    values: PropertyPatch
+
+
+class BulkWriteResult(BaseModel):
+    affected: int
 
 
 class ValueRange(BaseModel):
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.core import auth
+from app.main import app
+
+
+@pytest.fixture
+def auth_client():
+    auth.token_cache.clear()
+    return TestClient(app)
+
+
+def test_verified_tokens_are_decoded_once(monkeypatch):
+    auth.token_cache.clear()
+    token = auth.create_access_token({"sub": "admin"})
+    decoded = []
+    real_decode = jwt.decode
+    monkeypatch.setattr(jwt, "decode", lambda *args, **kwargs: decoded.append(1) or real_decode(*args, **kwargs))
+
+    assert [auth.get_current_user(token) for _ in range(3)] == ["admin"] * 3
+    assert len(decoded) == 1
+
+
+def test_expired_and_tampered_tokens_are_rejected():
+    auth.token_cache.clear()
+    expired = auth.create_access_token({"sub": "admin"}, expires_delta=timedelta(seconds=-1))
+    valid = auth.create_access_token({"sub": "admin"})
+    auth.get_current_user(valid)
+
+    for token in (expired, valid[:-2] + "xx"):
+        with pytest.raises(HTTPException) as e:
+            auth.get_current_user(token)
+        assert e.value.status_code == 401
+
+
+def test_refresh_token_issues_new_access_token(auth_client):
+    tokens = auth_client.post("/token", auth=("admin", "password")).json()
+
+    refreshed = auth_client.post("/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+    assert refreshed.status_code == 200
+    assert auth.get_current_user(refreshed.json()["access_token"]) == "admin"
+
+
+def test_tokens_are_not_interchangeable(auth_client):
+    tokens = auth_client.post("/token", auth=("admin", "password")).json()
+
+    with pytest.raises(HTTPException):
+        auth.get_current_user(tokens["refresh_token"])
+    assert auth_client.post("/token/refresh", json={"refresh_token": tokens["access_token"]}).status_code == 401
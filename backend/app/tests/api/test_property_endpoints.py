@@ -0,0 +1,395 @@
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+from alembic import command
+
+from app.db.migrate import alembic_config
+
+
+def test_listings_cursor_pages_through_every_row(client, make_property):
+    for value in (300, 100, 200, 100, 400):
+        make_property(estimated_market_value=value)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "sort_by": "estimated_market_value"}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/properties_listings/", params=params).json()
+        seen.extend(p["estimated_market_value"] for p in body["properties"])
+        cursor = body["next_cursor"]
+        assert body["moreExists"] == (cursor is not None)
+        if not cursor:
+            break
+
+    assert seen == [100, 100, 200, 300, 400]
+
+
+def test_listings_more_exists_is_false_on_exact_last_page(client, make_property):
+    make_property()
+    make_property()
+
+    body = client.get("/properties_listings/", params={"limit": 2}).json()
+
+    assert len(body["properties"]) == 2
+    assert body["moreExists"] is False
+    assert body["next_cursor"] is None
+
+
+def test_listings_rejects_cursor_for_other_ordering(client, make_property):
+    make_property()
+    make_property()
+    cursor = client.get("/properties_listings/", params={"limit": 1}).json()["next_cursor"]
+
+    response = client.get("/properties_listings/", params={"cursor": cursor, "sort_by": "building_sq_ft"})
+
+    assert response.status_code == 400
+
+
+def test_properties_next_cursor_header(client, make_property):
+    for zip_code in (60601, 60602, 60603):
+        make_property(zip=zip_code)
+
+    first = client.get("/properties/", params={"limit": 2})
+    second = client.get("/properties/", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+
+    assert [p["zip"] for p in first.json()] == [60601, 60602]
+    assert [p["zip"] for p in second.json()] == [60603]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_property_detail_serializes_database_row(client, make_property):
+    db_property = make_property(zip=60601, latitude=41.88, sale_date=date(2019, 6, 3))
+
+    response = client.get(f"/properties/{db_property.id}")
+
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    assert body["id"] == db_property.id
+    assert (body["zip"], body["latitude"], body["sale_date"]) == (60601, 41.88, "2019-06-03")
+    assert body["appeal_a_resltdate"] is None
+
+
+def test_listings_address_search_matches_word_prefixes(client, make_property):
+    make_property(full_address="210 N JUSTINE ST, CHICAGO, IL")
+    make_property(full_address="1529 W TAYLOR ST, CHICAGO, IL")
+
+    body = client.get("/properties_listings/", params={"full_address": "justi 210"}).json()
+
+    assert [p["full_address"] for p in body["properties"]] == ["210 N JUSTINE ST, CHICAGO, IL"]
+
+
+def test_listings_search_ranks_better_matches_first(client, make_property):
+    make_property(full_address="1 TAYLOR ST", class_description="Residential")
+    make_property(full_address="2 TAYLOR ST", class_description="Apartments over apartments")
+    make_property(full_address="3 TAYLOR ST", class_description="Apartments")
+
+    body = client.get("/properties_listings/", params={"class_description": "apart", "limit": 1}).json()
+    second = client.get("/properties_listings/", params={
+        "class_description": "apart", "limit": 1, "cursor": body["next_cursor"]
+    }).json()
+
+    assert [p["full_address"] for p in body["properties"] + second["properties"]] == ["2 TAYLOR ST", "3 TAYLOR ST"]
+    assert second["moreExists"] is False
+
+
+def test_range_sends_etag_and_honours_if_none_match(client, make_property):
+    make_property(estimated_market_value=100, building_sq_ft=10)
+
+    first = client.get("/properties/range")
+    revalidated = client.get("/properties/range", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"].startswith("public, max-age=")
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == first.headers["ETag"]
+
+
+def test_bulk_ndjson_inserts_valid_rows_and_reports_bad_ones(client, property_data):
+    lines = [
+        json.dumps(property_data(full_address="1 A St")),
+        "{not json",
+        json.dumps(property_data(full_address="2 B St", estimated_market_value="lots")),
+        json.dumps(property_data(full_address="3 C St", estimated_market_value="1.302.750")),
+    ]
+    response = client.post("/properties/bulk", content="\n".join(lines),
+                           headers={"Content-Type": "application/x-ndjson"})
+
+    report = response.json()
+    assert (report["received"], report["inserted"], report["failed"]) == (4, 2, 2)
+    assert [error["row"] for error in report["errors"]] == [2, 3]
+    addresses = [p["full_address"] for p in client.get("/properties_listings/").json()["properties"]]
+    assert addresses == ["1 A St", "3 C St"]
+    assert client.get("/properties_listings/", params={"full_address": "3 C St"}).json()["properties"][0][
+        "estimated_market_value"] == 1302750
+
+
+@pytest.mark.parametrize("value", ["41.123", "1.302.750"])
+def test_single_writes_reject_fractional_integer_strings(client, property_data, value):
+    assert client.post("/properties/", json=property_data(estimated_market_value=value)).status_code == 422
+
+
+def test_bulk_csv_accepts_assessor_headers(client, property_data):
+    row = property_data(full_address="210 N JUSTINE ST; CHICAGO", latitude="41,8857718")
+    header = ["Full Address" if name == "full_address" else name.upper() for name in row]
+    body = io.StringIO()
+    csv.writer(body, delimiter=";").writerows([header, list(row.values())])
+
+    response = client.post("/properties/bulk", params={"delimiter": ";"}, content=body.getvalue(),
+                           headers={"Content-Type": "text/csv"})
+
+    assert response.json()["inserted"] == 1
+    listing = client.get("/properties_listings/").json()["properties"][0]
+    assert listing["full_address"] == "210 N JUSTINE ST; CHICAGO"
+    assert listing["latitude"] == 41.8857718
+
+
+def test_bulk_upsert_reports_the_delta_and_create_rejects_known_pins(client, property_data):
+    def send(*rows):
+        body = "\n".join(json.dumps(property_data(**row)) for row in rows)
+        return client.post("/properties/bulk", params={"mode": "upsert"}, content=body,
+                           headers={"Content-Type": "application/x-ndjson"}).json()
+
+    send({"pin": 1}, {"pin": 2})
+    report = send({"pin": 1}, {"pin": 2, "estimated_market_value": 5}, {"pin": 3})
+
+    assert (report["inserted"], report["updated"], report["unchanged"]) == (1, 1, 1)
+    assert client.post("/properties/", json=property_data(pin=3)).status_code == 409
+    assert client.post("/properties/bulk", params={"mode": "merge"}, content="",
+                       headers={"Content-Type": "application/x-ndjson"}).status_code == 400
+
+
+@pytest.mark.parametrize("delimiter", ["", ";;", '"'])
+def test_bulk_csv_rejects_bad_delimiters(client, delimiter):
+    response = client.post("/properties/bulk", params={"delimiter": delimiter}, content="pin\n1\n",
+                           headers={"Content-Type": "text/csv"})
+
+    assert response.status_code == 400
+    assert "delimiter" in response.json()["detail"]
+
+
+def test_within_returns_properties_in_bbox(client, make_property):
+    inside = make_property(latitude=41.88, longitude=-87.63)
+    make_property(latitude=41.88, longitude=-87.50)
+
+    body = client.get("/properties/within", params={"bbox": "-87.7,41.85,-87.6,41.9"}).json()
+
+    assert [p["id"] for p in body["properties"]] == [inside.id]
+    assert body["moreExists"] is False
+
+
+@pytest.mark.parametrize("params", [
+    {"bbox": "-87.6,41.85,-87.7,41.9"},
+    {"bbox": "1,2,3"},
+    {"lat": 41.88, "lon": -87.63},
+    {"bbox": "-87.7,41.85,-87.6,41.9", "lat": 41.88, "lon": -87.63, "radius": 100},
+])
+def test_within_rejects_invalid_areas(client, params):
+    assert client.get("/properties/within", params=params).status_code == 400
+
+
+def test_clusters_endpoint_returns_cells_in_view(client, make_property):
+    make_property(latitude=41.88, longitude=-87.63, estimated_market_value=1000)
+    make_property(latitude=41.88, longitude=-87.63, estimated_market_value=3000)
+
+    body = client.get("/properties/clusters", params={"zoom": 10, "bbox": "-88,41.6,-87.5,42.1"}).json()
+
+    assert body["zoom"] == 10
+    assert [(c["count"], c["median_estimated_market_value"]) for c in body["clusters"]] == [(2, 1000)]
+
+
+def test_facets_follow_text_filters(client, make_property):
+    make_property(full_address="210 N JUSTINE ST", class_description="Residential")
+    make_property(full_address="1529 W TAYLOR ST", class_description="Commercial")
+
+    body = client.get("/properties/facets", params={"full_address": "justine"}).json()
+
+    assert body["total"] == 1
+    assert body["class_description"] == [{"value": "Residential", "count": 1}]
+
+
+def test_stats_endpoint_reports_neighborhoods_of_a_town(client, make_property):
+    make_property(town=70, neighborhood=1, estimated_market_value=1000, sale_amount=800)
+    make_property(town=71, neighborhood=1, estimated_market_value=3000)
+
+    body = client.get("/properties/stats/neighborhood", params={"town": 70}).json()
+
+    assert body["grouping"] == "neighborhood"
+    assert [(g["town"], g["neighborhood"], g["median_sale_ratio"]) for g in body["groups"]] == [(70, 1, 1.25)]
+    assert client.get("/properties/stats/county").status_code == 400
+
+
+def test_batch_get_returns_properties_in_request_order(client, make_property):
+    first = make_property(full_address="210 N JUSTINE ST")
+    second = make_property(full_address="1529 W TAYLOR ST")
+
+    body = client.post("/properties/batch-get", json={"ids": [second.id, 999, first.id, second.id]}).json()
+
+    assert [p and p["full_address"] for p in body["properties"]] == [
+        "1529 W TAYLOR ST", None, "210 N JUSTINE ST", "1529 W TAYLOR ST"
+    ]
+    assert body["missing"] == [999]
+    assert client.post("/properties/batch-get", json={"ids": []}).status_code == 422
+    assert client.post("/properties/batch-get", json={"ids": list(range(1001))}).status_code == 400
+
+
+def test_bulk_update_sets_values_by_ids_or_filter(client, make_property):
+    first = make_property(class_description="Residential", estimated_market_value=100)
+    second = make_property(class_description="Residential", estimated_market_value=200)
+    make_property(class_description="Commercial", estimated_market_value=300)
+
+    by_ids = client.patch("/properties/bulk", json={"ids": [first.id, second.id, 999], "values": {"zip": 60607}})
+    by_filter = client.patch("/properties/bulk", json={
+        "filter": {"class_description": "Residential", "exact_match": True},
+        "values": {"estimated_market_value": 500},
+    })
+    listed = client.get("/properties_listings/", params={"sort_by": "id"}).json()["properties"]
+
+    assert by_ids.json() == {"affected": 2} and by_filter.json() == {"affected": 2}
+    assert [p["estimated_market_value"] for p in listed] == [500, 500, 300]
+    assert client.get("/properties/range").json()["estimated_market_value"] == {"min": 300, "max": 500}
+
+    duplicate_pins = client.patch("/properties/bulk", json={"ids": [first.id, second.id], "values": {"pin": 42}})
+    assert duplicate_pins.status_code == 409
+    assert client.get(f"/properties/{first.id}").json()["pin"] is None
+
+
+def test_bulk_delete_requires_a_selection(client, make_property):
+    make_property(estimated_market_value=100)
+    make_property(estimated_market_value=900)
+
+    assert client.request("DELETE", "/properties/bulk", json={"filter": {}}).status_code == 400
+    assert client.request("DELETE", "/properties/bulk", json={}).status_code == 400
+    for text_filter in ({"full_address": "-"}, {"class_description": "  ", "bldg_use": "&!"}):
+        assert client.request("DELETE", "/properties/bulk", json={"filter": text_filter}).status_code == 400
+        assert client.patch("/properties/bulk", json={"filter": text_filter, "values": {"zip": 1}}).status_code == 400
+    deleted = client.request("DELETE", "/properties/bulk", json={"filter": {"estimated_market_value_min": 500}})
+
+    assert deleted.json() == {"affected": 1}
+    assert client.get("/properties/range").json()["estimated_market_value"] == {"min": 100, "max": 100}
+
+
+def test_changes_feed_reports_writes_and_deletions(client, make_property):
+    first = make_property(full_address="210 N JUSTINE ST")
+    second = make_property(full_address="1529 W TAYLOR ST")
+    client.delete(f"/properties/{second.id}")
+
+    body = client.get("/properties/changes", params={"since": first.version}).json()
+
+    assert [(c["id"], c["deleted"], c["property"]) for c in body["changes"]] == [(second.id, True, None)]
+    assert body["next_since"] == 3 and body["moreExists"] is False
+    assert client.get("/properties/changes").json()["changes"][0]["property"]["full_address"] == "210 N JUSTINE ST"
+
+
+def test_export_streams_filtered_properties_as_csv(client, make_property):
+    make_property(full_address="210 N JUSTINE ST", sale_date=date(2021, 5, 4))
+    make_property(full_address="1529 W TAYLOR ST")
+
+    response = client.get("/properties/export", params={"full_address": "justine"})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+
+    assert response.headers["content-type"].startswith("text/csv")
+    assert [(row["full_address"], row["sale_date"], row["pin"]) for row in rows] == [("210 N JUSTINE ST", "2021-05-04", "")]
+    assert "content_hash" not in rows[0] and {"id", "version", "updated_at"} <= set(rows[0])
+
+
+def test_export_writes_ndjson_and_parquet(client, make_property):
+    pq = pytest.importorskip("pyarrow.parquet")
+    for value in (100, 200, 300):
+        make_property(estimated_market_value=value)
+
+    lines = client.get("/properties/export", params={"format": "ndjson", "estimated_market_value_min": 200}).text
+    table = pq.read_table(io.BytesIO(client.get("/properties/export", params={"format": "parquet"}).content))
+
+    assert [json.loads(line)["estimated_market_value"] for line in lines.splitlines()] == [200, 300]
+    assert table.column("estimated_market_value").to_pylist() == [100, 200, 300]
+    assert client.get("/properties/export", params={"format": "xlsx"}).status_code == 400
+
+
+def test_async_routes_serve_the_same_api(db, make_property):
+    pytest.importorskip("aiosqlite")
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api.endpoints import property_async
+    from app.core.auth import get_current_user
+
+    make_property(full_address="210 N JUSTINE ST")
+    async_app = FastAPI()
+    async_app.include_router(property_async.router)
+    async_app.dependency_overrides[get_current_user] = lambda: "admin"
+
+    with TestClient(async_app) as async_client:
+        listings = async_client.get("/properties_listings/", params={"full_address": "justine"}).json()
+        missing = async_client.get("/properties/999")
+        batch = async_client.post("/properties/batch-get", json={"ids": [999, 1]}).json()
+        exported = async_client.get("/properties/export", params={"format": "ndjson", "full_address": "justine"})
+
+    assert [p["full_address"] for p in listings["properties"]] == ["210 N JUSTINE ST"]
+    assert missing.status_code == 404
+    assert batch["missing"] == [999] and batch["properties"][1]["full_address"] == "210 N JUSTINE ST"
+    assert [json.loads(line)["full_address"] for line in exported.text.splitlines()] == ["210 N JUSTINE ST"]
+
+
+def test_metrics_report_latency_and_queries_by_route(client, make_property):
+    prop = make_property()
+    response = client.get(f"/properties/{prop.id}")
+    assert response.headers["server-timing"].startswith("db;dur=")
+
+    metrics = client.get("/metrics")
+
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{method="GET",route="/properties/{property_id}",status="200"}' \
+        in metrics.text
+    assert 'http_request_db_queries_bucket{method="GET",route="/properties/{property_id}",le="+Inf"}' in metrics.text
+    assert f'route="/properties/{prop.id}"' not in metrics.text
+
+
+def test_listings_are_cached_until_a_write_touches_listed_columns(client, make_property, property_data):
+    prop = make_property(estimated_market_value=100)
+    params = {"class_description": " Residential ", "exact_match": True}
+
+    assert client.get("/properties_listings/", params=params).headers["x-cache"] == "MISS"
+    cached = client.get("/properties_listings/", params={**params, "class_description": "Residential"})
+    assert cached.headers["x-cache"] == "HIT"
+    assert [p["id"] for p in cached.json()["properties"]] == [prop.id]
+
+    client.put(f"/properties/{prop.id}", json={"city": "CHICAGO"})
+    assert client.get("/properties_listings/", params=params).headers["x-cache"] == "HIT"
+
+    created = client.post("/properties/", json=property_data(estimated_market_value=200)).json()
+    response = client.get("/properties_listings/", params=params)
+    assert response.headers["x-cache"] == "MISS"
+    assert [p["id"] for p in response.json()["properties"]] == [prop.id, created["id"]]
+
+
+def test_ready_only_once_the_schema_is_migrated(client):
+    assert client.get("/ready").json() == {"status": "ready"}
+
+    command.downgrade(alembic_config(), "-1")
+    response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["reason"] == "database schema is not up to date"
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_listings_cursor_reaches_rows_without_a_sort_value(client, make_property, descending):
+    for value in (None, 300, None, 100, 200, None):
+        make_property(estimated_market_value=value)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "sort_by": "estimated_market_value", "descending": descending}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/properties_listings/", params=params).json()
+        seen.extend(p["estimated_market_value"] for p in body["properties"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == ([300, 200, 100] if descending else [100, 200, 300]) + [None, None, None]
@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Seconds importing app.main may take in a fresh interpreter (best of three runs). Override on slow CI machines.
+IMPORT_TIME_BUDGET = float(os.getenv("STARTUP_IMPORT_BUDGET_SECONDS", 2.5))
+
+# Modules the application only needs once a request uses them.
+LAZY_MODULES = ("alembic", "jose", "pyarrow", "pandas", "redis", "aiosqlite", "asyncpg")
+
+_SNIPPET = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+from app.db import database
+print(json.dumps({
+    "seconds": elapsed,
+    "loaded": [name for name in %r if name in sys.modules],
+    "engine_created": database._engine is not None,
+}))
+""" % (LAZY_MODULES,)
+
+
+def _import_app() -> dict:
+    backend = Path(__file__).resolve().parents[3]
+    output = subprocess.run([sys.executable, "-c", _SNIPPET], cwd=backend, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def test_importing_the_app_is_cheap_and_defers_heavy_work():
+    runs = [_import_app() for _ in range(3)]
+
+    assert runs[0]["loaded"] == []
+    assert runs[0]["engine_created"] is False
+    assert min(run["seconds"] for run in runs) < IMPORT_TIME_BUDGET
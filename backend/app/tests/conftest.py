@@ -0,0 +1,81 @@
+import os
+import tempfile
+
+# Point the application at a throwaway database before any app module reads the settings.
+_db_dir = tempfile.mkdtemp(prefix="property-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+
+import pytest
+from alembic import command
+from fastapi.testclient import TestClient
+
+from app.core.auth import get_current_user
+from app.crud.crud_property import listing_cache, range_cache
+from app.db.database import SessionLocal
+from app.db.migrate import alembic_config, upgrade_database
+from app.db.session import get_db
+from app.main import app
+from app.models.models import Property
+
+
+_OPTIONAL_STRING_COLUMNS = (
+    "rec_type", "loc", "dir", "street", "suffix", "apt", "city", "res_type", "ext_desc", "bsmt_desc",
+    "attic_desc", "gar_desc", "appeal_a_status", "appeal_a_result", "appeal_a_pin_result",
+)
+
+
+@pytest.fixture
+def db():
+    """A session on an empty, fully migrated database."""
+    # Migrating down and up again, rather than deleting the file, keeps pooled connections valid.
+    command.downgrade(alembic_config(), "base")
+    upgrade_database()
+    range_cache.invalidate()
+    listing_cache.invalidate()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    """A test client whose requests share the `db` session and skip token checks."""
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: "admin"
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def property_data():
+    """Build a valid PropertyBase payload, with sensible defaults for the required columns."""
+    def _data(**overrides):
+        values = {
+            "full_address": "123 Main St, Anytown, USA",
+            "class_description": "Residential",
+            "estimated_market_value": 100000,
+            "bldg_use": "Single Family",
+            "building_sq_ft": 1200,
+        }
+        # PropertyBase rejects NULL strings, so blank them the way the assessor file does.
+        values.update({name: "" for name in _OPTIONAL_STRING_COLUMNS})
+        values.update(overrides)
+        return values
+    return _data
+
+
+@pytest.fixture
+def make_property(db, property_data):
+    """Insert a property directly through the session."""
+    def _make(**overrides):
+        db_property = Property(**property_data(**overrides))
+        db.add(db_property)
+        db.commit()
+        # Written around the CRUD functions, so the caches they maintain are told directly.
+        listing_cache.invalidate()
+        return db_property
+    return _make
@@ -0,0 +1,27 @@
+import pandas as pd
+
+from app.data.import_properties import coerce_chunk, to_records
+
+
+def test_coerce_chunk_matches_validator_rules_and_counts_rejections():
+    raw = pd.DataFrame({
+        "Full Address": [" 1 A St ", "2 B St", "3 C St"],
+        "CLASS_DESCRIPTION": ["Residential"] * 3,
+        "BLDG_USE": ["Single Family"] * 3,
+        "ESTIMATED_MARKET_VALUE": ["100", "1.302.750", "1.5"],
+        "BUILDING_SQ_FT": ["10", "20", "null"],
+        "Latitude": ["41,88", "41.5", ""],
+        "PPRIOR_YEAR": ["2013", "2013", "13"],
+        "SALE_DATE": ["10/19/15", "", ""],
+    }, dtype="string")
+
+    accepted, rejections = coerce_chunk(raw)
+    records = to_records(accepted)
+
+    assert [record["full_address"] for record in records] == ["1 A St", "2 B St"]
+    assert [record["estimated_market_value"] for record in records] == [100, 1302750]
+    assert records[0]["latitude"] == 41.88
+    assert records[0]["pprior_year"] == 2013
+    assert records[0]["sale_date"].isoformat() == "2015-10-19"
+    assert records[0]["apt"] == ""
+    assert rejections == {"estimated_market_value": 1, "building_sq_ft": 1, "pprior_year": 1}
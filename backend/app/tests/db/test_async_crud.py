@@ -0,0 +1,40 @@
+import pytest
+import pytest_asyncio
+
+from app.crud import async_crud_property
+from app.schemas.property import PropertyBase
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest_asyncio.fixture
+async def async_db(db):
+    from app.db.async_database import AsyncSessionLocal, async_engine
+
+    # Connections pooled before `db` rebuilt the schema can hold a stale copy of it; start from fresh ones.
+    await async_engine.dispose()
+    async with AsyncSessionLocal() as session:
+        yield session
+    await async_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_async_crud_round_trip(async_db, property_data):
+    created = await async_crud_property.create_property_db(
+        async_db, PropertyBase(**property_data(full_address="210 N JUSTINE ST", estimated_market_value=700))
+    )
+    await async_crud_property.create_property_db(
+        async_db, PropertyBase(**property_data(full_address="1529 W TAYLOR ST", estimated_market_value=300))
+    )
+
+    found, next_cursor = await async_crud_property.get_filtered_properties_db(async_db, full_address="justine")
+    page, cursor = await async_crud_property.get_filtered_properties_db(
+        async_db, sort_by="estimated_market_value", limit=1
+    )
+    summary = await async_crud_property.get_property_value_range(async_db)
+
+    assert [p.id for p in found] == [created.id] and next_cursor is None
+    assert [p.estimated_market_value for p in page] == [300] and cursor
+    assert summary["estimated_market_value"] == {"min": 300, "max": 700}
+    assert await async_crud_property.delete_property_db(async_db, created.id)
+    assert await async_crud_property.get_property_db(async_db, created.id) is None
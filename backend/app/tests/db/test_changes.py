@@ -0,0 +1,48 @@
+from sqlalchemy import select
+
+from app.crud.crud_bulk import bulk_delete_properties_db, bulk_update_properties_db
+from app.crud.crud_changes import get_property_changes_db
+from app.models.models import Property
+
+
+def _feed(db, since=0, limit=100) -> list:
+    changes, _, _ = get_property_changes_db(db, since, limit)
+    return [(row.id, "written") if row is not None else (tombstone.id, "deleted") for _, row, tombstone in changes]
+
+
+def test_every_write_takes_a_new_version(db, make_property):
+    first = make_property()
+    second = make_property()
+    assert (first.version, second.version) == (1, 2)
+    assert first.updated_at is not None
+
+    first.estimated_market_value = 5
+    db.commit()
+    bulk_update_properties_db(db, {"zip": 60607}, ids=[second.id])
+    db.refresh(first), db.refresh(second)
+
+    assert (first.version, second.version) == (3, 4)
+
+
+def test_feed_returns_latest_writes_and_tombstones_in_version_order(db, make_property):
+    kept, changed, deleted = (make_property().id for _ in range(3))
+    _, since, _ = get_property_changes_db(db)
+    bulk_update_properties_db(db, {"zip": 60607}, ids=[changed])
+    bulk_delete_properties_db(db, ids=[deleted])
+
+    assert _feed(db) == [(kept, "written"), (changed, "written"), (deleted, "deleted")]
+    assert _feed(db, since) == [(changed, "written"), (deleted, "deleted")]
+    assert db.execute(select(Property.id)).scalars().all() == [kept, changed]
+
+
+def test_feed_pages_by_version(db, make_property):
+    for _ in range(5):
+        make_property()
+
+    seen, since, more = [], 0, True
+    while more:
+        changes, since, more = get_property_changes_db(db, since, limit=2)
+        seen.extend(version for version, _, _ in changes)
+
+    assert seen == [1, 2, 3, 4, 5]
+    assert get_property_changes_db(db, since) == ([], 5, False)
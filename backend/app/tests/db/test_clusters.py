@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import select
+
+from app.crud.crud_clusters import get_property_clusters_db
+from app.db.clusters import CLUSTER_MAX_ZOOM, property_cluster_dirty
+
+CHICAGO = (-88.0, 41.6, -87.5, 42.1)
+
+
+def _dirty_zooms(db) -> list:
+    return db.execute(select(property_cluster_dirty.c.zoom)).scalars().all()
+
+
+def test_clusters_aggregate_each_grid_cell(db, make_property):
+    for value in (100, 300, 200):
+        make_property(latitude=41.8800, longitude=-87.6300, estimated_market_value=value)
+    make_property(latitude=41.9700, longitude=-87.7000, estimated_market_value=50)
+    make_property(latitude=None, longitude=None)
+
+    clusters = sorted(get_property_clusters_db(db, 12, CHICAGO), key=lambda row: row.count)
+
+    assert [(row.count, row.median_estimated_market_value) for row in clusters] == [(1, 50), (3, 200)]
+    assert clusters[1].latitude == pytest.approx(41.88) and clusters[1].longitude == pytest.approx(-87.63)
+    assert [row.count for row in get_property_clusters_db(db, 4, CHICAGO)] == [4]
+
+
+def test_changed_properties_refresh_only_the_zoom_that_is_read(db, make_property):
+    moved = make_property(latitude=41.8800, longitude=-87.6300)
+    make_property(latitude=41.8800, longitude=-87.6300)
+    get_property_clusters_db(db, 12, CHICAGO)
+    other_zooms = [zoom for zoom in range(CLUSTER_MAX_ZOOM + 1) if zoom != 12]
+    assert sorted(_dirty_zooms(db)) == other_zooms
+
+    moved.latitude, moved.longitude = 41.9700, -87.7000
+    db.commit()
+    assert _dirty_zooms(db).count(12) == 2
+    clusters = get_property_clusters_db(db, 12, CHICAGO)
+
+    assert sorted(row.count for row in clusters) == [1, 1]
+    assert 12 not in _dirty_zooms(db)
+
+
+def test_clusters_reject_views_with_too_many_cells(db):
+    with pytest.raises(ValueError):
+        get_property_clusters_db(db, 16, CHICAGO)
@@ -0,0 +1,28 @@
+from sqlalchemy import select
+
+from app.db.search import properties_fts
+
+
+def test_search_index_follows_inserts_updates_and_deletes(db, make_property):
+    kept = make_property(full_address="210 N JUSTINE ST")
+    removed = make_property(full_address="1529 W TAYLOR ST")
+
+    kept.full_address = "212 N JUSTINE ST"
+    db.delete(removed)
+    db.commit()
+
+    matches = db.execute(
+        select(properties_fts.c.rowid).where(properties_fts.c.full_address.match('"212"'))
+    ).scalars().all()
+    assert matches == [kept.id]
+    assert db.execute(
+        select(properties_fts.c.rowid).where(properties_fts.c.full_address.match('"taylor"'))
+    ).scalars().all() == []
+
+
+def test_connections_use_configured_sqlite_pragmas(db):
+    connection = db.connection()
+
+    assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+    assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+    assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
@@ -0,0 +1,24 @@
+from app.crud.crud_facets import get_property_facets_db
+
+
+def test_facets_count_values_and_bucket_ranges_for_the_filters(db, make_property):
+    for value, use in ((100_000, "Single Family"), (150_000, "Single Family"), (900_000, "Two Family")):
+        make_property(class_description="Residential", bldg_use=use, estimated_market_value=value)
+    make_property(class_description="Commercial", bldg_use="Retail", estimated_market_value=2_000_000)
+
+    facets = get_property_facets_db(db, estimated_market_value_max=1_000_000, buckets=4)
+
+    assert facets["total"] == 3
+    assert facets["class_description"] == [{"value": "Residential", "count": 3}]
+    assert facets["bldg_use"] == [{"value": "Single Family", "count": 2}, {"value": "Two Family", "count": 1}]
+    assert [(b["min"], b["max"], b["count"]) for b in facets["estimated_market_value"]] == [
+        (100_000, 325_000, 2), (325_001, 550_001, 0), (550_002, 775_002, 0), (775_003, 1_000_000, 1),
+    ]
+    assert [b["count"] for b in facets["building_sq_ft"]] == [3]
+
+
+def test_facets_on_empty_table(db):
+    facets = get_property_facets_db(db)
+
+    assert facets == {"total": 0, "class_description": [], "bldg_use": [],
+                      "estimated_market_value": [], "building_sq_ft": []}
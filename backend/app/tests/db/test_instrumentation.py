@@ -0,0 +1,66 @@
+import logging
+
+from sqlalchemy import create_engine, text
+
+from app.core.metrics import Histogram, RequestQueries, current_request_queries
+from app.db.instrumentation import explain, install_query_instrumentation, statement_operation
+
+
+def test_queries_are_counted_per_request_and_slow_ones_logged_with_a_plan(caplog):
+    engine = create_engine("sqlite://")
+    install_query_instrumentation(engine, slow_query_ms=1e-6, explain_slow=True)
+    queries = RequestQueries()
+    token = current_request_queries.set(queries)
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.slow_queries"), engine.begin() as connection:
+            connection.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)"))
+            connection.execute(text("SELECT name FROM t WHERE id = :id"), {"id": 7})
+    finally:
+        current_request_queries.reset(token)
+
+    assert queries.count == 2
+    assert caplog.records[0].getMessage().endswith("Plan:\nnot explained")
+    slow = caplog.records[-1].getMessage()
+    assert "SELECT name FROM t WHERE id = ?" in slow
+    assert "Parameters: (7,)" in slow
+    assert "USING INTEGER PRIMARY KEY" in slow
+
+
+class _PlanCursor:
+    def __init__(self, executed):
+        self.executed = executed
+        self.connection = self
+
+    def cursor(self):
+        return self
+
+    def execute(self, statement, parameters=None):
+        self.executed.append(statement)
+        if statement.startswith("EXPLAIN"):
+            raise RuntimeError("cannot explain")
+
+    def close(self):
+        pass
+
+
+def test_a_failed_postgresql_explain_is_rolled_back_to_its_savepoint():
+    executed = []
+
+    plan = explain(_PlanCursor(executed), "postgresql", "SELECT 1", ())
+
+    assert plan == "EXPLAIN failed: cannot explain"
+    assert executed == ["SAVEPOINT slow_query_explain", "EXPLAIN SELECT 1", "ROLLBACK TO SAVEPOINT slow_query_explain"]
+
+
+def test_statement_operation_and_histogram_rendering():
+    assert statement_operation("  SELECT 1") == "select"
+    assert statement_operation("PRAGMA journal_mode") == "other"
+
+    histogram = Histogram("h", "Test.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.5, "/a")
+    histogram.observe(2.0, "/a")
+
+    assert histogram.samples() == [
+        'h_bucket{route="/a",le="0.1"} 0', 'h_bucket{route="/a",le="1.0"} 1', 'h_bucket{route="/a",le="+Inf"} 2',
+        'h_sum{route="/a"} 2.5', 'h_count{route="/a"} 2',
+    ]
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.crud.crud_property import build_caches
+from app.crud.listing_cache import LISTING_CACHE_REQUESTS, ListingCache, MemoryCacheBackend
+
+
+def test_memory_backend_evicts_least_recently_used_and_expired_entries():
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set("a", b"1", 60)
+    backend.set("b", b"2", 60)
+    backend.get("a")
+    backend.set("c", b"3", 60)
+
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1"
+    backend.set("c", b"3", -1)
+    assert backend.get("c") is None
+
+
+def test_keys_normalize_filters_and_change_with_each_invalidation():
+    cache = ListingCache(MemoryCacheBackend(10), ttl_seconds=60)
+    key = cache.key({"full_address": " main ", "bldg_use": "", "limit": 25})
+
+    assert key == cache.key({"full_address": "main", "limit": 25, "cursor": None})
+    cache.set(key, b"{}")
+    assert cache.get(key) == b"{}"
+
+    cache.invalidate()
+    assert cache.key({"full_address": "main", "limit": 25}) != key
+    assert cache.get(key) is None
+
+
+class _FailingBackend:
+    def generation(self):
+        return 0
+
+    def get(self, key):
+        raise ConnectionError("cache down")
+
+    def set(self, key, value, ttl_seconds):
+        raise ConnectionError("cache down")
+
+
+def test_backend_failures_are_counted_and_treated_as_misses():
+    cache = ListingCache(_FailingBackend(), ttl_seconds=60)
+    errors = LISTING_CACHE_REQUESTS.value("error")
+    key = cache.key({"limit": 25})
+
+    assert cache.get(key) is None
+    cache.set(key, b"{}")
+    assert LISTING_CACHE_REQUESTS.value("error") == errors + 1
+
+
+def _config(**overrides):
+    values = {name: getattr(settings, name) for name in dir(settings) if name.isupper()}
+    return SimpleNamespace(**{**values, **overrides})
+
+
+def test_several_workers_keep_no_per_process_caches():
+    range_cache, listing_cache = build_caches(_config(WEB_CONCURRENCY=4, LISTING_CACHE_URL=""))
+    assert range_cache.ttl_seconds == 0
+    assert not listing_cache.enabled
+
+    range_cache, listing_cache = build_caches(_config(WEB_CONCURRENCY=1, LISTING_CACHE_URL=""))
+    assert range_cache.ttl_seconds == settings.RANGE_CACHE_TTL_SECONDS
+    assert listing_cache.enabled
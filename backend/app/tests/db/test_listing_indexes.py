@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import text
+
+from app.crud.crud_property import LISTING_COLUMNS, listing_statement
+
+
+def _plan(db, statement) -> str:
+    sql = statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    return " | ".join(row.detail for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+@pytest.fixture
+def listings(db, make_property):
+    for i in range(200):
+        make_property(
+            class_description=f"Class {i % 10}", bldg_use=f"Use {i % 7}",
+            estimated_market_value=i * 1000, building_sq_ft=500 + i * 10,
+        )
+    db.execute(text("ANALYZE"))
+
+
+def test_market_value_range_searches_an_index(db, listings):
+    statement, _ = listing_statement("sqlite", estimated_market_value_min=10000, estimated_market_value_max=20000)
+
+    plan = _plan(db, statement)
+    assert plan.startswith("SEARCH properties USING")
+    assert "(estimated_market_value>? AND estimated_market_value<?)" in plan
+
+
+def test_exact_class_with_value_range_uses_composite_index(db, listings):
+    statement, _ = listing_statement(
+        "sqlite", class_description="Class 3", exact_match=True,
+        estimated_market_value_min=10000, estimated_market_value_max=90000,
+    )
+
+    assert "INDEX ix_properties_class_description_emv (class_description=? AND estimated_market_value>? AND " \
+           "estimated_market_value<?)" in _plan(db, statement)
+
+
+def test_exact_use_with_square_footage_range_uses_composite_index(db, listings):
+    statement, _ = listing_statement("sqlite", bldg_use="Use 2", exact_match=True, building_sq_ft_min=600)
+
+    assert "INDEX ix_properties_bldg_use_building_sq_ft (bldg_use=? AND building_sq_ft>?)" in _plan(db, statement)
+
+
+def test_keyset_order_reads_index_without_sorting(db, listings):
+    statement, _ = listing_statement("sqlite")
+    statement = statement.order_by("estimated_market_value", "id").limit(25)
+
+    plan = _plan(db, statement)
+    assert "ix_properties_estimated_market_value_id" in plan or "ix_properties_listing_covering" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_projected_listing_is_answered_from_covering_index(db, listings):
+    statement, _ = listing_statement(
+        "sqlite", estimated_market_value_min=10000, estimated_market_value_max=20000, columns=LISTING_COLUMNS
+    )
+
+    assert "USING COVERING INDEX ix_properties_listing_covering" in _plan(db, statement)
@@ -0,0 +1,49 @@
+import pytest
+from pydantic import BaseModel
+
+from app.crud.crud_property import (
+    create_property_db, delete_property_db, get_property_value_range, range_cache, update_property_db
+)
+from app.schemas.property import PropertyBase
+
+
+class _SqFtUpdate(BaseModel):
+    building_sq_ft: int
+
+
+@pytest.fixture
+def create(property_data):
+    """Create a property through the CRUD layer so the range cache observes it."""
+    def _create(db, value, sq_ft):
+        return create_property_db(db, PropertyBase(
+            **property_data(estimated_market_value=value, building_sq_ft=sq_ft)
+        ))
+    return _create
+
+
+def test_range_tracks_writes_without_going_stale(db, create):
+    low = create(db, 100, 1000)
+    high = create(db, 500, 3000)
+    assert get_property_value_range(db)["estimated_market_value"] == {"min": 100, "max": 500}
+
+    create(db, 900, 2000)
+    assert get_property_value_range(db)["estimated_market_value"] == {"min": 100, "max": 900}
+
+    delete_property_db(db, low.id)
+    assert get_property_value_range(db)["estimated_market_value"] == {"min": 500, "max": 900}
+
+    update_property_db(db, high.id, _SqFtUpdate(building_sq_ft=50))
+    assert get_property_value_range(db)["building_sq_ft"] == {"min": 50, "max": 2000}
+
+
+def test_insert_widens_cached_range_in_place(db, create, monkeypatch):
+    create(db, 100, 1000)
+    get_property_value_range(db)
+    monkeypatch.setattr(range_cache, "_statement", lambda: (_ for _ in ()).throw(AssertionError("reloaded")))
+
+    create(db, 50, 4000)
+
+    assert get_property_value_range(db) == {
+        "estimated_market_value": {"min": 50, "max": 100},
+        "building_sq_ft": {"min": 1000, "max": 4000},
+    }
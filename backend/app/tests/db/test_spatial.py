@@ -0,0 +1,43 @@
+from sqlalchemy import select, text
+
+from app.crud.crud_property import get_properties_within_db, within_statement
+from app.db.spatial import properties_rtree
+
+
+def test_rtree_follows_inserts_coordinate_updates_and_deletes(db, make_property):
+    moved = make_property(latitude=41.80, longitude=-87.60)
+    removed = make_property(latitude=41.90, longitude=-87.70)
+    make_property(latitude=None, longitude=None)
+
+    moved.latitude = 41.85
+    db.delete(removed)
+    db.commit()
+
+    rows = db.execute(select(properties_rtree.c.id, properties_rtree.c.min_lat)).all()
+    assert [(row.id, round(row.min_lat, 4)) for row in rows] == [(moved.id, 41.85)]
+
+
+def test_bbox_query_is_served_by_the_rtree(db, make_property):
+    inside = make_property(latitude=41.88, longitude=-87.63)
+    make_property(latitude=41.95, longitude=-87.63)
+
+    statement = within_statement("sqlite", bbox=(-87.7, 41.85, -87.6, 41.9))
+    sql = statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = " | ".join(row.detail for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+    assert "VIRTUAL TABLE INDEX" in plan and "properties_rtree" in plan
+    rows, more_exists = get_properties_within_db(db, bbox=(-87.7, 41.85, -87.6, 41.9))
+    assert [row.id for row in rows] == [inside.id] and more_exists is False
+
+
+def test_radius_query_is_exact_and_nearest_first(db, make_property):
+    # About 110 m, 550 m and 1.1 km north of the centre; the box around a 600 m circle holds all but the last.
+    near = make_property(latitude=41.881, longitude=-87.63)
+    farther = make_property(latitude=41.885, longitude=-87.63)
+    make_property(latitude=41.890, longitude=-87.63)
+    # Inside the bounding box but outside the circle.
+    make_property(latitude=41.884, longitude=-87.6245)
+
+    rows, _ = get_properties_within_db(db, latitude=41.88, longitude=-87.63, radius=600)
+
+    assert [row.id for row in rows] == [near.id, farther.id]
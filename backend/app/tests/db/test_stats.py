@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.exc import OperationalError
+
+from app.crud import crud_stats
+from app.crud.crud_stats import get_group_stats_db, summarize_group
+from app.db.stats import DIRTY_TABLES
+
+
+def test_summary_skips_missing_values():
+    summary = summarize_group([
+        (300, 110, 100, None, 200),
+        (100, 90, None, None, None),
+        (200, None, 80, 40, 0),
+    ])
+
+    assert summary["property_count"] == 3
+    assert summary["median_estimated_market_value"] == 200
+    assert summary["current_total"] == 200 and summary["prior_total"] == 180
+    assert summary["assessment_change"] == pytest.approx(0.1)
+    assert summary["prior_assessment_change"] == pytest.approx(1.0)
+    assert (summary["sales_count"], summary["median_sale_ratio"]) == (1, 1.5)
+
+
+def test_groups_are_summarized_per_key(db, make_property):
+    make_property(town=70, neighborhood=1, tax_code=100, estimated_market_value=100)
+    make_property(town=70, neighborhood=2, tax_code=100, estimated_market_value=300)
+    make_property(town=71, neighborhood=1, tax_code=200, estimated_market_value=500)
+
+    towns = get_group_stats_db(db, "town")
+    neighborhoods = get_group_stats_db(db, "neighborhood", town=70)
+
+    assert [(row.town, row.property_count) for row in towns] == [(70, 2), (71, 1)]
+    assert [(row.neighborhood, row.median_estimated_market_value) for row in neighborhoods] == [(1, 100), (2, 300)]
+    assert [row.property_count for row in get_group_stats_db(db, "tax_code")] == [2, 1]
+
+
+def test_only_changed_groups_are_recomputed(db, make_property):
+    moved = make_property(town=70, neighborhood=1, estimated_market_value=100)
+    make_property(town=71, neighborhood=1, estimated_market_value=500)
+    get_group_stats_db(db, "town")
+    assert db.execute(select(DIRTY_TABLES["town"])).all() == []
+
+    moved.town = 71
+    db.commit()
+    assert db.execute(select(DIRTY_TABLES["town"])).all() == [(70,), (71,)]
+    towns = get_group_stats_db(db, "town")
+
+    assert [(row.town, row.property_count, row.median_estimated_market_value) for row in towns] == [(71, 2, 100)]
+
+
+def test_a_refresh_blocked_by_another_writer_serves_the_stored_summaries(db, make_property, monkeypatch):
+    moved = make_property(town=70, estimated_market_value=100)
+    get_group_stats_db(db, "town")
+    moved.town = 71
+    db.commit()
+
+    def locked(session, grouping):
+        session.execute(delete(DIRTY_TABLES[grouping]))
+        raise OperationalError("DELETE", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(crud_stats, "refresh_group_stats", locked)
+    towns = get_group_stats_db(db, "town")
+
+    assert [(row.town, row.property_count) for row in towns] == [(70, 1)]
+    assert db.execute(select(DIRTY_TABLES["town"])).all() == [(70,), (71,)]
+
+
+def test_unknown_groupings_are_rejected(db):
+    with pytest.raises(ValueError):
+        get_group_stats_db(db, "county")
+    with pytest.raises(ValueError):
+        get_group_stats_db(db, "tax_code", town=70)
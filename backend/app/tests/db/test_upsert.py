@@ -0,0 +1,72 @@
+from datetime import date, datetime
+
+import pytest
+from alembic import command
+from sqlalchemy import inspect, select, text
+from sqlalchemy.exc import IntegrityError
+
+from app.crud.crud_bulk import bulk_update_properties_db, content_hash, upsert_properties_db, validate_batch
+from app.db.migrate import alembic_config, upgrade_database
+from app.models.models import Property
+
+
+def _rows(property_data, *overrides) -> list:
+    rows, errors = validate_batch([property_data(**values) for values in overrides], 1)
+    assert errors == []
+    return rows
+
+
+def test_reimport_only_writes_changed_rows(db, property_data):
+    first = upsert_properties_db(db, _rows(property_data, {"pin": 1}, {"pin": 2}, {"pin": None}))
+    again = upsert_properties_db(db, _rows(
+        property_data, {"pin": 1}, {"pin": 2, "estimated_market_value": 250000}, {"pin": 3}
+    ))
+
+    assert first == {"inserted": 3, "updated": 0, "unchanged": 0}
+    assert again == {"inserted": 1, "updated": 1, "unchanged": 1}
+    pinned = select(Property.pin, Property.estimated_market_value).where(Property.pin.isnot(None))
+    values = dict(db.execute(pinned).all())
+    assert values == {1: 100000, 2: 250000, 3: 100000}
+
+
+def test_repeated_pins_apply_in_order(db, property_data):
+    counts = upsert_properties_db(db, _rows(
+        property_data, {"pin": 7, "full_address": "old"}, {"pin": 7, "full_address": "new"}
+    ))
+
+    assert counts == {"inserted": 1, "updated": 1, "unchanged": 0}
+    assert db.execute(select(Property.full_address)).scalars().all() == ["new"]
+
+
+def test_hash_ignores_how_values_were_coerced(property_data):
+    api = property_data(pin=1, pprior_year="2013", sale_date=datetime(2015, 10, 19))
+    offline = property_data(pin=1, pprior_year=2013, sale_date=date(2015, 10, 19))
+
+    assert content_hash(api) == content_hash(offline)
+    assert content_hash(api) != content_hash({**offline, "sale_amount": 1})
+
+
+def test_edited_rows_are_rewritten_by_the_next_upsert(db, property_data, make_property):
+    upsert_properties_db(db, _rows(property_data, {"pin": 1}))
+    bulk_update_properties_db(db, {"estimated_market_value": 1}, ids=[db.execute(select(Property.id)).scalar_one()])
+
+    assert upsert_properties_db(db, _rows(property_data, {"pin": 1})) == {"inserted": 0, "updated": 1, "unchanged": 0}
+    assert db.execute(select(Property.estimated_market_value)).scalar_one() == 100000
+    with pytest.raises(IntegrityError):
+        make_property(pin=1)
+
+
+def test_pin_migration_archives_duplicates_and_its_downgrade_restores_them(db, make_property):
+    old_id = make_property(pin=1, full_address="old").id
+    new_id = make_property(pin=2, full_address="new").id
+    command.downgrade(alembic_config(), "0005")
+    db.execute(text("UPDATE properties SET pin = 1"))
+    db.commit()
+
+    upgrade_database()
+    assert db.execute(select(Property.id, Property.full_address)).all() == [(new_id, "new")]
+    assert db.execute(text("SELECT id FROM properties_pin_duplicates")).scalars().all() == [old_id]
+
+    command.downgrade(alembic_config(), "0005")
+    assert db.execute(text("SELECT full_address FROM properties ORDER BY id")).scalars().all() == ["old", "new"]
+    assert not inspect(db.get_bind()).has_table("properties_pin_duplicates")
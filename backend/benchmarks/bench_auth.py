@@ -0,0 +1,82 @@
+"""
+Per-request authentication overhead benchmark.
+
+Times `get_current_user` for the same bearer token with the verified-token cache bypassed (a full
+python-jose decode each call) and with it warm, then the difference it makes to a whole request:
+a minimal route with and without the auth dependency, called through the ASGI app.
+
+Usage (from backend/):
+    python -m benchmarks.bench_auth [--calls 20000] [--requests 2000]
+"""
+import argparse
+import json
+import time
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import auth
+
+
+def percentiles(samples: list) -> dict:
+    samples = sorted(samples)
+    return {
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 2),
+        "p99_us": round(samples[int(len(samples) * 0.99)] * 1e6, 2),
+    }
+
+
+def timed(function, count: int) -> dict:
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+
+def verification(token: str, calls: int) -> dict:
+    def uncached():
+        auth.token_cache.clear()
+        auth.get_current_user(token)
+
+    auth.token_cache.clear()
+    auth.get_current_user(token)
+    return {
+        "decode_every_call": timed(uncached, calls),
+        "cached": timed(lambda: auth.get_current_user(token), calls),
+    }
+
+
+def requests(token: str, count: int) -> dict:
+    app = FastAPI()
+
+    @app.get("/open")
+    def open_route():
+        return {}
+
+    @app.get("/authenticated")
+    def authenticated_route(user: str = Depends(auth.get_current_user)):
+        return {}
+
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {token}"}
+    return {
+        "no_auth": timed(lambda: client.get("/open"), count),
+        "bearer_auth": timed(lambda: client.get("/authenticated", headers=headers), count),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Measure authentication overhead per request.")
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    token = auth.create_access_token({"sub": "admin"})
+    results = {"verification": verification(token, args.calls), "requests": requests(token, args.requests)}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
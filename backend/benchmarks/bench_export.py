@@ -0,0 +1,81 @@
+"""
+Export benchmark: paging through the listings endpoint's query versus streaming GET /properties/export.
+
+Seeds a fresh SQLite database, then reads every property twice: once the way exports used to be
+done, fetching whole ORM objects page by page with OFFSET and keeping them in a list, and once through
+`iter_export_batches` and each export encoder, discarding chunks as soon as they are produced.
+Reports wall time, rows per second and the peak Python memory allocated for each.
+
+Usage (from backend/):
+    python -m benchmarks.bench_export [--rows 100000] [--page 1000]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.api.exports import EXPORT_FORMATS, export_encoder, iter_export
+from app.crud.crud_property import EXPORT_COLUMNS, get_filtered_properties_db, iter_export_batches
+from app.db.database import create_database_engine
+from app.db.migrate import upgrade_database
+from app.models.models import Property
+from benchmarks.bench_sqlite_concurrency import synthetic_row
+
+
+def paged_offsets(db, page: int) -> int:
+    rows, skip = [], 0
+    while True:
+        properties, _ = get_filtered_properties_db(db, skip=skip, limit=page, sort_by="id")
+        if not properties:
+            return len(rows)
+        rows.extend(properties)
+        skip += page
+
+
+def streamed(db, page: int, export_format: str) -> int:
+    size = 0
+    for chunk in iter_export(export_encoder(export_format, EXPORT_COLUMNS), iter_export_batches(db, page)):
+        size += len(chunk)
+    return size
+
+
+def measure(Session, read, rows: int) -> dict:
+    with Session() as db:
+        tracemalloc.start()
+        started = time.perf_counter()
+        read(db)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {"seconds": round(elapsed, 2), "rows_per_s": round(rows / elapsed), "peak_mib": round(peak / 2**20, 1)}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Compare OFFSET paging with streamed exports.")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--page", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-export-'), 'bench.db')}"
+    upgrade_database(url)
+    engine = create_database_engine(url)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        for start in range(0, args.rows, 10000):
+            db.execute(insert(Property), [synthetic_row(i) for i in range(start, min(start + 10000, args.rows))])
+        db.commit()
+
+    results = {"offset_pages": measure(Session, lambda db: paged_offsets(db, args.page), args.rows)}
+    for export_format in EXPORT_FORMATS:
+        results[export_format] = measure(Session, lambda db: streamed(db, args.page, export_format), args.rows)
+    engine.dispose()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
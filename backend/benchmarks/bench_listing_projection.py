@@ -0,0 +1,94 @@
+"""
+Listing query benchmark: full ORM rows versus the projected listing columns.
+
+Seeds a fresh SQLite database and runs the same value-range listing queries twice, once loading
+whole Property objects and converting them with `PropertyListings.from_orm` (the old endpoint
+path), and once selecting `LISTING_COLUMNS` and building `PropertyListings` from the row mappings.
+Reports median and p99 latency per page and the peak Python memory allocated while building a page.
+
+Usage (from backend/):
+    python -m benchmarks.bench_listing_projection [--rows 100000] [--queries 300] [--limit 100]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.crud_property import LISTING_COLUMNS, get_filtered_properties_db
+from app.db.database import create_database_engine
+from app.db.migrate import upgrade_database
+from app.models.models import Property
+from app.schemas.property import PropertyListings
+from benchmarks.bench_sqlite_concurrency import synthetic_row
+
+
+def full_rows(db, low: int, limit: int) -> list:
+    properties, _ = get_filtered_properties_db(db, estimated_market_value_min=low,
+                                               estimated_market_value_max=low + 500_000, limit=limit)
+    return [PropertyListings.from_orm(prop) for prop in properties]
+
+
+def projected_rows(db, low: int, limit: int) -> list:
+    rows, _ = get_filtered_properties_db(db, estimated_market_value_min=low, estimated_market_value_max=low + 500_000,
+                                         limit=limit, columns=LISTING_COLUMNS)
+    return [PropertyListings(**row._mapping) for row in rows]
+
+
+def measure(Session, fetch, bounds: list, limit: int) -> dict:
+    latencies = []
+    with Session() as db:
+        for low in bounds:
+            started = time.perf_counter()
+            fetch(db, low, limit)
+            latencies.append(time.perf_counter() - started)
+            db.expunge_all()
+            db.rollback()
+
+        tracemalloc.start()
+        fetch(db, bounds[0], limit)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2),
+        "peak_kib_per_page": round(peak / 1024, 1),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Compare full-row and projected listing queries.")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-listing-'), 'bench.db')}"
+    upgrade_database(url)
+    engine = create_database_engine(url)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        for start in range(0, args.rows, 10000):
+            db.execute(insert(Property), [synthetic_row(i) for i in range(start, min(start + 10000, args.rows))])
+        db.commit()
+        db.connection().exec_driver_sql("ANALYZE")
+        db.commit()
+
+    bounds = [random.randint(10_000, 4_000_000) for _ in range(args.queries)]
+    results = {
+        "full_rows": measure(Session, full_rows, bounds, args.limit),
+        "projected": measure(Session, projected_rows, bounds, args.limit),
+    }
+    engine.dispose()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Response serialization micro-benchmark for the detail and listings endpoints.
+
+Measures two things against a fresh, seeded SQLite database:
+
+* the serialization stage alone, comparing the previous path (`jsonable_encoder` or `from_orm`,
+  then response_model validation, then stdlib JSON) with the current one (`model_construct`,
+  one `model_dump`, orjson), on the same rows;
+* end-to-end request latency of GET /properties/{id} and GET /properties_listings/ through the
+  ASGI app, so regressions in the whole path show up as well.
+
+Results are p50/p99 in milliseconds. Pass --output to keep them for comparison with a later run.
+
+Usage (from backend/):
+    python -m benchmarks.bench_responses [--rows 20000] [--requests 500] [--output results.json]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+# The app migrates its database on import, so point it at a scratch file first.
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-responses-'), 'bench.db')}"
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.api.responses import from_row, model_response  # noqa: E402
+from app.core.auth import get_current_user  # noqa: E402
+from app.crud.crud_property import LISTING_COLUMNS, get_filtered_properties_db, get_property_db  # noqa: E402
+from app.db.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.models import Property  # noqa: E402
+from app.schemas.property import PaginatedPropertyListingsResponse, PropertyListing, PropertyListings  # noqa: E402
+from benchmarks.bench_sqlite_concurrency import synthetic_row  # noqa: E402
+
+
+def percentiles(samples: list) -> dict:
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "p99_ms": round(samples[int(len(samples) * 0.99)] * 1000, 3),
+    }
+
+
+def timed(function, count: int) -> dict:
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+
+def serialization(db, ids: list, count: int) -> dict:
+    detail = get_property_db(db, random.choice(ids))
+    listing_rows, _ = get_filtered_properties_db(db, limit=100, columns=LISTING_COLUMNS)
+    listing_objects, _ = get_filtered_properties_db(db, limit=100)
+
+    def detail_before():
+        model = PropertyListing.model_validate(jsonable_encoder(detail))
+        return JSONResponse(jsonable_encoder(model)).body
+
+    def detail_after():
+        return model_response(from_row(PropertyListing, detail)).body
+
+    def listings_before():
+        page = PaginatedPropertyListingsResponse(
+            properties=[PropertyListings.from_orm(prop) for prop in listing_objects], moreExists=True
+        )
+        page = PaginatedPropertyListingsResponse.model_validate(page.model_dump())
+        return JSONResponse(jsonable_encoder(page)).body
+
+    def listings_after():
+        return model_response(PaginatedPropertyListingsResponse.model_construct(
+            properties=[from_row(PropertyListings, row) for row in listing_rows], moreExists=True, next_cursor=None
+        )).body
+
+    return {
+        "detail": {"before": timed(detail_before, count), "after": timed(detail_after, count)},
+        "listings": {"before": timed(listings_before, count), "after": timed(listings_after, count)},
+    }
+
+
+def requests(ids: list, count: int) -> dict:
+    app.dependency_overrides[get_current_user] = lambda: "bench"
+    client = TestClient(app)
+    try:
+        return {
+            "detail": timed(lambda: client.get(f"/properties/{random.choice(ids)}"), count),
+            "listings": timed(lambda: client.get("/properties_listings/", params={
+                "estimated_market_value_min": random.randint(10_000, 4_000_000), "limit": 100,
+            }), count),
+        }
+    finally:
+        app.dependency_overrides.clear()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Time response serialization for detail and listings.")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        db.execute(insert(Property), [synthetic_row(i) for i in range(args.rows)])
+        db.commit()
+        ids = list(db.scalars(select(Property.id)))
+        results = {
+            "serialization": serialization(db, ids, args.requests),
+            "requests": requests(ids, args.requests),
+        }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Concurrent read/write benchmark for the SQLite engine settings.
+
+Runs the same workload against two fresh database files: one with SQLite's defaults (rollback
+journal, synchronous=FULL, no busy timeout) and one with the pragmas from app.core.config.
+Reader threads page through listings while a writer inserts rows in small transactions,
+which is the pattern of the API serving traffic during a bulk load.
+
+Usage (from backend/):
+    python -m benchmarks.bench_sqlite_concurrency [--rows 20000] [--readers 8] [--seconds 10]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.crud_property import get_filtered_properties_db
+from app.db.database import create_database_engine, sqlite_pragmas
+from app.db.migrate import upgrade_database
+from app.models.models import Property
+
+DEFAULT_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL", "mmap_size": 0, "busy_timeout": 0}
+
+
+def synthetic_row(i: int) -> dict:
+    return {
+        "full_address": f"{i} N SYNTHETIC ST, CHICAGO, IL",
+        "class_description": f"Class {i % 20}",
+        "bldg_use": f"Use {i % 7}",
+        "estimated_market_value": random.randint(10_000, 5_000_000),
+        "building_sq_ft": random.randint(300, 20_000),
+        "latitude": 41.6 + random.random() * 0.5,
+        "longitude": -87.9 + random.random() * 0.4,
+    }
+
+
+def run(pragmas: dict, rows: int, readers: int, seconds: float) -> dict:
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-sqlite-"), "bench.db")
+    url = f"sqlite:///{path}"
+    upgrade_database(url)
+    engine = create_database_engine(url, pragmas=pragmas, connect_args={"check_same_thread": False, "timeout": 0})
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.execute(insert(Property), [synthetic_row(i) for i in range(rows)])
+        db.commit()
+
+    counts = {"reads": 0, "writes": 0, "read_errors": 0, "write_errors": 0}
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def reader():
+        with Session() as db:
+            while time.perf_counter() < deadline:
+                low = random.randint(10_000, 4_000_000)
+                started = time.perf_counter()
+                try:
+                    get_filtered_properties_db(db, estimated_market_value_min=low,
+                                               estimated_market_value_max=low + 500_000, limit=25)
+                    db.rollback()
+                    key = "reads"
+                except OperationalError:
+                    db.rollback()
+                    key = "read_errors"
+                with lock:
+                    counts[key] += 1
+                    latencies.append(time.perf_counter() - started)
+
+    def writer():
+        i = rows
+        with Session() as db:
+            while time.perf_counter() < deadline:
+                try:
+                    db.execute(insert(Property), [synthetic_row(i + n) for n in range(10)])
+                    db.commit()
+                    key = "writes"
+                except OperationalError:
+                    db.rollback()
+                    key = "write_errors"
+                i += 10
+                with lock:
+                    counts[key] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)] + [threading.Thread(target=writer)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    latencies.sort()
+    return {
+        **counts,
+        "reads_per_second": round(counts["reads"] / seconds, 1),
+        "write_batches_per_second": round(counts["writes"] / seconds, 1),
+        "read_p50_ms": round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+        "read_p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2) if latencies else None,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Compare SQLite defaults with the tuned engine settings.")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args(argv)
+    results = {
+        "defaults": run(DEFAULT_PRAGMAS, args.rows, args.readers, args.seconds),
+        "tuned": run(sqlite_pragmas(), args.rows, args.readers, args.seconds),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark cold start: importing app.main, and a fresh server's time to its first responses.
+
+Import time is measured in a new interpreter per run, so nothing is cached in sys.modules. Time to
+first request starts a uvicorn process on a migrated SQLite database and measures, from spawning it,
+how long until GET /ready first answers 200, and then how long the first authenticated listing
+request takes on the fresh process.
+
+With --import-budget / --first-request-budget the run fails (exit status 1) when the median exceeds
+the budget, so CI can enforce them; app/tests/api/test_startup.py enforces the import budget on every
+test run.
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup [--runs 5] [--import-budget 2.5] [--first-request-budget 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from app.db.migrate import upgrade_database
+from benchmarks.load import free_port
+
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import app.main; print(time.perf_counter() - started)"
+
+
+def import_seconds(env: dict) -> float:
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], env=env, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def first_request_seconds(env: dict) -> tuple:
+    """Start a server and return the seconds until /ready answers 200 and the first listing request's latency."""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError("The API server exited during startup")
+            if time.perf_counter() - started > 60:
+                raise RuntimeError("The API server was not ready within 60 seconds")
+            try:
+                if httpx.get(f"{base_url}/ready", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+        ready = time.perf_counter() - started
+
+        token = httpx.post(f"{base_url}/token", auth=("admin", "password")).json()["access_token"]
+        request_started = time.perf_counter()
+        httpx.get(f"{base_url}/properties_listings/", headers={"Authorization": f"Bearer {token}"}).raise_for_status()
+        return ready, time.perf_counter() - request_started
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def summarize(samples: list) -> dict:
+    return {
+        "median_s": round(statistics.median(samples), 3), "min_s": round(min(samples), 3),
+        "max_s": round(max(samples), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, help="fail when the median import time exceeds this (s)")
+    parser.add_argument("--first-request-budget", type=float,
+                        help="fail when the median time until /ready answers exceeds this (s)")
+    args = parser.parse_args()
+
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-startup-'), 'bench.db')}"
+    upgrade_database(url)
+    env = {**os.environ, "DATABASE_URL": url}
+
+    imports = [import_seconds(env) for _ in range(args.runs)]
+    starts = [first_request_seconds(env) for _ in range(args.runs)]
+    results = {
+        "import_app_main": summarize(imports),
+        "time_to_ready": summarize([ready for ready, _ in starts]),
+        "first_listing_request": summarize([request for _, request in starts]),
+    }
+    print(json.dumps(results, indent=2))
+
+    failures = []
+    if args.import_budget is not None and results["import_app_main"]["median_s"] > args.import_budget:
+        failures.append(f"import took {results['import_app_main']['median_s']}s, budget {args.import_budget}s")
+    if args.first_request_budget is not None and results["time_to_ready"]["median_s"] > args.first_request_budget:
+        failures.append(f"ready after {results['time_to_ready']['median_s']}s, budget {args.first_request_budget}s")
+    if failures:
+        print("Over budget: " + "; ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
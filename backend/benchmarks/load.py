@@ -0,0 +1,332 @@
+"""
+Load-test harness for the property API, with JSON baselines for catching regressions.
+
+`run` seeds a fresh SQLite database with a synthetic N-row properties table (every Property column
+filled, reproducibly from --seed), starts uvicorn on it and drives each scenario in turn for
+--duration seconds with --concurrency concurrent clients:
+
+    listings    GET /properties_listings/ with a mix of range, exact, text search and sorted queries
+    detail      GET /properties/{id} for random IDs
+    range       GET /properties/range
+    bulk_write  POST /properties/bulk?mode=upsert, --bulk-size NDJSON rows per request
+
+Throughput, error counts and latency percentiles per scenario are printed and written to --out.
+Pass --base-url to load an already running server instead (it is neither seeded nor started, and
+--rows must match its table). `compare` checks a later run against a baseline and exits with status 1
+when a scenario's throughput fell or its p99 latency grew by more than --tolerance.
+
+Usage (from backend/):
+    python -m benchmarks.load run [--rows 100000] [--concurrency 16] [--duration 10] [--workers 1]
+                                  [--scenarios listings,detail,range,bulk_write] [--out bench.json]
+    python -m benchmarks.load compare BASELINE.json CURRENT.json [--tolerance 0.15]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+
+import httpx
+from sqlalchemy import Date, Float, Integer, insert
+
+from app.db.database import create_database_engine
+from app.db.migrate import upgrade_database
+from app.models.models import Property
+
+SCENARIOS = ("listings", "detail", "range", "bulk_write")
+CLASS_DESCRIPTIONS = ("Residential", "Commercial", "Industrial", "Vacant", "Exempt", "Mixed Use")
+BLDG_USES = ("Single Family", "Two Flat", "Multi Family", "Condominium", "Retail", "Office", "Warehouse")
+STREETS = ("JUSTINE", "TAYLOR", "HALSTED", "ASHLAND", "MADISON", "ARCHER", "PULASKI", "CICERO")
+# Columns the database fills in itself.
+GENERATED_COLUMNS = ("id", "content_hash", "updated_at", "version")
+# PINs of rows written by bulk_write start here, above every seeded PIN.
+BULK_PIN_OFFSET = 10 ** 12
+
+
+def synthetic_property(i: int, rng: random.Random) -> dict:
+    """Column values for the i-th synthetic property, valid for both a direct insert and PropertyBase."""
+    row = {}
+    for column in Property.__table__.columns:
+        if column.key in GENERATED_COLUMNS:
+            continue
+        if isinstance(column.type, Integer):
+            row[column.key] = rng.randint(0, 1000)
+        elif isinstance(column.type, Float):
+            row[column.key] = rng.random()
+        elif isinstance(column.type, Date):
+            row[column.key] = date(rng.randint(1990, 2023), rng.randint(1, 12), rng.randint(1, 28))
+        else:
+            row[column.key] = ""
+    street = rng.choice(STREETS)
+    row.update(
+        full_address=f"{100 + i % 9900} N {street} ST, CHICAGO, IL",
+        street=street,
+        city="CHICAGO",
+        pin=10_000_000_000 + i,
+        class_description=rng.choice(CLASS_DESCRIPTIONS),
+        bldg_use=rng.choice(BLDG_USES),
+        estimated_market_value=rng.randint(10_000, 5_000_000),
+        current_total=rng.randint(1_000, 500_000),
+        prior_total=rng.randint(1_000, 500_000),
+        pprior_total=rng.randint(1_000, 500_000),
+        pprior_year=2021,
+        building_sq_ft=rng.randint(300, 20_000),
+        latitude=41.6 + rng.random() * 0.5,
+        longitude=-87.9 + rng.random() * 0.4,
+        town=rng.randint(1, 38),
+        neighborhood=rng.randint(1, 300),
+        tax_code=rng.randint(70_000, 79_999),
+        sale_amount=rng.choice((None, rng.randint(10_000, 5_000_000))),
+    )
+    return row
+
+
+def seed_database(url: str, rows: int, seed: int) -> None:
+    """Migrate a database and fill it with `rows` synthetic properties."""
+    upgrade_database(url)
+    engine = create_database_engine(url)
+    rng = random.Random(seed)
+    with engine.begin() as connection:
+        for start in range(0, rows, 10000):
+            connection.execute(insert(Property), [synthetic_property(i, rng) for i in range(start, min(start + 10000, rows))])
+        connection.exec_driver_sql("ANALYZE")
+    engine.dispose()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_url: str, workers: int) -> tuple:
+    """Start uvicorn on the seeded database and wait until it answers. Returns the process and base URL."""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        # uvicorn takes its worker count from WEB_CONCURRENCY, which the app also reads to size its caches.
+        env={**os.environ, "DATABASE_URL": database_url, "WEB_CONCURRENCY": str(workers)},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("The API server exited during startup")
+        try:
+            httpx.get(f"{base_url}/docs", timeout=1)
+            return process, base_url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("The API server did not start within 60 seconds")
+
+
+def listing_params(rng: random.Random) -> dict:
+    low = rng.randint(10_000, 4_000_000)
+    return rng.choice((
+        {"estimated_market_value_min": low, "estimated_market_value_max": low + 250_000},
+        {"class_description": rng.choice(CLASS_DESCRIPTIONS), "exact_match": True, "sort_by": "estimated_market_value"},
+        {"full_address": rng.choice(STREETS).lower()},
+        {"bldg_use": rng.choice(BLDG_USES), "building_sq_ft_min": rng.randint(300, 10_000)},
+        {"sort_by": "building_sq_ft", "descending": True},
+    ))
+
+
+def ndjson_rows(rng: random.Random, size: int) -> str:
+    rows = []
+    for _ in range(size):
+        row = synthetic_property(0, rng)
+        # A small PIN space, so repeated requests update rows as well as inserting them.
+        row["pin"] = BULK_PIN_OFFSET + rng.randint(0, 50_000)
+        rows.append(json.dumps(row, default=str))
+    return "\n".join(rows)
+
+
+def request_factory(scenario: str, rows: int, bulk_size: int, rng: random.Random):
+    """Return a function building the (method, path, keyword arguments) of a scenario's next request."""
+    if scenario == "listings":
+        return lambda: ("GET", "/properties_listings/", {"params": listing_params(rng)})
+    if scenario == "detail":
+        return lambda: ("GET", f"/properties/{rng.randint(1, rows)}", {})
+    if scenario == "range":
+        return lambda: ("GET", "/properties/range", {})
+    if scenario == "bulk_write":
+        return lambda: ("POST", "/properties/bulk", {
+            "params": {"mode": "upsert"}, "content": ndjson_rows(rng, bulk_size),
+            "headers": {"Content-Type": "application/x-ndjson"},
+        })
+    raise ValueError(f"Unknown scenario {scenario!r}; choose from {', '.join(SCENARIOS)}")
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+
+    def percentile(fraction: float) -> float:
+        return round(latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000, 2) if latencies else None
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": percentile(0.50),
+        "p90_ms": percentile(0.90),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else None,
+    }
+
+
+async def drive(base_url: str, token: str, scenario: str, args) -> dict:
+    """Run one scenario with `args.concurrency` clients for `args.duration` seconds."""
+    rng = random.Random(args.seed)
+    next_request = request_factory(scenario, args.rows, args.bulk_size, rng)
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers={"Authorization": f"Bearer {token}"},
+                                 limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + args.duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                method, path, options = next_request()
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **options)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                if failed:
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+    return summarize(latencies, errors, elapsed)
+
+
+def login(base_url: str, username: str, password: str) -> str:
+    response = httpx.post(f"{base_url}/token", auth=(username, password), timeout=30)
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> dict:
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    process = None
+    if args.base_url:
+        base_url = args.base_url.rstrip("/")
+    else:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-load-'), 'bench.db')}"
+        seed_database(url, args.rows, args.seed)
+        process, base_url = start_server(url, args.workers)
+    try:
+        results = {}
+        for scenario in scenarios:
+            # Logging in per scenario keeps long runs within the access token lifetime.
+            token = login(base_url, args.username, args.password)
+            results[scenario] = asyncio.run(drive(base_url, token, scenario, args))
+            print(f"{scenario}: {json.dumps(results[scenario])}", file=sys.stderr)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+    return {
+        "meta": {
+            "rows": args.rows, "concurrency": args.concurrency, "duration_s": args.duration,
+            "workers": args.workers, "bulk_size": args.bulk_size, "seed": args.seed,
+            "target": args.base_url or "local uvicorn on SQLite", "commit": git_commit(),
+            "python": platform.python_version(), "platform": platform.platform(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "scenarios": results,
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> tuple:
+    """
+    Compare the scenarios of two runs.
+
+    Returns:
+        tuple: A report line per scenario present in both runs, and the names of the scenarios that
+        regressed: throughput below (1 - tolerance) times the baseline, or p99 above (1 + tolerance) times it.
+    """
+    lines, regressions = [], []
+    for scenario, before in baseline["scenarios"].items():
+        after = current["scenarios"].get(scenario)
+        if after is None:
+            continue
+        throughput = after["throughput_rps"] / before["throughput_rps"] if before["throughput_rps"] else 1.0
+        p99 = after["p99_ms"] / before["p99_ms"] if before["p99_ms"] and after["p99_ms"] else 1.0
+        regressed = throughput < 1 - tolerance or p99 > 1 + tolerance
+        if regressed:
+            regressions.append(scenario)
+        lines.append(
+            f"{scenario:<12} throughput {before['throughput_rps']:>9} -> {after['throughput_rps']:>9} rps "
+            f"({throughput - 1:+.1%})  p99 {before['p99_ms']} -> {after['p99_ms']} ms ({p99 - 1:+.1%})"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return lines, regressions
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Load-test the property API and compare runs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="seed, load and record a baseline")
+    run_parser.add_argument("--rows", type=int, default=100000)
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    run_parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    run_parser.add_argument("--bulk-size", type=int, default=100, help="rows per bulk_write request")
+    run_parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--base-url", help="load this running server instead of starting one")
+    run_parser.add_argument("--username", default="admin")
+    run_parser.add_argument("--password", default="password")
+    run_parser.add_argument("--out", help="write the results to this JSON file")
+
+    compare_parser = commands.add_parser("compare", help="compare a run against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--tolerance", type=float, default=0.15)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        results = run(args)
+        if args.out:
+            with open(args.out, "w") as file:
+                json.dump(results, file, indent=2)
+        print(json.dumps(results, indent=2))
+        return
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    lines, regressions = compare(baseline, current, args.tolerance)
+    print("\n".join(lines))
+    if regressions:
+        print(f"Regressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+#!/bin/sh
+# Production entrypoint: apply migrations once, then start the API workers.
+# Set RUN_MIGRATIONS=false when a separate one-shot step migrates the database (see docker-compose.yml).
+# Each worker keeps its own caches and only its own writes invalidate them, so with WEB_CONCURRENCY > 1
+# the listing cache needs a shared server in LISTING_CACHE_URL (redis://...), and the /properties/range
+# summary is not cached at all.
+set -e
+
+if [ "${RUN_MIGRATIONS:-true}" = "true" ]; then
+    python -m app.db.migrate
+fi
+
+exec gunicorn app.main:app -c gunicorn.conf.py
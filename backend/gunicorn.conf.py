@@ -0,0 +1,44 @@
+"""
+Gunicorn settings for the production entrypoint: uvicorn workers, one per core by default.
+
+Workers are shared-nothing: the app is not preloaded, so each worker imports it and opens its own
+engine and connection pool after forking, and no worker touches the schema (migrations run once
+beforehand, see entrypoint.sh). Every setting can be overridden from the environment. With more than
+one worker, startup fails unless LISTING_CACHE_URL names a cache server the workers share (or
+LISTING_CACHE_SIZE=0 turns the listing cache off).
+
+Usage (from backend/):
+    python -m app.db.migrate && gunicorn app.main:app -c gunicorn.conf.py
+
+Without gunicorn, `WEB_CONCURRENCY=N uvicorn app.main:app` is equivalent, minus worker recycling and the
+shared-cache check. Do not use `uvicorn --workers N`: it does not set WEB_CONCURRENCY, so every worker
+would keep per-process caches that the other workers' writes never invalidate.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# Workers inherit the environment, so the app sees the real count and turns off its per-process caches.
+os.environ["WEB_CONCURRENCY"] = str(workers)
+# A worker only invalidates its own caches, so several workers need a shared listing cache (or none).
+if workers > 1 and not os.getenv("LISTING_CACHE_URL") and int(os.getenv("LISTING_CACHE_SIZE", 1024)) > 0:
+    raise SystemExit(
+        f"{workers} workers need a shared listing cache: set LISTING_CACHE_URL (e.g. redis://cache:6379/0), "
+        "or LISTING_CACHE_SIZE=0 to run without one"
+    )
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = False
+
+# Seconds a worker may go silent before it is restarted, and may take to finish in-flight requests on shutdown.
+timeout = int(os.getenv("WORKER_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("KEEPALIVE", 5))
+
+# Recycle workers after this many requests (0 turns it off); the jitter keeps them from restarting together.
+max_requests = int(os.getenv("MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", 1000))
+
+accesslog = os.getenv("ACCESS_LOG", "-") or None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")